@@ -1,3 +1,21 @@
-from explorer.cache import Cache
-from explorer.file_explorer import FileExplorer
+from explorer.listing import Entry, scan, scan_chunks
+from explorer.cache import Action, Cache
+from explorer.listing_cache import ListingCache
+from explorer.columns import Column, ColumnSet
+from explorer.search import Hit, SearchIndex
+from explorer.name_filter import NameFilter
+from explorer.watcher import Watcher
+from explorer.sizes import DirRecord, SizeService
+from explorer.duplicates import DuplicateFinder, DuplicateJob
+from explorer.names import NameAllocator
+from explorer.fastcopy import FileCopier
+from explorer.tree_copy import TreeCopier, TreeCopyError
+from explorer.remover import TreeRemover, TreeRemoveError
+from explorer.renamer import BulkRenamer, RenamePlan
+from explorer.template import RenameTemplate
+from explorer.file_explorer import FileExplorer, MoveError
+from explorer.journal import Journal
+from explorer.planner import Plan, PlanItem, Planner
+from explorer.transfer import TransferJob, TransferEngine
+from explorer.trash import Trash
 from explorer.facade import Facade
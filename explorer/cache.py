@@ -1,6 +1,182 @@
+import sys
+from array import array
+from pathlib import Path
+
+
+class Action:
+    """
+    Compact record of a cached action - a batch of items, each with src,
+    func, dst and new_obj. Paths are split into an index of a shared parent
+    dir and a name, equal names are stored once. Items are materialized as
+    dicts only when read.
+
+    Attributes
+    ---------------
+    dirs : list
+        parent dirs shared by all paths of the action
+    funcs : list
+        distinct func names
+    codes : array
+        func index of every item
+    refs : array
+        3 per item (src, dst, new_obj): dir index, RAW for values stored
+        as they are or NONE
+    names : list
+        3 per item: path names or raw values
+    nbytes : int
+        approximate memory used by the record
+    index : dict
+        parent dir: its index in dirs
+    """
+
+    __slots__ = (
+        "dirs", "funcs", "codes", "refs", "names", "nbytes", "index"
+    )
+
+    KEYS = ("src", "dst", "new_obj")
+    RAW = -1
+    NONE = -2
+
+    def __init__(self):
+        self.dirs = []
+        self.funcs = []
+        self.codes = array("B")
+        self.refs = array("i")
+        self.names = []
+        self.nbytes = 0
+        self.index = {}
+
+    @classmethod
+    def pack(cls, items):
+        """
+        Return a compact record of items or items unchanged if they are not
+        a list of action dicts.
+
+        Parameters
+        ---------------
+        items : object
+            list of dicts with src, func, dst and new_obj keys
+
+        Returns
+        ---------------
+        Action or object
+        """
+
+        if not isinstance(items, list) or not items or not all(
+            isinstance(item, dict) and len(item) == 4
+            and all(key in item for key in ("func", *cls.KEYS))
+            for item in items
+        ):
+            return items
+        action = cls()
+        strings = {}
+        for item in items:
+            action._append(item, action.index, strings)
+        action.nbytes = (
+            sys.getsizeof(action) + sys.getsizeof(action.codes)
+            + sys.getsizeof(action.refs) + sys.getsizeof(action.names)
+            + sys.getsizeof(action.dirs) + sys.getsizeof(action.funcs)
+            + sum(sys.getsizeof(value) for value in strings.values())
+            + sum(sys.getsizeof(value) for value in action.dirs)
+        )
+        return action
+
+    def _append(self, item, dirs, strings):
+        func = item["func"]
+        if func not in self.funcs:
+            self.funcs.append(func)
+        self.codes.append(self.funcs.index(func))
+        for key in self.KEYS:
+            ref, name = self._encode(item[key], dirs)
+            self.refs.append(ref)
+            if isinstance(name, str):
+                name = strings.setdefault(name, name)
+            self.names.append(name)
+
+    def _encode(self, value, dirs):
+        if value is None:
+            return self.NONE, None
+        if not isinstance(value, Path):
+            return self.RAW, value
+        parent = str(value.parent)
+        index = dirs.get(parent)
+        if index is None:
+            index = dirs[parent] = len(self.dirs)
+            self.dirs.append(parent)
+        return index, value.name
+
+    def _decode(self, ref, name):
+        if ref == self.NONE:
+            return None
+        if ref == self.RAW:
+            return name
+        return Path(self.dirs[ref], name)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("action index out of range")
+        base = index * 3
+        values = [
+            self._decode(self.refs[base + i], self.names[base + i])
+            for i in range(3)
+        ]
+        return {
+            "src": values[0],
+            "func": self.funcs[self.codes[index]],
+            "dst": values[1],
+            "new_obj": values[2]
+        }
+
+    def __setitem__(self, index, item):
+        if index < 0:
+            index += len(self)
+        func = item["func"]
+        if func not in self.funcs:
+            self.funcs.append(func)
+        self.codes[index] = self.funcs.index(func)
+        known = len(self.dirs)
+        for i, key in enumerate(self.KEYS):
+            ref, name = self._encode(item[key], self.index)
+            self.refs[index * 3 + i] = ref
+            self.names[index * 3 + i] = name
+            if isinstance(name, str):
+                self.nbytes += sys.getsizeof(name)
+        self.nbytes += sum(sys.getsizeof(d) for d in self.dirs[known:])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, (Action, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Action({list(self)!r})"
+
+
 class Cache:
     """
-    Cache actions.
+    Cache actions. The oldest actions are evicted once there are more than
+    max_actions or they take more than max_bytes. Lists of action dicts are
+    stored as compact Action records.
+
+    Parameters
+    ---------------
+    max_actions : int, default=100
+        max number of actions kept
+    max_bytes : int, default=64 MiB
+        approximate memory budget of stored actions
 
     Attributes
     ---------------
@@ -8,16 +184,29 @@ class Cache:
         cached actions
     current : int
         index pointing at current action
+    size : int
+        approximate memory used by stored actions in bytes, kept up to date
+        when stored Action records are modified
     """
 
-    def __init__(self):
+    def __init__(self, max_actions=100, max_bytes=64 * 2 ** 20):
         """
         Cache constructor.
         """
 
+        self.max_actions = max_actions
+        self.max_bytes = max_bytes
         self.items = []
         self.current = -1
 
+    @property
+    def size(self):
+        """
+        Approximate memory used by stored actions in bytes.
+        """
+
+        return sum(self._sizeof(item) for item in self.items)
+
     def store(self, item):
         """
         Store an item.
@@ -30,8 +219,41 @@ class Cache:
 
         if self.current != len(self.items) - 1:
             self.items = self.items[:self.current + 1]
-        self.items.append(item)
+        self.items.append(Action.pack(item))
         self.current += 1
+        self._evict()
+
+    def replace(self, item):
+        """
+        Replace the current action, e.g. after redo changed its paths. The
+        item is packed again, so parent dirs that are no longer referenced
+        are dropped.
+
+        Parameters
+        ---------------
+        item
+            object replacing the current one
+
+        Returns
+        ---------------
+        Object stored in items
+        """
+
+        item = Action.pack(item)
+        self.items[self.current] = item
+        self._evict()
+        return item
+
+    def _evict(self):
+        size = self.size
+        while len(self.items) > 1 and (
+            len(self.items) > self.max_actions or size > self.max_bytes
+        ):
+            size -= self._sizeof(self.items.pop(0))
+            self.current -= 1
+
+    def _sizeof(self, item):
+        return item.nbytes if isinstance(item, Action) else 0
 
     def undo(self):
         """
@@ -64,6 +286,56 @@ class Cache:
             return self.items[self.current]
         return None
 
+    def rebuild(self, events):
+        """
+        Replace stored actions with actions replayed from a journal.
+
+        Parameters
+        ---------------
+        events : list
+            (op, items) tuples returned by Journal.history
+
+        Returns
+        ---------------
+        tuple
+            last undone and last redone action, like Facade.last_undo and
+            Facade.last_redo after the same operations
+        """
+
+        self.clear()
+        last_undo = last_redo = None
+        for op, items in events:
+            if op == "store":
+                self.store(items)
+            elif op == "undo":
+                last_undo, last_redo = self.get_current(), None
+                self.undo()
+            elif op == "redo":
+                if items and self.get_current() is not None:
+                    # objects redone to new paths, e.g. trashed again
+                    self.replace([
+                        dict(item, new_obj=items[i]) if i in items else item
+                        for i, item in enumerate(self.get_current())
+                    ])
+                last_undo, last_redo = None, self.get_current()
+                self.redo()
+            elif op == "clear":
+                self.clear()
+                last_undo = last_redo = None
+        return last_undo, last_redo
+
+    def stats(self):
+        """
+        Return history size.
+
+        Returns
+        ---------------
+        dict
+            actions: number of stored actions, bytes: approximate memory used
+        """
+
+        return {"actions": len(self.items), "bytes": self.size}
+
     def clear(self):
         """
         Restore default attr values.
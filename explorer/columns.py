@@ -0,0 +1,262 @@
+import math
+import mimetypes
+import os
+import stat
+import time
+
+try:
+    import pwd
+except ImportError:
+    pwd = None
+
+
+TIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+
+class Column:
+    """
+    Provider of a metadata column. Declares metadata its value is computed
+    from, so only the columns that are displayed cost anything.
+
+    Parameters
+    ---------------
+    title : str
+        column heading, unique among columns
+    value : callable
+        value(entry, st) returning a raw value. st is an os.lstat result
+        if needs is "stat", None otherwise
+    needs : {entry, stat}, default=entry
+        metadata used by value - listing Entry only or stat of the object,
+        read once per entry for all stat columns
+    text : callable, default=str
+        formats a raw value for display, None is displayed as ""
+    """
+
+    NEEDS = ("entry", "stat")
+
+    def __init__(self, title, value, needs="entry", text=str):
+        if needs not in self.NEEDS:
+            raise ValueError(
+                f"needs should be one of {self.NEEDS} not {needs}"
+            )
+        self.title = title
+        self.value = value
+        self.needs = needs
+        self.text = text
+
+    def __repr__(self):
+        return f"Column({self.title!r}, needs={self.needs!r})"
+
+
+class ColumnSet:
+    """
+    Registered metadata columns and memoized values. Values are computed
+    on demand, e.g. for rows scrolled into view, and remembered per listing
+    entry - a modified object gets a new Entry and is computed again.
+    Timestamps are formatted once per distinct second and owner names once
+    per user.
+
+    Parameters
+    ---------------
+    columns : iterable, default=None
+        Column objects, built-in columns if None
+    max_entries : int, default=2 ** 16
+        number of entries with memoized values, the oldest are dropped first
+
+    Attributes
+    ---------------
+    columns : dict
+        title: Column in registration order
+    """
+
+    def __init__(self, columns=None, max_entries=2 ** 16):
+        self.max_entries = max_entries
+        self.columns = {}
+        self._values = {}
+        self._times = {}
+        self._owners = {}
+        if columns is None:
+            columns = self._default_columns()
+        for column in columns:
+            self.register(column)
+
+    def _default_columns(self):
+        return [
+            Column("Last modified", lambda e, st: e.mtime,
+                   text=self.format_time),
+            Column("Size", _file_size, text=self.format_size),
+            Column("Permissions", lambda e, st: st.st_mode, "stat",
+                   stat.filemode),
+            Column("Owner", lambda e, st: st.st_uid, "stat", self.owner),
+            Column("Inode", lambda e, st: st.st_ino, "stat"),
+            Column("Extension", _extension),
+            Column("MIME type", _mime_type),
+        ]
+
+    def register(self, column):
+        """
+        Add a column or replace a column with the same title.
+
+        Parameters
+        ---------------
+        column : Column
+        """
+
+        self.columns[column.title] = column
+        for values in self._values.values():
+            values.pop(column.title, None)
+
+    def cells(self, directory, entries, titles):
+        """
+        Return formatted values of selected columns.
+
+        Parameters
+        ---------------
+        directory : str or Path
+            parent dir of entries
+        entries : iterable
+            Entry objects
+        titles : iterable
+            titles of computed columns
+
+        Returns
+        ---------------
+        list
+            {title: text} for every entry
+
+        Raises
+        ---------------
+        KeyError
+            If a title is not registered
+        """
+
+        directory = str(directory)
+        columns = [self.columns[title] for title in titles]
+        cells = []
+        for entry in entries:
+            key = (directory, entry)
+            values = self._values.pop(key, None)
+            if values is None:
+                values = {}
+            missing = [c for c in columns if c.title not in values]
+            if missing:
+                st = None
+                if any(column.needs == "stat" for column in missing):
+                    st = _lstat(os.path.join(directory, entry.name))
+                for column in missing:
+                    values[column.title] = self._compute(column, entry, st)
+            self._values[key] = values
+            cells.append({column.title: values[column.title]
+                          for column in columns})
+        while len(self._values) > self.max_entries:
+            del self._values[next(iter(self._values))]
+        return cells
+
+    def clear(self):
+        """
+        Drop memoized values.
+        """
+
+        self._values.clear()
+        self._times.clear()
+        self._owners.clear()
+
+    def format_time(self, timestamp):
+        """
+        Format a timestamp, reusing the text of a timestamp of the same
+        second.
+
+        Parameters
+        ---------------
+        timestamp : float
+
+        Returns
+        ---------------
+        str
+            local time as year/month/day hours:minutes:seconds
+        """
+
+        second = math.floor(timestamp)
+        text = self._times.get(second)
+        if text is None:
+            if len(self._times) >= self.max_entries:
+                self._times.clear()
+            text = time.strftime(TIME_FORMAT, time.localtime(second))
+            self._times[second] = text
+        return text
+
+    @staticmethod
+    def format_size(size):
+        """
+        Format a size in bytes for display.
+
+        Parameters
+        ---------------
+        size : int or None
+            size in bytes
+
+        Returns
+        ---------------
+        str
+            size in the largest unit below 1024 - "512 B", "1.5 MiB". Empty
+            if size is None
+        """
+
+        if size is None:
+            return ""
+        if size < 1024:
+            return f"{size} B"
+        for unit in ("KiB", "MiB", "GiB", "TiB"):
+            size /= 1024
+            if size < 1024:
+                break
+        return f"{size:.1f} {unit}"
+
+    def owner(self, uid):
+        """
+        Return name of a user, uid as text if it is unknown.
+        """
+
+        name = self._owners.get(uid)
+        if name is None:
+            name = str(uid)
+            if pwd is not None:
+                try:
+                    name = pwd.getpwuid(uid).pw_name
+                except KeyError:
+                    pass
+            self._owners[uid] = name
+        return name
+
+    @staticmethod
+    def _compute(column, entry, st):
+        if column.needs == "stat" and st is None:
+            return ""
+        value = column.value(entry, st)
+        return "" if value is None else column.text(value)
+
+
+def _lstat(path):
+    try:
+        return os.lstat(path)
+    except OSError:
+        return None
+
+
+def _file_size(entry, st):
+    # dirs don't know their size, see Facade.get_cells
+    if entry.type == "dirs":
+        return None
+    return entry.size
+
+
+def _extension(entry, st):
+    if entry.type == "dirs":
+        return None
+    return os.path.splitext(entry.name)[1].lower()
+
+
+def _mime_type(entry, st):
+    if entry.type == "dirs":
+        return None
+    return mimetypes.guess_type(entry.name, strict=False)[0]
@@ -0,0 +1,329 @@
+import hashlib
+import os
+import queue
+import stat
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+class DuplicateFinder:
+    """
+    Find files with identical content. Candidates are narrowed in stages,
+    every stage reads more of fewer files:
+
+    1. size - files are bucketed by size from one scandir pass, files of a
+       unique size are dropped without being opened
+    2. edges - hash of the first and last EDGE bytes
+    3. content - hash of the whole file
+
+    Files not larger than 2 * EDGE are read whole by the edge stage and
+    skip the last one. Hashes are computed on a process pool in batches of
+    files, full hashes are scheduled before pending edge hashes, so groups
+    are confirmed early.
+    Hard links of a file are reported once, symbolic links are not followed.
+
+    Parameters
+    ---------------
+    workers : int, default=None
+        number of hashing processes, os.cpu_count() if None
+    min_size : int, default=1
+        smaller files are ignored
+    executor : concurrent.futures.Executor, default=None
+        runs hashing instead of a process pool created for every search
+
+    Attributes
+    ---------------
+    files : int
+        number of scanned files
+    bytes_total : int
+        size of scanned files
+    candidates : int
+        number of files sharing size with another file
+    bytes_read : int
+        number of bytes hashed
+    """
+
+    EDGE = 4096
+    CHUNK = 2 ** 20
+    BATCH = 64
+
+    def __init__(self, workers=None, min_size=1, executor=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_size = min_size
+        self.executor = executor
+        self.files = 0
+        self.bytes_total = 0
+        self.candidates = 0
+        self.bytes_read = 0
+
+    def find(self, roots, stop=None):
+        """
+        Search directory trees for duplicates.
+
+        Parameters
+        ---------------
+        roots : iterable
+            searched dir paths
+        stop : threading.Event, default=None
+            stops the search once set
+
+        Returns
+        ---------------
+        generator
+            yields sorted lists of Path objects of files with equal content
+            as soon as a group is confirmed
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If a root is not a directory
+        """
+
+        roots = [Path(root) for root in roots]
+        for root in roots:
+            if not root.is_dir():
+                raise FileNotFoundError(f"Invalid directory path: {root}")
+        return self._groups(roots, stop or threading.Event())
+
+    def _bucket(self, roots, stop):
+        """
+        Return size: paths of files sharing their size with another file.
+        """
+
+        sizes = {}
+        seen = set()
+        stack = [str(root) for root in roots]
+        while stack and not stop.is_set():
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if stat.S_ISDIR(st.st_mode):
+                            stack.append(entry.path)
+                            continue
+                        if not stat.S_ISREG(st.st_mode) or \
+                                st.st_size < self.min_size:
+                            continue
+                        key = (st.st_dev, st.st_ino)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        self.files += 1
+                        self.bytes_total += st.st_size
+                        sizes.setdefault(st.st_size, []).append(entry.path)
+            except OSError:
+                continue
+        return {size: paths for size, paths in sizes.items() if len(paths) > 1}
+
+    def _groups(self, roots, stop):
+        buckets = self._bucket(roots, stop)
+        tasks = deque()
+        left = {}
+        hashed = {}
+        for size in sorted(buckets, reverse=True):
+            paths = buckets[size]
+            self.candidates += len(paths)
+            left[(size,)] = len(paths)
+            tasks.extend(((size,), path) for path in paths)
+        executor = self.executor or ProcessPoolExecutor(self.workers)
+        done = queue.SimpleQueue()
+        running = 0
+        try:
+            while (tasks or running) and not stop.is_set():
+                while tasks and running < self.workers * 2:
+                    batch = self._batch(tasks)
+                    future = executor.submit(
+                        _hash_batch, [(path, key) for key, path in batch],
+                        self.EDGE, self.CHUNK
+                    )
+                    future.add_done_callback(
+                        lambda f, batch=batch: done.put((batch, f))
+                    )
+                    running += 1
+                try:
+                    batch, future = done.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                running -= 1
+                for (key, path), (digest, nbytes) in zip(batch, future.result()):
+                    self.bytes_read += nbytes
+                    if digest is not None:
+                        hashed.setdefault(key, []).append((digest, path))
+                    left[key] -= 1
+                    if left[key]:
+                        continue
+                    del left[key]
+                    size = key[0]
+                    for digest, paths in _split(hashed.pop(key, [])):
+                        if len(key) > 1 or size <= 2 * self.EDGE:
+                            yield sorted(Path(path) for path in paths)
+                            continue
+                        new_key = (size, digest)
+                        left[new_key] = len(paths)
+                        tasks.extendleft((new_key, path) for path in paths)
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _batch(self, tasks):
+        """
+        Take tasks for a single worker call - up to BATCH files or about
+        CHUNK * BATCH bytes to read.
+        """
+
+        batch = []
+        nbytes = 0
+        while tasks and len(batch) < self.BATCH and \
+                nbytes < self.CHUNK * self.BATCH:
+            key, path = tasks.popleft()
+            batch.append((key, path))
+            nbytes += key[0] if len(key) > 1 else 2 * self.EDGE
+        return batch
+
+
+class DuplicateJob:
+    """
+    Duplicate search running on a daemon thread. Found groups are collected
+    by poll.
+
+    Parameters
+    ---------------
+    finder : DuplicateFinder
+    roots : iterable
+        searched dir paths
+
+    Attributes
+    ---------------
+    done : threading.Event
+        set once the search finished or was cancelled
+    error : OSError or None
+        error that stopped the search
+    """
+
+    def __init__(self, finder, roots):
+        self.finder = finder
+        self.done = threading.Event()
+        self.error = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._found = []
+        self._groups = finder.find(roots, self._stop)
+
+    def start(self):
+        """
+        Start searching.
+
+        Returns
+        ---------------
+        DuplicateJob
+            self
+        """
+
+        threading.Thread(
+            target=self._run, name="duplicates", daemon=True
+        ).start()
+        return self
+
+    def _run(self):
+        try:
+            for group in self._groups:
+                with self._lock:
+                    self._found.append(group)
+        except OSError as e:
+            self.error = e
+        finally:
+            self._groups.close()
+            self.done.set()
+
+    def poll(self):
+        """
+        Return groups found since the last call.
+
+        Returns
+        ---------------
+        list
+            lists of Path objects
+        """
+
+        with self._lock:
+            found, self._found = self._found, []
+        return found
+
+    def cancel(self):
+        """
+        Stop searching. Groups found so far can still be polled.
+        """
+
+        self._stop.set()
+
+
+def _split(items):
+    """
+    Group paths by digest, return (digest, paths) of groups of at least two.
+    """
+
+    groups = {}
+    for digest, path in items:
+        groups.setdefault(digest, []).append(path)
+    return [(digest, paths) for digest, paths in groups.items()
+            if len(paths) > 1]
+
+
+def _hash_batch(items, edge, chunk):
+    """
+    Hash (path, stage key) items in a worker, return (digest, bytes read)
+    of every item. Key (size,) stands for the edge stage, (size, digest)
+    for the full content.
+    """
+
+    return [
+        _hash_edges(path, key[0], edge) if len(key) == 1
+        else _hash_file(path, chunk)
+        for path, key in items
+    ]
+
+
+def _hash_edges(path, size, edge):
+    """
+    Return hash of the first and last edge bytes and number of bytes read,
+    (None, 0) if the file can't be read.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            if size <= 2 * edge:
+                data = f.read()
+                digest.update(data)
+                return digest.digest(), len(data)
+            head = f.read(edge)
+            f.seek(-edge, os.SEEK_END)
+            tail = f.read(edge)
+    except OSError:
+        return None, 0
+    digest.update(head)
+    digest.update(tail)
+    return digest.digest(), len(head) + len(tail)
+
+
+def _hash_file(path, chunk):
+    """
+    Return hash of the whole file and number of bytes read, (None, 0) if the
+    file can't be read.
+    """
+
+    digest = hashlib.blake2b()
+    nbytes = 0
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(chunk), b""):
+                digest.update(block)
+                nbytes += len(block)
+    except OSError:
+        return None, 0
+    return digest.digest(), nbytes
@@ -1,8 +1,16 @@
+import logging
 import os
-import time
+import stat
 from pathlib import Path
 
-from explorer import FileExplorer, Cache
+from explorer import (
+    FileExplorer, Cache, ListingCache, TransferJob, TransferEngine, Trash,
+    Journal, RenameTemplate, SearchIndex, Watcher, SizeService,
+    DuplicateFinder, DuplicateJob, ColumnSet
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 class Facade:
@@ -13,6 +21,22 @@ class Facade:
     ---------------
     fe : FileExplorer
     cache : Cache
+    listings : ListingCache
+        directory listings shared by content display and path lookups
+    transfers : TransferEngine
+        runs copy/move jobs in the background
+    trash : Trash
+        holds deleted objects until they are purged
+    journal : Journal or None
+        on-disk log of cached actions, restored on startup
+    index : SearchIndex or None
+        file/dir names under the searched root
+    watcher : Watcher
+        reports changes of displayed directories made by other processes
+    sizes : SizeService
+        computes and caches recursive directory sizes
+    columns : ColumnSet
+        metadata columns computed on demand by get_cells
     current_obj : list
         list of object awaiting further action - copy/move
     last_undo: None or dict
@@ -21,12 +45,244 @@ class Facade:
         last redone action. Prevent redo loops
     """
 
-    def __init__(self):
+    # predefined rename_many prefixes/suffixes
+    AFFIXES = {
+        "%today%": "{today:%Y%m%d}",
+        "%creationd%": "{ctime:%Y%m%d}",
+        "%creationdt%": "{ctime:%Y%m%d%H%M%S}"
+    }
+
+    def __init__(self, listing_budget=64 * 2 ** 20, trash_bytes=10 * 2 ** 30,
+                 trash_age=30 * 24 * 3600, history=100,
+                 history_bytes=64 * 2 ** 20, journal=None):
         self.fe = FileExplorer()
-        self.cache = Cache()
+        self.cache = Cache(history, history_bytes)
+        self.listings = ListingCache(self._load, listing_budget)
+        self.transfers = TransferEngine()
+        self.trash = Trash(trash_bytes, trash_age)
         self.current_obj = []
         self.last_undo = None
         self.last_redo = None
+        self.journal = None
+        self.index = None
+        self.watcher = Watcher()
+        self.sizes = SizeService()
+        self.columns = ColumnSet()
+        if journal is not None:
+            self.journal = journal if isinstance(journal, Journal) \
+                else Journal(journal)
+            self.recover()
+
+    def recover(self):
+        """
+        Rebuild cache from the journal. Items of interrupted batches are
+        checked at the targets logged with their intents - finished moves
+        and deletes are kept, partial copies are removed, renames are
+        either completed or rolled back as a whole and objects trashed by an
+        interrupted redo are restored.
+        """
+
+        events, interrupted = self.journal.history()
+        for batch, items, pending in interrupted:
+            resolved = self._resolve(pending)
+            self.journal.finish(batch, resolved, done=bool(items))
+        if interrupted:
+            events, interrupted = self.journal.history()
+        self.last_undo, self.last_redo = self.cache.rebuild(events)
+        self._compact()
+
+    def _resolve(self, pending):
+        """
+        Find out what happened to unfinished items of an interrupted batch.
+        Only logged targets are touched, items without one are left alone.
+
+        Parameters
+        ---------------
+        pending : list
+            (index, intent) pairs returned by Journal.history
+
+        Returns
+        ---------------
+        dict
+            item index: cache item of every item kept as done
+        """
+
+        resolved = {}
+        renames = []
+        for i, intent in pending:
+            if intent["target"] is None:
+                continue
+            if intent["func"] == "rename":
+                renames.append((i, intent))
+                continue
+            try:
+                item = self._resolve_item(intent)
+            except OSError as e:
+                logger.warning("could not recover %s: %s", intent, e)
+                item = None
+            if item:
+                resolved[i] = item
+        if renames:
+            resolved.update(self._resolve_renames(renames))
+        return resolved
+
+    def _resolve_item(self, intent):
+        """
+        Keep or roll back an interrupted copy, move or delete. Redo is
+        always rolled back.
+
+        Returns
+        ---------------
+        dict or None
+            cache item if the object at the target is kept
+        """
+
+        func = intent["func"]
+        src = Path(intent["src"])
+        target = Path(intent["target"])
+        item = {"src": src, "func": func, "dst": intent["dst"],
+                "new_obj": target}
+        if not os.path.lexists(target):
+            if func in ("delete", "redo"):
+                # item dir created before the object was renamed into it
+                _rmdir(target.parent)
+            return None
+        if func == "redo":
+            self.trash.restore(target, src)
+            return None
+        if func == "delete" or not os.path.lexists(src):
+            # a copy without its source is kept too, it may be the only one
+            return item
+        src_st = os.lstat(src)
+        if func == "move" and stat.S_ISDIR(src_st.st_mode) and \
+                src_st.st_dev != os.lstat(target).st_dev:
+            # source tree might be partly removed, undo it as a copy
+            return dict(item, func="copy")
+        # src is intact, target is a partial copy or an empty placeholder
+        self.fe.rm(target)
+        return None
+
+    def _resolve_renames(self, renames):
+        """
+        Find renamed objects by their identity. Keep the batch if all of
+        them got their new names, otherwise rename them back.
+
+        Returns
+        ---------------
+        dict
+            item index: cache item, empty if the renames were rolled back
+        """
+
+        located = []
+        for i, intent in renames:
+            src = Path(intent["src"])
+            target = Path(intent["target"])
+            x = intent["x"] or {}
+            candidates = [target, src]
+            if x.get("temp"):
+                candidates.append(src.parent / x["temp"])
+            path = None
+            if "ino" in x:
+                path = next(
+                    (p for p in candidates if _identical(p, x)), None
+                )
+            located.append((i, intent, path))
+        if all(path == Path(intent["target"])
+               for i, intent, path in located):
+            return {
+                i: {"src": Path(intent["src"]), "func": "rename",
+                    "dst": intent["dst"], "new_obj": path}
+                for i, intent, path in located
+            }
+        by_parent = {}
+        for i, intent, path in located:
+            src = Path(intent["src"])
+            if path is not None and path != src:
+                by_parent.setdefault(src.parent, []).append(
+                    (path.name, src.name)
+                )
+        for parent, pairs in by_parent.items():
+            try:
+                self.fe.renamer.rename(parent, pairs)
+            except (OSError, ValueError) as e:
+                logger.warning("could not roll back renames in %s: %s",
+                               parent, e)
+        return {}
+
+    def _compact(self):
+        """
+        Rewrite the journal with cached actions only. Skipped while
+        transfers are running.
+        """
+
+        if self.journal is None or self.transfers.active:
+            return
+        items = self.cache.items
+        events = [("store", list(action)) for action in items]
+        if items:
+            current = self.cache.current
+            events += [("undo", None)] * (len(items) - 1 - current)
+            if self.last_undo is not None and \
+                    self.last_undo is self.cache.get_current():
+                events.append(("undo", None))
+            elif current == len(items) - 1 and self.last_redo is not None \
+                    and self.last_redo is self.cache.get_current():
+                events.append(("redo", None))
+        self.journal.compact(events)
+
+    def _begin(self, func, pairs, targets=None):
+        if self.journal:
+            return self.journal.begin(func, pairs, targets)
+        return None
+
+    def _begin_renames(self, pairs, targets, temps=None):
+        """
+        Log intents of renames with identities of the renamed objects, so
+        recovery can find them under any of their names.
+
+        Parameters
+        ---------------
+        pairs : list
+            (src, dst) pairs
+        targets : list
+            new paths
+        temps : dict, default=None
+            src name: temporary name used by BulkRenamer
+        """
+
+        if not self.journal:
+            return None
+        extra = []
+        for src, dst in pairs:
+            st = os.lstat(src)
+            x = {"dev": st.st_dev, "ino": st.st_ino}
+            if temps and src.name in temps:
+                x["temp"] = temps[src.name]
+            extra.append(x)
+        return self.journal.begin("rename", pairs, targets, extra)
+
+    def _done(self, batch, i, item):
+        if self.journal:
+            self.journal.done(batch, i, item)
+
+    def _commit(self, batch, items):
+        """
+        Cache items of a finished batch and log it in the journal.
+        """
+
+        if items:
+            self.cache.store(items)
+        self._close_batch(batch, bool(items))
+
+    def _close_batch(self, batch, stored):
+        if self.journal is None or batch is None:
+            return
+        if stored:
+            self.journal.commit(batch)
+        else:
+            self.journal.abort(batch)
+        if self.journal.records > self.journal.max_records:
+            self._compact()
 
     def get_default_dir(self):
         """
@@ -53,7 +309,36 @@ class Facade:
         Returns
         ---------------
         list
-            list of tuples with filename, modification datetime and obj type
+            tuples with filename, empty modification datetime, obj type,
+            empty size, modification timestamp and size in bytes (None for
+            dirs). Displayed metadata is computed by get_cells
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If path is not a directory
+        """
+
+        listing = self.listings.get(path)
+        return [self._get_row(entry) for entry in listing.values()]
+
+    def iter_content(self, path, chunk_size=500):
+        """
+        Get directory content in batches, so it can be displayed before the
+        whole directory is read.
+
+        Parameters
+        ---------------
+        path : Path or str
+            dir path
+        chunk_size : int, default=500
+            max number of rows in a single batch
+
+        Returns
+        ---------------
+        generator
+            yields lists of tuples like get_content. Call close() to stop
+            reading the directory.
 
         Raises
         ---------------
@@ -61,15 +346,103 @@ class Facade:
             If path is not a directory
         """
 
+        listing, sig = self.listings.lookup(path)
+        if listing is not None:
+            entries = list(listing.values())
+            return (
+                [self._get_row(entry)
+                 for entry in entries[i:i + chunk_size]]
+                for i in range(0, len(entries), chunk_size)
+            )
+        chunks = self.fe.iter_content(path, chunk_size)
+        return self._stream(path, sig, chunks)
+
+    def _stream(self, path, sig, chunks):
+        """
+        Format streamed batches and cache the listing once it is complete.
+        """
+
+        entries = []
+        for chunk in chunks:
+            entries.extend(chunk)
+            yield [self._get_row(entry) for entry in chunk]
+        self.listings.store(path, sig, entries)
+
+    def _load(self, path):
+        """
+        Read directory content for the listing cache.
+        """
+
         content = self.fe.get_content(path)
-        form = "%Y/%m/%d %H:%M:%S"
-        result = []
-        for type, objects in content.items():
-            for obj in objects:
-                mt = time.strftime(form, time.localtime(os.path.getmtime(obj)))
-                row = obj.name, mt, type
-                result.append(row)
-        return result
+        return [entry for entries in content.values() for entry in entries]
+
+    def _get_row(self, entry):
+        """
+        Format a listing entry for display.
+
+        Parameters
+        ---------------
+        entry : Entry
+            directory entry
+
+        Returns
+        ---------------
+        tuple
+            filename, empty modification datetime, obj type and empty size
+            (both filled by get_cells), followed by raw values used as sort
+            keys - modification timestamp and size in bytes. Size of a dir
+            is None, sizes are computed with request_sizes
+        """
+
+        size = None if entry.type == "dirs" else entry.size
+        return (entry.name, "", entry.type, "", entry.mtime, size)
+
+    def get_cells(self, path, names, titles):
+        """
+        Compute metadata columns of selected directory children, e.g. rows
+        scrolled into view. Values are memoized per listing entry.
+
+        Parameters
+        ---------------
+        path : str or Path
+            parent dir path
+        names : iterable
+            file/dir names
+        titles : iterable
+            titles of columns registered in columns
+
+        Returns
+        ---------------
+        dict
+            name: {title: formatted value}, names that no longer exist are
+            left out
+
+        Raises
+        ---------------
+        KeyError
+            If a title is not registered
+        """
+
+        names = list(names)
+        entries = self.listings.find_many(path, names)
+        found = [entry for entry in entries if entry is not None]
+        cells = self.columns.cells(path, found, titles)
+        if "Size" in titles:
+            # dir sizes change without their entry, so they aren't memoized
+            for entry, values in zip(found, cells):
+                if entry.type == "dirs":
+                    values["Size"] = self.format_size(
+                        self.sizes.size(os.path.join(path, entry.name))
+                    )
+        return {entry.name: values for entry, values in zip(found, cells)}
+
+    @staticmethod
+    def format_size(size):
+        """
+        Format a size in bytes for display, see ColumnSet.format_size.
+        """
+
+        return ColumnSet.format_size(size)
 
     def get_parent(self, path):
         """
@@ -105,21 +478,39 @@ class Facade:
         ---------------
         dst : str
             path to destination dir
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
         """
 
-        items = []
-        if self.current_obj:
-            for obj in self.current_obj:
-                src = obj["src"]
-                new_obj = getattr(self.fe, obj["func"])(src, dst)
-                item = {
-                    "src": src,
-                    "func": obj["func"],
-                    "dst": Path(dst),
-                    "new_obj": new_obj
-                }
-                items.append(item)
-        self.cache.store(items)
+        job = self._paste_job(dst)
+        job.run()
+        return self._finish(job, raise_error=True)
+
+    def submit_paste(self, dst):
+        """
+        Paste copied objects on a worker thread. The action is cached once
+        the job is collected by poll_transfers.
+
+        Parameters
+        ---------------
+        dst : str
+            path to destination dir
+
+        Returns
+        ---------------
+        TransferJob
+            running job, exposes progress counters
+        """
+
+        return self.transfers.submit(self._paste_job(dst))
+
+    def _paste_job(self, dst):
+        func = self.current_obj[0]["func"] if self.current_obj else "copy"
+        items = [(obj["src"], dst) for obj in self.current_obj]
+        return TransferJob(self.fe, func, items, self.journal)
 
     def is_valid_path(self, path):
         return Path(path).is_dir()
@@ -142,9 +533,10 @@ class Facade:
         """
 
         current = []
-        for name in objs["names"]:
+        entries = self.listings.find_many(objs["parent"], objs["names"])
+        for name, entry in zip(objs["names"], entries):
             path = Path(objs["parent"]) / str(name)
-            if path.exists():
+            if entry:
                 current.append({"src": path, "func": objs["func"]})
             else:
                 raise FileNotFoundError("Target does not exist")
@@ -163,20 +555,75 @@ class Facade:
             dst: path to destination dir
             func : {move, copy}
                 file operation intended for src file
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
         """
 
-        items = []
-        for name in objs["names"]:
-            src = Path(objs["src"]) / str(name)
-            new_obj = getattr(self.fe, objs["func"])(src, objs["dst"])
-            item = {
-                "src": src,
-                "func": objs["func"],
-                "dst": Path(objs["dst"]),
-                "new_obj": new_obj
-            }
-            items.append(item)
-        self.cache.store(items)
+        job = self._transfer_job(objs)
+        job.run()
+        return self._finish(job, raise_error=True)
+
+    def submit_transfer(self, objs):
+        """
+        Transfer objects on a worker thread. The action is cached once the
+        job is collected by poll_transfers.
+
+        Parameters
+        ---------------
+        objs: dict
+            see transfer
+
+        Returns
+        ---------------
+        TransferJob
+            running job, exposes progress counters
+        """
+
+        return self.transfers.submit(self._transfer_job(objs))
+
+    def _transfer_job(self, objs):
+        items = [
+            (Path(objs["src"]) / str(name), objs["dst"])
+            for name in objs["names"]
+        ]
+        return TransferJob(self.fe, objs["func"], items, self.journal)
+
+    def poll_transfers(self):
+        """
+        Collect finished background transfers and cache their actions. Should
+        be called periodically from the GUI thread.
+
+        Returns
+        ---------------
+        list
+            finished TransferJob objects. job.touched holds modified dirs,
+            job.error the exception that stopped the job, if any
+        """
+
+        finished = self.transfers.poll()
+        for job in finished:
+            self._finish(job)
+        return finished
+
+    def _finish(self, job, raise_error=False):
+        """
+        Cache items transferred by a finished job, even if some of them
+        failed.
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
+        """
+
+        self._commit(job.batch, job.results)
+        job.touched = self._touched(job.touched)
+        if raise_error and job.error:
+            raise job.error
+        return job.touched
 
     def rename(self, directory, name, new_name):
         """
@@ -190,49 +637,155 @@ class Facade:
             name of file/directory to be renamed
         new_name : str
             new name for file or directory. File should not contain extension
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
         """
 
         src = Path(directory) / str(name)
         if src.exists():
             dst = Path(directory) / str(new_name)
-            new_obj = self.fe.rename(src, dst)
+            target = src.parent / self.fe.new_name(src, dst)
+            batch = self._begin_renames([(src, dst)], [target])
+            try:
+                new_obj = self.fe.rename(src, dst)
+            except OSError:
+                self._commit(batch, [])
+                raise
             item = {
                 "src": src,
                 "func": "rename",
                 "dst": Path(dst),
                 "new_obj": new_obj
             }
-            self.cache.store([item])
+            self._done(batch, 0, item)
+            self._commit(batch, [item])
+            return self._touched({directory})
         else:
             raise FileNotFoundError("Invalid source directory path")
 
-    def delete(self, objs):
+    def delete(self, objs, permanent=False):
         """
-        Permanently files or directories.
+        Move files or directories to trash and cache action. Delete them
+        permanently if permanent is True.
 
         Parameters
         ---------------
         objs: dict
             parent: parent directory
             names: src file/dir names selected
+        permanent : bool, default=False
+            remove objects instead of moving them to trash. Can't be undone
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
+        """
+
+        parent = Path(objs["parent"])
+        entries = self.listings.find_many(objs["parent"], objs["names"])
+        targets = [
+            parent / str(name)
+            for name, entry in zip(objs["names"], entries) if entry
+        ]
+        self._delete(targets, permanent)
+        return self._touched({objs["parent"]})
+
+    def delete_paths(self, paths, permanent=False):
+        """
+        Delete objects of different directories as a single action.
+
+        Parameters
+        ---------------
+        paths : iterable
+            file/dir paths, missing ones are skipped
+        permanent : bool, default=False
+            remove objects instead of moving them to trash. Can't be undone
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
         """
 
-        for name in objs["names"]:
-            target = Path(objs["parent"]) / str(name)
-            if target.exists():
+        targets = [Path(path) for path in paths if os.path.lexists(path)]
+        self._delete(targets, permanent)
+        return self._touched({target.parent for target in targets})
+
+    def _delete(self, targets, permanent):
+        if permanent:
+            for target in targets:
                 self.fe.rm(target)
+            return
+        items = []
+        pairs = [(target, target.parent) for target in targets]
+        trashed = None
+        if self.journal:
+            # trash paths are logged, so recovery knows where to look
+            trashed = [self._reserve(target) for target in targets]
+        batch = self._begin("delete", pairs, trashed)
+        try:
+            for i, target in enumerate(targets):
+                if trashed:
+                    new_obj = self.trash.put(target, trashed[i])
+                else:
+                    new_obj = self.trash.put(target)
+                item = {
+                    "src": target,
+                    "func": "delete",
+                    "dst": target.parent,
+                    "new_obj": new_obj
+                }
+                items.append(item)
+                self._done(batch, i, item)
+        finally:
+            self._commit(batch, items)
+
+    def _reserve(self, target):
+        """
+        Pick trash path of a deleted object, None if it can't be trashed -
+        put raises the error once the object's turn comes.
+        """
+
+        try:
+            return self.trash.reserve(target)
+        except (OSError, ValueError):
+            return None
 
     def undo(self):
         """
         Undo an action.
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
         """
 
+        touched = set()
         actions = self.cache.get_current()
         if actions and actions != self.last_undo:
+            renames = {}
             for action in actions:
+                if action["func"].lower() == "rename":
+                    new_obj = Path(action["new_obj"])
+                    renames.setdefault(new_obj.parent, []).append(
+                        (new_obj.name, Path(action["src"]).name)
+                    )
+                    touched.add(new_obj.parent)
+                    continue
+                if action["func"].lower() == "delete":
+                    self.trash.restore(action["new_obj"], action["src"])
+                    touched.add(Path(action["src"]).parent)
+                    continue
+                touched.add(Path(action["new_obj"]).parent)
                 if action["func"].lower() == "copy":
                     self.fe.rm(action["new_obj"])
                 elif action["func"].lower() == "move":
+                    touched.add(Path(action["src"]).parent)
                     src = action["new_obj"]
                     dst = action["src"].parent
                     new_name = src.stem
@@ -240,29 +793,334 @@ class Facade:
                     moved_file = self.fe.move(src, dst)
                     if prev_name != new_name:
                         self.fe.rename(moved_file, prev_name)
-                elif action["func"].lower() == "rename":
-                    src = action["new_obj"]
-                    prev_name = action["src"].stem
-                    self.fe.rename(src, prev_name)
+            self._rename_batches(renames)
             self.last_undo = actions
             self.last_redo = None
+            if self.journal:
+                self.journal.mark("undo")
         self.cache.undo()
+        return self._touched(touched)
 
     def redo(self):
         """
         Redo an undone action.
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
         """
 
+        touched = set()
         actions = self.cache.get_current()
         if actions and actions != self.last_redo:
-            for action in actions:
-                func = action["func"]
-                src = action["src"]
-                dst = action["dst"]
-                getattr(self.fe, func)(src, dst)
+            renames = {}
+            trashed = {}
+            targets, batch = self._begin_redo(actions)
+            try:
+                for i, action in enumerate(actions):
+                    func = action["func"]
+                    src = action["src"]
+                    dst = action["dst"]
+                    touched.add(Path(src).parent)
+                    if func == "delete":
+                        if targets[i]:
+                            new_obj = self.trash.put(src, targets[i])
+                        else:
+                            new_obj = self.trash.put(src)
+                        trashed[i] = dict(action, new_obj=new_obj)
+                        continue
+                    if func == "rename":
+                        renames.setdefault(Path(src).parent, []).append(
+                            (Path(src).name, Path(action["new_obj"]).name)
+                        )
+                        continue
+                    touched.add(Path(dst))
+                    getattr(self.fe, func)(src, dst)
+                self._rename_batches(renames)
+            except BaseException:
+                self._close_batch(batch, False)
+                raise
+            if trashed:
+                # new trash paths, packed once so old ones are dropped
+                actions = self.cache.replace([
+                    trashed.get(i, action) for i, action in enumerate(actions)
+                ])
             self.last_undo = None
             self.last_redo = actions
+            if batch is not None:
+                self.journal.commit(batch)
+            elif self.journal:
+                self.journal.mark("redo")
         self.cache.redo()
+        return self._touched(touched)
+
+    def _begin_redo(self, actions):
+        """
+        Reserve new trash paths of redone deletes and log them as a redo
+        batch, so recovery and rebuild know where the objects end up.
+
+        Returns
+        ---------------
+        tuple
+            list of trash paths (None for other items), batch id or None if
+            there is nothing to log
+        """
+
+        targets = [None] * len(actions)
+        if not self.journal:
+            return targets, None
+        for i, action in enumerate(actions):
+            if action["func"] == "delete":
+                targets[i] = self._reserve(action["src"])
+        if not any(targets):
+            return targets, None
+        pairs = [(action["src"], action["dst"]) for action in actions]
+        return targets, self.journal.begin("redo", pairs, targets)
+
+    def _rename_batches(self, renames):
+        """
+        Rename objects of every dir as a single batch.
+
+        Parameters
+        ---------------
+        renames : dict
+            dir path: list of (name, new_name) pairs
+        """
+
+        for parent, pairs in renames.items():
+            self.fe.renamer.rename(parent, pairs)
+
+    def _touched(self, dirs):
+        """
+        Drop cached listings of modified directories.
+
+        Parameters
+        ---------------
+        dirs : iterable
+            paths of modified directories
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
+        """
+
+        touched = {Path(directory) for directory in dirs}
+        index = self.index
+        for directory in touched:
+            self.listings.invalidate(directory)
+            self.sizes.invalidate(directory)
+            if index is not None and index.ready.is_set():
+                index.update(directory)
+        return touched
+
+    def watch(self, path):
+        """
+        Report changes of a displayed directory by poll_changes. Every call
+        has to be matched by unwatch.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Returns
+        ---------------
+        bool
+            False if the directory can't be watched
+        """
+
+        try:
+            self.watcher.watch(path)
+        except OSError as e:
+            logger.warning("Can't watch %s: %s", path, e)
+            return False
+        return True
+
+    def unwatch(self, path):
+        """
+        Stop reporting changes of a directory no longer displayed.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+        """
+
+        self.watcher.unwatch(path)
+
+    def poll_changes(self):
+        """
+        Collect changes of watched directories made since the last call. Only
+        changed objects are read, unless the watcher lost track of a dir.
+
+        Returns
+        ---------------
+        dict
+            dir Path: (rows, removed) - rows of added/modified objects and a
+            set of removed names. removed is None if rows hold the whole
+            listing instead
+        """
+
+        changes = {}
+        index = self.index
+        for directory, names in self.watcher.changes().items():
+            self.listings.invalidate(directory)
+            self.sizes.invalidate(directory)
+            if index is not None and index.ready.is_set():
+                index.update(directory, names)
+            if names is None:
+                try:
+                    changes[directory] = (self.get_content(directory), None)
+                except OSError:
+                    changes[directory] = ([], None)
+                continue
+            names = sorted(names)
+            rows, removed, dirs = [], set(), []
+            entries = self.listings.find_many(directory, names)
+            for name, entry in zip(names, entries):
+                if entry is None:
+                    removed.add(name)
+                    continue
+                rows.append(self._get_row(entry))
+                if entry.type == "dirs":
+                    dirs.append(name)
+            if dirs:
+                self.sizes.request(directory, dirs)
+            changes[directory] = (rows, removed)
+        return changes
+
+    def request_sizes(self, path, names):
+        """
+        Compute sizes of subdirectories in the background. Collect them with
+        poll_sizes.
+
+        Parameters
+        ---------------
+        path : str or Path
+            parent dir path
+        names : iterable
+            subdirectory names
+        """
+
+        self.sizes.request(path, names)
+
+    def poll_sizes(self):
+        """
+        Collect directory sizes computed since the last call.
+
+        Returns
+        ---------------
+        dict
+            parent dir Path: {name: size in bytes}
+        """
+
+        sizes = {}
+        for directory, name, size in self.sizes.results():
+            sizes.setdefault(directory, {})[name] = size
+        return sizes
+
+    def find_duplicates(self, roots):
+        """
+        Search directory trees for files with equal content in the
+        background. Delete selected duplicates with delete_paths.
+
+        Parameters
+        ---------------
+        roots : iterable
+            searched dir paths
+
+        Returns
+        ---------------
+        DuplicateJob
+            started search, poll() returns lists of Path objects of equal
+            files found so far
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If a root is not a directory
+        """
+
+        return DuplicateJob(DuplicateFinder(), roots).start()
+
+    def build_index(self, root, wait=False):
+        """
+        Start indexing names under root for search. An index of the same
+        root is reused, it is kept up to date by actions of this explorer.
+
+        Parameters
+        ---------------
+        root : str or Path
+            searched dir
+        wait : bool, default=False
+            build before returning instead of on a background thread
+
+        Returns
+        ---------------
+        SearchIndex
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If root is not a directory
+        """
+
+        root = Path(os.path.abspath(root))
+        if not root.is_dir():
+            raise FileNotFoundError("Invalid search directory path")
+        if self.index is None or self.index.root != root:
+            self.index = SearchIndex(root)
+            if wait:
+                self.index.build()
+            else:
+                self.index.start()
+        elif wait:
+            self.index.ready.wait()
+        return self.index
+
+    def search(self, query, mode="substring", chunk_size=500):
+        """
+        Find objects under the indexed root, so results can be displayed
+        while the search goes on.
+
+        Parameters
+        ---------------
+        query : str
+            searched text, glob pattern or regular expression
+        mode : {substring, glob, regex}, default=substring
+            query type
+        chunk_size : int, default=500
+            max number of hits in a single batch
+
+        Returns
+        ---------------
+        generator
+            yields lists of Hit objects
+
+        Raises
+        ---------------
+        RuntimeError
+            If there is no index or it is still being built
+        ValueError
+            If mode is unknown or the regular expression is invalid
+        """
+
+        if self.index is None or not self.index.ready.is_set():
+            raise RuntimeError("Search index is not ready")
+        hits = self.index.search(query, mode)
+        return self._batches(hits, chunk_size)
+
+    def _batches(self, hits, chunk_size):
+        batch = []
+        for hit in hits:
+            batch.append(hit)
+            if len(batch) == chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
     def clear_cache(self):
         """
@@ -273,6 +1131,8 @@ class Facade:
         self.last_redo = None
         self.last_undo = None
         self.cache.clear()
+        if self.journal:
+            self.journal.mark("clear")
 
     def open(self, directory, name):
         """
@@ -294,6 +1154,8 @@ class Facade:
         """
         Rename many objects using custom or predefined prefix/suffix. All files
         will have their indexes added after new_name (except the first one).
+        New names are planned together, so objects may swap or shift names.
+        If any rename fails, none of them is kept.
         Prefedined prefix/suffix:
         %today%: return current date. Format "%Y%m%d"
         %creationd%: return src creation date. Format "%Y%m%d"
@@ -308,49 +1170,181 @@ class Facade:
             new name for file or directory. File should not contain extension.
         prefix: str, default=None
             add before new_name- path/prefix_new_name
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
+        """
+
+        entries = self._entries(objs["parent"], objs["names"])
+        prefix = self._affix(prefix)
+        suffix = self._affix(suffix)
+        pairs = []
+        for i, (name, entry) in enumerate(zip(objs["names"], entries)):
+            dst_name = str(new_name) if i == 0 else f"{new_name}_{i}"
+            pairs.append((str(name), self.fe.new_name(
+                str(name), dst_name,
+                prefix.render(i, entry) if prefix else None,
+                suffix.render(i, entry) if suffix else None
+            )))
+        return self._rename_pairs(objs["parent"], pairs)
+
+    def _affix(self, value):
+        """
+        Compile rename_many prefix/suffix.
+        """
+
+        if not value:
+            return None
+        if value in self.AFFIXES:
+            return RenameTemplate(self.AFFIXES[value])
+        return RenameTemplate.literal(value)
+
+    def rename_template(self, objs, template, pattern=None, start=1):
+        """
+        Rename many objects with a template, see RenameTemplate. Extensions
+        are kept.
+
+        Parameters
+        ---------------
+        objs: dict
+            parent: parent directory
+            names: src file/dir names selected
+        template : str or RenameTemplate
+            new name template
+        pattern : str, default=None
+            regular expression for capture group fields, ignored if
+            template is compiled
+        start : int, default=1
+            first counter value, ignored if template is compiled
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
+
+        Raises
+        ---------------
+        ValueError
+            If the template is invalid or gives an empty name
+        """
+
+        template = self._template(template, pattern, start)
+        entries = self._entries(objs["parent"], objs["names"])
+        pairs = list(zip(map(str, objs["names"]), template.names(entries)))
+        for name, new in pairs:
+            if new == Path(name).suffix:
+                raise ValueError(f"Template gives an empty name for {name}")
+        return self._rename_pairs(objs["parent"], pairs)
+
+    def preview_rename(self, objs, template, first=0, count=50, pattern=None,
+                       start=1):
+        """
+        Compute new names of a slice of the selection only, so a preview of
+        a huge selection costs as much as the rows displayed.
+
+        Parameters
+        ---------------
+        objs: dict
+            parent: parent directory
+            names: src file/dir names selected
+        template : str or RenameTemplate
+            new name template
+        first : int, default=0
+            index of the first previewed object
+        count : int, default=50
+            max number of previewed objects
+        pattern : str, default=None
+            see rename_template
+        start : int, default=1
+            see rename_template
+
+        Returns
+        ---------------
+        list
+            (name, new_name) tuples
+        """
+
+        template = self._template(template, pattern, start)
+        names = [str(name) for name in objs["names"][first:first + count]]
+        entries = self._entries(objs["parent"], names)
+        return list(zip(names, template.names(entries, first)))
+
+    def _template(self, template, pattern, start):
+        if isinstance(template, RenameTemplate):
+            return template
+        return RenameTemplate(template, pattern, start)
+
+    def _entries(self, parent, names):
+        """
+        Return metadata of parent dir children from a single listing.
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If any of the objects does not exist
+        """
+
+        listing = self.listings.get(parent)
+        entries = []
+        for name in names:
+            entry = listing.get(str(name))
+            if entry is None:
+                raise FileNotFoundError(f"{name} does not exist")
+            entries.append(entry)
+        return entries
+
+    def _rename_pairs(self, parent, pairs):
         """
+        Rename objects of a dir as one planned batch and cache the action.
 
+        Parameters
+        ---------------
+        parent : str or Path
+            parent directory
+        pairs : list
+            (name, new_name) pairs
+
+        Returns
+        ---------------
+        set
+            Path objects of modified directories
+        """
+
+        plan = self.fe.renamer.plan(parent, pairs)
+        parent = Path(parent)
         items = []
-        for i, name in enumerate(objs["names"]):
+        pairs = [(parent / name, Path(new).stem) for name, new in plan.pairs]
+        batch = self._begin_renames(
+            pairs, [parent / new for name, new in plan.pairs],
+            dict(plan.steps[:plan.temps])
+        )
+        try:
+            for i, (src, new_obj) in enumerate(self.fe.renamer.run(plan)):
+                item = {
+                    "src": src,
+                    "func": "rename",
+                    "dst": new_obj.stem,
+                    "new_obj": new_obj
+                }
+                items.append(item)
+                self._done(batch, i, item)
+        finally:
+            self._commit(batch, items)
+        return self._touched({parent})
 
-            dst_name = str(new_name) if i == 0 else f"{new_name}_{i}"
-            src = Path(objs["parent"]) / str(name)
-            dst = Path(objs["parent"]) / str(dst_name)
-
-            if prefix == "%today%":
-                d_format = "%Y%m%d"
-                prefix = time.strftime(d_format, time.localtime())
-            elif prefix == "%creationd%":
-                d_format = "%Y%m%d"
-                prefix = time.strftime(
-                    d_format, time.localtime(os.path.getctime(src))
-                )
-            elif prefix == "%creationdt%":
-                dt_format = "%Y%m%d%H%M%S"
-                prefix = time.strftime(
-                    dt_format, time.localtime(os.path.getctime(src))
-                )
 
-            if suffix == "%today%":
-                d_format = "%Y%m%d"
-                suffix = time.strftime(d_format, time.localtime())
-            elif suffix == "%creationd%":
-                d_format = "%Y%m%d"
-                suffix = time.strftime(
-                    d_format, time.localtime(os.path.getctime(src))
-                )
-            elif suffix == "%creationdt%":
-                dt_format = "%Y%m%d%H%M%S"
-                suffix = time.strftime(
-                    dt_format, time.localtime(os.path.getctime(src))
-                )
+def _rmdir(path):
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
 
-            new_obj = self.fe.rename(src, dst, prefix, suffix)
-            item = {
-                "src": src,
-                "func": "rename",
-                "dst": new_obj.stem,
-                "new_obj": new_obj
-            }
-            items.append(item)
-        self.cache.store(items)
+
+def _identical(path, ids):
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return st.st_dev == ids["dev"] and st.st_ino == ids["ino"]
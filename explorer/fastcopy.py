@@ -0,0 +1,177 @@
+import errno
+import logging
+import os
+import shutil
+import stat
+import threading
+from collections import Counter, deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# ioctl(dst_fd, FICLONE, src_fd) - share extents on CoW filesystems
+FICLONE = 0x40049409
+
+# errors meaning "this mechanism can't be used here", not "the copy failed"
+FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+    errno.ENOTTY, errno.EBADF, errno.ENOTSOCK, errno.EPERM,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)
+}
+
+
+class FileCopier:
+    """
+    Copy file data with the cheapest mechanism available: FICLONE reflink,
+    os.copy_file_range, os.sendfile and a buffered read/write as the last
+    resort. The strategy used is recorded for every file.
+
+    Parameters
+    ---------------
+    buffer_size : int, default=1 MiB
+        buffer size of the buffered fallback
+    history : int, default=1000
+        number of recent (dst, strategy) records kept in recent
+
+    Attributes
+    ---------------
+    counts : Counter
+        strategy: number of files copied with it
+    recent : deque
+        (dst, strategy) of the most recently copied files
+    """
+
+    STRATEGIES = ("reflink", "copy_file_range", "sendfile", "buffered")
+
+    def __init__(self, buffer_size=2 ** 20, history=1000):
+        self.buffer_size = buffer_size
+        self.counts = Counter()
+        self.recent = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def copy2(self, src, dst):
+        """
+        Copy file data and metadata like shutil.copy2.
+
+        Parameters
+        ---------------
+        src : str or Path
+            path to source file
+        dst : str or Path
+            path to the new file
+
+        Returns
+        ---------------
+        str or Path
+            dst
+        """
+
+        strategy = self.copyfile(src, dst)
+        shutil.copystat(src, dst)
+        with self._lock:
+            self.counts[strategy] += 1
+            self.recent.append((dst, strategy))
+        logger.debug("copied %s -> %s using %s", src, dst, strategy)
+        return dst
+
+    def copyfile(self, src, dst):
+        """
+        Copy file data only.
+
+        Parameters
+        ---------------
+        src : str or Path
+            path to source file
+        dst : str or Path
+            path to the new file
+
+        Returns
+        ---------------
+        str
+            name of the strategy used
+
+        Raises
+        ---------------
+        shutil.SpecialFileError
+            If src is not a regular file, e.g. a named pipe that would
+            block the copy forever
+        """
+
+        _check_regular(src, os.stat(src))
+        with open(src, "rb") as fsrc:
+            st = os.fstat(fsrc.fileno())
+            _check_regular(src, st)
+            with open(dst, "wb") as fdst:
+                return self._copy(fsrc, fdst, st.st_size)
+
+    def _copy(self, fsrc, fdst, size):
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        if self._reflink(infd, outfd):
+            return "reflink"
+        if hasattr(os, "copy_file_range") and \
+                self._copy_range(infd, outfd, size):
+            return "copy_file_range"
+        if hasattr(os, "sendfile") and self._sendfile(infd, outfd, size):
+            return "sendfile"
+        shutil.copyfileobj(fsrc, fdst, self.buffer_size)
+        return "buffered"
+
+    def _reflink(self, infd, outfd):
+        if fcntl is None:
+            return False
+        try:
+            fcntl.ioctl(outfd, FICLONE, infd)
+        except OSError as e:
+            if e.errno in FALLBACK_ERRNOS:
+                return False
+            raise
+        return True
+
+    def _chunk(self, size):
+        return min(max(size, 2 ** 23), 2 ** 30)
+
+    def _copy_range(self, infd, outfd, size):
+        chunk = self._chunk(size)
+        copied = 0
+        while True:
+            try:
+                sent = os.copy_file_range(infd, outfd, chunk)
+            except OSError as e:
+                if copied == 0 and e.errno in FALLBACK_ERRNOS:
+                    return False
+                raise
+            if sent == 0:
+                # nothing copied - empty or special file, let others retry
+                return copied > 0
+            copied += sent
+
+    def _sendfile(self, infd, outfd, size):
+        chunk = self._chunk(size)
+        offset = 0
+        while True:
+            try:
+                sent = os.sendfile(outfd, infd, offset, chunk)
+            except OSError as e:
+                if offset == 0 and e.errno in FALLBACK_ERRNOS:
+                    return False
+                raise
+            if sent == 0:
+                return offset > 0
+            offset += sent
+
+
+def _check_regular(path, st):
+    """
+    Raise SpecialFileError like shutil.copyfile if st is not a regular file.
+    """
+
+    if stat.S_ISREG(st.st_mode):
+        return
+    if stat.S_ISFIFO(st.st_mode):
+        raise shutil.SpecialFileError(f"`{path}` is a named pipe")
+    raise shutil.SpecialFileError(f"`{path}` is not a regular file")
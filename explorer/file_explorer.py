@@ -1,13 +1,74 @@
+import errno
+import functools
 import pathlib
 import shutil
+import stat
 import os
 
+from explorer.fastcopy import FileCopier
+from explorer.listing import scan, scan_chunks
+from explorer.names import NameAllocator
+from explorer.remover import TreeRemover
+from explorer.renamer import BulkRenamer
+from explorer.tree_copy import TreeCopier, TreeCopyError
+
+
+class MoveError(shutil.Error):
+    """
+    Raised when src of a move across devices was copied but could not be
+    removed. The copy is complete, so the move can be undone as a copy.
+
+    Attributes
+    ---------------
+    new_obj : Path
+        path of the copy
+    error : OSError
+        reason src was not removed
+    """
+
+    def __init__(self, new_obj, error):
+        super().__init__(f"{new_obj} was copied, source not removed: {error}")
+        self.new_obj = new_obj
+        self.error = error
+
 
 class FileExplorer:
     """
     Explore file system. Move, copy, rename and delete files and directories.
+
+    Parameters
+    ---------------
+    copy_workers : int, default=8
+        number of files copied concurrently by copy_dir
+    rm_workers : int, default=8
+        number of directories cleared concurrently by rm
+
+    Attributes
+    ---------------
+    copier : TreeCopier
+        copies directory trees with a pool of worker threads
+    file_copier : FileCopier
+        copies single files using reflink/copy_file_range/sendfile when
+        possible and records the strategy used
+    names : NameAllocator
+        picks free names for copied/moved files and dirs
+    remover : TreeRemover
+        removes directory trees with a pool of worker threads
+    renamer : BulkRenamer
+        renames many objects of a directory as one planned operation
     """
 
+    # rename replaces the empty placeholder on POSIX. On Windows it never
+    # replaces anything, so it is exclusive on its own
+    CLAIM_RENAME = os.name != "nt"
+
+    def __init__(self, copy_workers=8, rm_workers=8):
+        self.copier = TreeCopier(copy_workers)
+        self.remover = TreeRemover(rm_workers)
+        self.file_copier = FileCopier()
+        self.names = NameAllocator()
+        self.renamer = BulkRenamer()
+
     def get_content(self, path):
         """
         Return directory content.
@@ -20,7 +81,7 @@ class FileExplorer:
         Returns
         ---------------
         dict
-            obj type: list of Path objects representing files/directories
+            obj type: list of Entry objects representing files/directories
 
         Raises
         ---------------
@@ -34,15 +95,41 @@ class FileExplorer:
                 "files": [],
                 "dirs": []
             }
-            for obj in path.iterdir():
-                if obj.is_file():
-                    content["files"].append(obj)
-                elif obj.is_dir():
-                    content["dirs"].append(obj)
+            for entry in scan(path):
+                content[entry.type].append(entry)
             return content
         else:
             raise FileNotFoundError("Directory does not exist")
 
+    def iter_content(self, path, chunk_size=500):
+        """
+        Return directory content as a stream of batches. The path is validated
+        immediately, entries are read lazily while the stream is consumed.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+        chunk_size : int, default=500
+            max number of entries in a single batch
+
+        Returns
+        ---------------
+        generator
+            yields lists of Entry objects
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If path is not a directory
+        """
+
+        path = pathlib.Path(path)
+        if path.is_dir():
+            return scan_chunks(path, chunk_size)
+        else:
+            raise FileNotFoundError("Directory does not exist")
+
     def is_valid_path(self, src, dst, src_type):
         """
         Check if src and dst are valid paths to files/dirs and suitable to copy
@@ -85,7 +172,7 @@ class FileExplorer:
 
         return src, dst
 
-    def copy_file(self, src, dst):
+    def copy_file(self, src, dst, progress=None):
         """
         Copy a file into a specified destination directory.
         Add a suffix if file already exists in dst
@@ -96,6 +183,8 @@ class FileExplorer:
             path to source file
         dst : str or Path
             path to destination dir
+        progress : callable, default=None
+            called with the number of bytes after every copied file
 
         Returns
         ---------------
@@ -104,18 +193,14 @@ class FileExplorer:
         """
 
         src, dst = self.is_valid_path(src, dst, "file")
+        target = self.get_target(src, dst, "file")
+        return self.copy_to(src, target, "file", progress=progress)
 
-        dst = dst / src.name
-        if dst.exists():
-            index = len(list(dst.parent.glob(f"{dst.stem}*{dst.suffix}")))
-            dst = dst.parent / f"{src.stem}_copy_{index}{dst.suffix}"
-
-        return pathlib.Path(shutil.copy2(src, dst))
-
-    def copy_dir(self, src, dst):
+    def copy_dir(self, src, dst, progress=None):
         """
         Copy directory with it's content to a dst location.
-        Add a suffix if directory already exists in dst.
+        Add a suffix if directory already exists in dst. Files are copied
+        concurrently, files that fail don't stop the rest of the tree.
 
         Parameters
         ---------------
@@ -123,23 +208,116 @@ class FileExplorer:
             path to source dir
         dst : str or Path
             path to destination dir
+        progress : callable, default=None
+            called with the number of bytes after every copied file
 
         Returns
         ---------------
         Path
             Path object for the newly created dir
+
+        Raises
+        ---------------
+        TreeCopyError
+            If some files could not be copied. Its root attribute holds the
+            newly created dir
         """
 
         src, dst = self.is_valid_path(src, dst, "dir")
+        target = self.get_target(src, dst, "dir")
+        return self.copy_to(src, target, "dir", progress=progress)
+
+    def copy_to(self, src, target, src_type, progress=None):
+        """
+        Copy src file/dir to a target path claimed by get_target. Paths are
+        not validated, the target is released if nothing was copied.
+
+        Parameters
+        ---------------
+        src : Path
+            path to source file/dir
+        target : Path
+            claimed path of the copy
+        src_type : {dir, file}
+            src type
+        progress : callable, default=None
+            called with the number of bytes after every copied file
+
+        Returns
+        ---------------
+        Path
+            target
+
+        Raises
+        ---------------
+        TreeCopyError
+            If some files of src dir could not be copied
+        """
+
+        try:
+            if src_type == "dir":
+                copy_function = functools.partial(
+                    self._copy2, progress=progress
+                )
+                return self.copier.copy(
+                    src, target, copy_function=copy_function,
+                    dirs_exist_ok=True
+                )
+            return pathlib.Path(self._copy2(src, target, progress))
+        except TreeCopyError:
+            raise
+        except OSError:
+            self._unclaim(target, src_type)
+            raise
+
+    def get_target(self, src, dst, src_type, claim=True):
+        """
+        Return path for src placed in dst dir and claim it with an empty
+        file/dir. Add a suffix if an object with the same name already exists
+        in dst.
+
+        Parameters
+        ---------------
+        src : Path
+            path to source file/dir
+        dst : Path
+            path to destination dir
+        src_type : {dir, file}
+            src type
+        claim : bool, default=True
+            create the placeholder file/dir
+
+        Returns
+        ---------------
+        Path
+            path that src should be copied/moved to
+        """
 
-        dst = dst / src.name
-        if dst.exists():
-            index = len(list(dst.parent.glob(f"{dst.stem}*")))
-            dst = dst.parent / f"{src.stem}_copy_{index}"
+        return self.names.allocate(
+            dst, src.name, is_dir=src_type == "dir", claim=claim
+        )
+
+    def _unclaim(self, target, src_type):
+        try:
+            if src_type == "dir":
+                os.rmdir(target)
+            else:
+                os.unlink(target)
+        except OSError:
+            pass
+        self.names.release(target)
+
+    def _copy2(self, src, dst, progress=None):
+        """
+        Copy file with metadata and report its size to progress.
+        """
 
-        return pathlib.Path(shutil.copytree(src, dst))
+        new = self.file_copier.copy2(src, dst)
+        if progress:
+            progress(os.path.getsize(new))
+        return new
 
-    def copy(self, src, dst):
+    def copy(self, src, dst, progress=None):
         """
         Copy file/dir into dst using copy_file/copy_dir depending on src type
 
@@ -149,6 +327,8 @@ class FileExplorer:
             path to source file/dir
         dst : str
             path to destination dir
+        progress : callable, default=None
+            called with the number of bytes after every copied file
 
         Returns
         ---------------
@@ -165,15 +345,16 @@ class FileExplorer:
         dst = pathlib.Path(dst)
 
         if src.is_file():
-            return self.copy_file(src, dst)
+            return self.copy_file(src, dst, progress=progress)
         elif src.is_dir():
-            return self.copy_dir(src, dst)
+            return self.copy_dir(src, dst, progress=progress)
         else:
             raise FileNotFoundError("Invalid src path")
 
-    def move(self, src, dst):
+    def move(self, src, dst, progress=None):
         """
-        Move a src file/dir to dst dir.
+        Move a src file/dir to dst dir. Within one device the object is
+        renamed, only moves across devices copy the data and delete src.
 
         Parameters
         ---------------
@@ -181,22 +362,123 @@ class FileExplorer:
             path to source file/dir
         dst : str
             path to destination dir
+        progress : callable, default=None
+            called with the number of bytes after every copied file
 
         Returns
         ---------------
         Path
             Path object for the newly created file/dir
+
+        Raises
+        ---------------
+        MoveError
+            If src was copied to another device but could not be removed
         """
 
-        moved = self.copy(src, dst)
+        src = pathlib.Path(src)
+        dst = pathlib.Path(dst)
+        src_type = self._same_device(src, dst)
+        if src_type:
+            claim = self.CLAIM_RENAME
+            target = self.get_target(src, dst, src_type, claim=claim)
+            return self.move_to(
+                src, target, src_type, same_device=True, claimed=claim,
+                progress=progress
+            )
+
+        moved = self.copy(src, dst, progress=progress)
         if moved:
             src = pathlib.Path(src)
-            if src.is_file():
-                src.unlink()
-            elif src.is_dir():
-                shutil.rmtree(src)
+            try:
+                if src.is_file():
+                    src.unlink()
+                elif src.is_dir():
+                    self.remover.remove(src)
+            except OSError as e:
+                raise MoveError(moved, e) from e
         return moved
 
+    def move_to(self, src, target, src_type, same_device, claimed=True,
+                progress=None):
+        """
+        Move src file/dir to a target path picked by get_target. Paths are
+        not validated.
+
+        Parameters
+        ---------------
+        src : Path
+            path to source file/dir
+        target : Path
+            path of the moved object
+        src_type : {dir, file}
+            src type
+        same_device : bool
+            src and target dir are on the same device, try to rename first
+        claimed : bool, default=True
+            target was claimed with a placeholder
+        progress : callable, default=None
+            called with the number of bytes after every copied file
+
+        Returns
+        ---------------
+        Path
+            path of the moved object
+
+        Raises
+        ---------------
+        TreeCopyError
+            If some files of src dir could not be copied
+        MoveError
+            If src was copied but could not be removed
+        """
+
+        if same_device:
+            try:
+                os.rename(src, target)
+                return target
+            except OSError as e:
+                if claimed:
+                    self._unclaim(target, src_type)
+                if e.errno != errno.EXDEV:
+                    raise
+            target = self.get_target(src, target.parent, src_type)
+
+        moved = self.copy_to(src, target, src_type, progress=progress)
+        try:
+            if src_type == "file":
+                os.unlink(src)
+            else:
+                self.remover.remove(src)
+        except OSError as e:
+            # the copy is complete, let the caller keep it
+            raise MoveError(moved, e) from e
+        return moved
+
+    def _same_device(self, src, dst):
+        """
+        Check if src can be renamed into dst dir.
+
+        Returns
+        ---------------
+        str or None
+            src type {file, dir} if src and dst dir are on the same device,
+            None otherwise or if any of them is invalid
+        """
+
+        try:
+            src_st = os.stat(src)
+            dst_st = os.stat(dst)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(dst_st.st_mode) or src_st.st_dev != dst_st.st_dev:
+            return None
+        if stat.S_ISDIR(src_st.st_mode):
+            return "dir"
+        elif stat.S_ISREG(src_st.st_mode):
+            return "file"
+        return None
+
     def rename(self, src, dst, prefix=None, suffix=None):
         """
         Rename src file/dir to dst. Dst should not have an extension.
@@ -221,20 +503,43 @@ class FileExplorer:
         if not isinstance(src, pathlib.Path):
             src = pathlib.Path(src)
 
-        if not isinstance(dst, pathlib.Path):
-            dst = pathlib.Path(dst)
+        dst = src.parent / self.new_name(src, dst, prefix, suffix)
+        return src.rename(dst)
 
-        dst = src.parent / f"{dst.name}{src.suffix}"
+    def new_name(self, src, dst, prefix=None, suffix=None):
+        """
+        Return the name rename would give src.
+
+        Parameters
+        ---------------
+        src : str or Path
+            path to source file/dir
+        dst : str or Path
+            new file/dir name without extension
+        prefix : str
+            add before dst - prefix_dst
+        suffix : str
+            add after dst stem, before extension - prefix_stem_suffix.ext
+
+        Returns
+        ---------------
+        str
+            new file/dir name with src extension
+        """
+
+        src = pathlib.PurePath(src)
+        name = f"{pathlib.PurePath(dst).name}{src.suffix}"
 
         if prefix:
-            dst = dst.parent / f"{prefix}_{dst.name}"
+            name = f"{prefix}_{name}"
 
         if suffix:
-            dst = dst.parent / f"{dst.stem}_{suffix}{dst.suffix}"
+            path = pathlib.PurePath(name)
+            name = f"{path.stem}_{suffix}{path.suffix}"
 
-        return src.rename(dst)
+        return name
 
-    def rm(self, src):
+    def rm(self, src, progress=None):
         """
         Remove src file/dir.
 
@@ -242,19 +547,25 @@ class FileExplorer:
         ---------------
         src : str or Path
             path to source file/dir
+        progress : callable, default=None
+            called with the number of removed entries
 
         Raises
         ---------------
         FileNotFoundError
             If src path does not exist
+        TreeRemoveError
+            If some entries of src dir could not be removed
         """
 
         src = pathlib.Path(src) if not isinstance(src, pathlib.Path) else src
 
         if src.is_file():
             src.unlink()
+            if progress:
+                progress(1)
         elif src.is_dir():
-            shutil.rmtree(src)
+            self.remover.remove(src, progress=progress)
         else:
             raise FileNotFoundError("Invalid src path")
 
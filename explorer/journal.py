@@ -0,0 +1,400 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """
+    Append-only on-disk log of file operations. Every batch (one cached
+    action) is written as begin, an intent record per item, a done record
+    per finished item and commit or abort. Intents of a batch are written
+    and fsynced together before the batch starts, done records are buffered
+    and written every flush_every records or flush_interval seconds, so a
+    large batch costs a handful of fsyncs. Undo, redo and clear of the
+    action history are logged as markers, which is enough to rebuild Cache.
+    A redo that moves objects to new paths is logged as a redo batch instead,
+    its intents carry the new paths and its commit stands for the marker.
+
+    Intents carry the exact path every item's object ends up at, so recovery
+    never has to guess which files a batch created.
+
+    Records are JSON lines. A torn line at the end of the file (crash during
+    a write) is ignored.
+
+    Parameters
+    ---------------
+    path : str or Path
+        journal file, created with its parent dir if missing
+    flush_every : int, default=256
+        max number of buffered done records
+    flush_interval : float, default=1.0
+        max seconds a done record stays in the buffer
+    max_records : int, default=100000
+        number of records after which compact should be called
+
+    Attributes
+    ---------------
+    records : int
+        number of records in the file
+    syncs : int
+        number of fsync calls
+    """
+
+    def __init__(self, path, flush_every=256, flush_interval=1.0,
+                 max_records=100000):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.max_records = max_records
+        self.records = 0
+        self.syncs = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._next = 1
+        for record in self.read():
+            self.records += 1
+            if record.get("op") == "begin":
+                self._next = max(self._next, record["b"] + 1)
+        self._file = open(self.path, "ab")
+        self._end_torn_line()
+
+    def _end_torn_line(self):
+        if self._file.tell() == 0:
+            return
+        with open(self.path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                self._file.write(b"\n")
+                self._file.flush()
+
+    def begin(self, func, items, targets=None, extra=None):
+        """
+        Start a batch and durably log intents of all its items.
+
+        Parameters
+        ---------------
+        func : str
+            file operation
+        items : list
+            (src, dst) pairs
+        targets : list, default=None
+            path of every item's new object - copy, moved, renamed or trashed
+            object, None if unknown. Recovery leaves items without a target
+            alone
+        extra : list, default=None
+            dict of JSON values kept with every intent
+
+        Returns
+        ---------------
+        int
+            batch id
+        """
+
+        with self._lock:
+            batch = self._next
+            self._next += 1
+            self._buffer.append({"op": "begin", "b": batch, "func": func})
+            for i, (src, dst) in enumerate(items):
+                record = {
+                    "op": "intent", "b": batch, "i": i, "func": func,
+                    "src": _encode(src), "dst": _encode(dst)
+                }
+                if targets is not None:
+                    record["target"] = _encode(targets[i])
+                if extra is not None:
+                    record["x"] = extra[i]
+                self._buffer.append(record)
+            self._write(sync=True)
+        return batch
+
+    def retarget(self, batch, i, target):
+        """
+        Durably log a target path other than the one passed to begin. Call it
+        before anything is written to the new target.
+
+        Parameters
+        ---------------
+        batch : int
+            batch id returned by begin
+        i : int
+            item index
+        target : Path
+            new target path
+        """
+
+        self._log({"op": "target", "b": batch, "i": i,
+                   "target": _encode(target)})
+
+    def done(self, batch, i, item):
+        """
+        Log a finished item. Buffered.
+
+        Parameters
+        ---------------
+        batch : int
+            batch id returned by begin
+        i : int
+            item index
+        item : dict
+            cache item with func and new_obj of the finished item
+        """
+
+        with self._lock:
+            self._buffer.append({
+                "op": "done", "b": batch, "i": i, "func": item["func"],
+                "dst": _encode(item["dst"]), "new": _encode(item["new_obj"])
+            })
+            if len(self._buffer) >= self.flush_every or \
+                    time.monotonic() - self._last_flush > self.flush_interval:
+                self._write(sync=True)
+
+    def commit(self, batch):
+        """
+        Mark batch as stored in Cache.
+        """
+
+        self._log({"op": "commit", "b": batch})
+
+    def abort(self, batch):
+        """
+        Mark batch as not stored in Cache.
+        """
+
+        self._log({"op": "abort", "b": batch})
+
+    def mark(self, op):
+        """
+        Log an undo, redo or clear of the action history.
+
+        Parameters
+        ---------------
+        op : {undo, redo, clear}
+        """
+
+        if op not in ("undo", "redo", "clear"):
+            raise ValueError(f"op should be undo, redo or clear not {op}")
+        self._log({"op": op})
+
+    def sync(self):
+        """
+        Write and fsync buffered records.
+        """
+
+        with self._lock:
+            self._write(sync=True)
+
+    def _log(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            self._write(sync=True)
+
+    def _write(self, sync):
+        if self._buffer:
+            data = "".join(
+                json.dumps(record, separators=(",", ":")) + "\n"
+                for record in self._buffer
+            )
+            self._file.write(data.encode("utf-8"))
+            self.records += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+            self.syncs += 1
+        self._last_flush = time.monotonic()
+
+    def read(self):
+        """
+        Read records from disk.
+
+        Returns
+        ---------------
+        generator
+            yields record dicts
+        """
+
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("skipping torn journal record")
+
+    def history(self):
+        """
+        Replay the journal.
+
+        Returns
+        ---------------
+        tuple
+            events - list of (op, items) tuples in order, op one of store,
+            undo, redo, clear, items a list of cache items for store, a dict
+            of item index: new path for a redo batch, None otherwise.
+            interrupted - list of (batch, items, pending) tuples for batches
+            that were neither committed nor aborted, items finished before
+            the interruption, pending (index, intent) pairs of unfinished
+            items. intent holds src, func, dst, target (None if not logged)
+            and x, the extra values passed to begin
+        """
+
+        batches = {}
+        events = []
+        for record in self.read():
+            op = record.get("op")
+            if op == "begin":
+                batches[record["b"]] = ({}, {}, record.get("func"))
+            elif op == "intent" and record["b"] in batches:
+                batches[record["b"]][0][record["i"]] = record
+            elif op == "target" and record["b"] in batches:
+                intent = batches[record["b"]][0].get(record["i"])
+                if intent is not None:
+                    intent["target"] = record["target"]
+            elif op == "done" and record["b"] in batches:
+                batches[record["b"]][1][record["i"]] = record
+            elif op == "commit" and record["b"] in batches:
+                intents, done, func = batches.pop(record["b"])
+                if func == "redo":
+                    events.append(("redo", {
+                        i: _decode(intent["target"])
+                        for i, intent in intents.items()
+                        if intent.get("target") is not None
+                    }))
+                else:
+                    events.append(("store", self._items(intents, done)))
+            elif op == "abort":
+                batches.pop(record["b"], None)
+            elif op in ("undo", "redo", "clear"):
+                events.append((op, None))
+        interrupted = []
+        for batch, (intents, done, func) in batches.items():
+            pending = [
+                (i, {
+                    "src": _decode(intent["src"]),
+                    "func": intent["func"],
+                    "dst": _decode(intent["dst"]),
+                    "target": _decode(intent.get("target")),
+                    "x": intent.get("x")
+                })
+                for i, intent in sorted(intents.items()) if i not in done
+            ]
+            interrupted.append((batch, self._items(intents, done), pending))
+        return events, interrupted
+
+    def _items(self, intents, done):
+        return [
+            {
+                "src": _decode(intents[i]["src"]),
+                "func": done[i]["func"],
+                "dst": _decode(done[i]["dst"]),
+                "new_obj": _decode(done[i]["new"])
+            }
+            for i in sorted(done) if i in intents
+        ]
+
+    def finish(self, batch, items, done=False):
+        """
+        Close an interrupted batch. Log done records for items resolved by
+        recovery and commit the batch, or abort it if nothing was done.
+
+        Parameters
+        ---------------
+        batch : int
+            interrupted batch id
+        items : dict
+            item index: cache item, resolved items only
+        done : bool, default=False
+            some items were done before the interruption
+        """
+
+        for i, item in items.items():
+            self.done(batch, i, item)
+        if items or done:
+            self.commit(batch)
+        else:
+            self.abort(batch)
+
+    def compact(self, events):
+        """
+        Replace the journal with a minimal one. The new file is fsynced and
+        renamed over the old one, so a crash leaves either of them. Batches
+        in progress would be lost, call it only when there are none.
+
+        Parameters
+        ---------------
+        events : list
+            (op, items) tuples like in history, describing the current state
+        """
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            self._write(sync=True)
+            records = []
+            batch = 0
+            for op, items in events:
+                if op != "store":
+                    records.append({"op": op})
+                    continue
+                batch += 1
+                records.append({"op": "begin", "b": batch, "func": "compact"})
+                for i, item in enumerate(items):
+                    records.append({
+                        "op": "intent", "b": batch, "i": i,
+                        "func": item["func"], "src": _encode(item["src"]),
+                        "dst": _encode(item["dst"])
+                    })
+                    records.append({
+                        "op": "done", "b": batch, "i": i,
+                        "func": item["func"], "dst": _encode(item["dst"]),
+                        "new": _encode(item["new_obj"])
+                    })
+                records.append({"op": "commit", "b": batch})
+            with open(tmp, "wb") as file:
+                for record in records:
+                    line = json.dumps(record, separators=(",", ":")) + "\n"
+                    file.write(line.encode("utf-8"))
+                file.flush()
+                os.fsync(file.fileno())
+            self._file.close()
+            os.replace(tmp, self.path)
+            self._file = open(self.path, "ab")
+            self.records = len(records)
+            self._next = max(self._next, batch + 1)
+            self.syncs += 1
+
+    def close(self):
+        """
+        Flush buffered records and close the file.
+        """
+
+        with self._lock:
+            if not self._file.closed:
+                self._write(sync=True)
+                self._file.close()
+
+
+def _encode(value):
+    if value is None:
+        return None
+    if isinstance(value, Path):
+        return os.fspath(value)
+    return {"s": value}
+
+
+def _decode(value):
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return value["s"]
+    return Path(value)
@@ -0,0 +1,119 @@
+import os
+import stat
+from collections import namedtuple
+
+
+Entry = namedtuple(
+    "Entry", ["name", "type", "mtime", "size", "ctime"], defaults=[None]
+)
+Entry.__doc__ = """
+Single directory entry.
+
+Attributes
+---------------
+name : str
+    file/dir name
+type : {files, dirs}
+    obj type
+mtime : float
+    last modification timestamp
+size : int
+    size in bytes as reported by stat
+ctime : float or None
+    creation (Windows) or metadata change timestamp
+"""
+
+
+def scan(path):
+    """
+    Iterate over directory entries using os.scandir. Every entry is stat'ed
+    exactly once, objects that are neither files nor directories (e.g. broken
+    symlinks) are skipped.
+
+    Parameters
+    ---------------
+    path : str or Path
+        dir path
+
+    Yields
+    ---------------
+    Entry
+        name, type, mtime and size of a file/dir
+    """
+
+    with os.scandir(path) as it:
+        for dir_entry in it:
+            try:
+                st = dir_entry.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                obj_type = "files"
+            elif stat.S_ISDIR(st.st_mode):
+                obj_type = "dirs"
+            else:
+                continue
+            yield Entry(
+                dir_entry.name, obj_type, st.st_mtime, st.st_size, st.st_ctime
+            )
+
+
+def scan_chunks(path, chunk_size=500):
+    """
+    Iterate over directory entries in batches.
+
+    Parameters
+    ---------------
+    path : str or Path
+        dir path
+    chunk_size : int, default=500
+        max number of entries in a single batch
+
+    Yields
+    ---------------
+    list
+        list of Entry objects, the last one may be shorter than chunk_size
+    """
+
+    chunk = []
+    for entry in scan(path):
+        chunk.append(entry)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def tree_size(path):
+    """
+    Return total size of files in a directory tree. Symbolic links are not
+    followed, entries that can't be read are skipped.
+
+    Parameters
+    ---------------
+    path : str or Path
+        dir path
+
+    Returns
+    ---------------
+    int
+        size in bytes
+    """
+
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total
@@ -0,0 +1,238 @@
+import os
+import stat
+import sys
+import time
+from collections import OrderedDict
+
+from explorer.listing import Entry
+
+
+class ListingCache:
+    """
+    LRU cache of directory listings. A listing is served from memory as long
+    as the directory's mtime/ctime (and inode) did not change. Listings taken
+    less than RACY_NS after the directory was modified are never trusted,
+    because timestamp granularity could hide a later change.
+
+    Parameters
+    ---------------
+    load : callable
+        called with a dir path, returns an iterable of Entry objects
+    max_bytes : int, default=64 MiB
+        approximate memory budget. Least recently used listings are evicted
+        once it is exceeded
+
+    Attributes
+    ---------------
+    hits : int
+        number of lookups served from memory
+    misses : int
+        number of lookups that required reading the directory
+    size : int
+        approximate memory used by cached listings in bytes
+    """
+
+    RACY_NS = 2 * 10 ** 9
+    ENTRY_OVERHEAD = sys.getsizeof(Entry("", "", 0.0, 0, 0.0)) + 3 * 24 + 100
+
+    def __init__(self, load, max_bytes=64 * 2 ** 20):
+        self.load = load
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._items = OrderedDict()
+
+    def _key(self, path):
+        return os.path.abspath(path)
+
+    def validate(self, path):
+        """
+        Read directory signature used to validate cached listings.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Returns
+        ---------------
+        tuple
+            mtime, ctime, inode and device of the directory
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If path does not exist
+        """
+
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_ctime_ns, st.st_ino, st.st_dev
+
+    def lookup(self, path):
+        """
+        Return a cached listing if it is still valid. Count a hit or a miss.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Returns
+        ---------------
+        tuple
+            (dict or None, signature) - name: Entry mapping or None if the
+            directory must be read again, signature to pass to store
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If path does not exist
+        """
+
+        key = self._key(path)
+        sig = self.validate(path)
+        cached = self._items.get(key)
+        if cached and cached[0] == sig and not cached[1]:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return cached[2], sig
+        self.misses += 1
+        return None, sig
+
+    def store(self, path, sig, entries):
+        """
+        Cache a listing read after sig was taken.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+        sig : tuple
+            signature returned by lookup/validate before reading the dir
+        entries : iterable
+            Entry objects
+
+        Returns
+        ---------------
+        dict
+            name: Entry mapping in directory order
+        """
+
+        key = self._key(path)
+        listing = {entry.name: entry for entry in entries}
+        racy = time.time_ns() - sig[0] < self.RACY_NS
+        self._discard(key)
+        nbytes = self._sizeof(listing)
+        if nbytes <= self.max_bytes:
+            self._items[key] = (sig, racy, listing, nbytes)
+            self.size += nbytes
+            self._evict()
+        return listing
+
+    def get(self, path):
+        """
+        Return directory listing, from memory if the directory did not change.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Returns
+        ---------------
+        dict
+            name: Entry mapping in directory order
+        """
+
+        listing, sig = self.lookup(path)
+        if listing is None:
+            listing = self.store(path, sig, self.load(path))
+        return listing
+
+    def find_many(self, parent, names):
+        """
+        Get entries of selected directory children. Serve them from a cached
+        parent listing if it is valid, stat the children otherwise.
+
+        Parameters
+        ---------------
+        parent : str or Path
+            parent dir path
+        names : list
+            file/dir names
+
+        Returns
+        ---------------
+        list
+            Entry object for every name or None if it does not exist
+        """
+
+        try:
+            listing, _ = self.lookup(parent)
+        except OSError:
+            return [None for _ in names]
+        if listing is not None:
+            return [listing.get(str(name)) for name in names]
+        return [self._stat_entry(parent, str(name)) for name in names]
+
+    def _stat_entry(self, parent, name):
+        try:
+            st = os.stat(os.path.join(parent, name))
+        except OSError:
+            return None
+        obj_type = "dirs" if stat.S_ISDIR(st.st_mode) else "files"
+        return Entry(name, obj_type, st.st_mtime, st.st_size, st.st_ctime)
+
+    def invalidate(self, path):
+        """
+        Drop cached listing of a directory.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+        """
+
+        self._discard(self._key(path))
+
+    def clear(self):
+        """
+        Drop all cached listings and reset counters.
+        """
+
+        self._items.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Return cache statistics.
+
+        Returns
+        ---------------
+        dict
+            hits, misses, number of cached dirs and approximate size in bytes
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dirs": len(self._items),
+            "bytes": self.size
+        }
+
+    def _discard(self, key):
+        cached = self._items.pop(key, None)
+        if cached:
+            self.size -= cached[3]
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._items:
+            _, cached = self._items.popitem(last=False)
+            self.size -= cached[3]
+
+    def _sizeof(self, listing):
+        names = sum(sys.getsizeof(name) for name in listing)
+        return names + len(listing) * self.ENTRY_OVERHEAD
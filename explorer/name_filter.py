@@ -0,0 +1,98 @@
+import fnmatch
+import re
+
+from explorer.search import SearchIndex
+
+
+class NameFilter:
+    """
+    Case-insensitive name pattern applied to an in-memory listing. Every mode
+    is compiled to a regular expression, so names are checked in C without
+    casefolding them first.
+
+    A pattern typed one character at a time usually narrows the previous
+    one - narrows() tells when matches of the new pattern are a subset of
+    the old ones, so only names that passed the old filter are checked.
+
+    Parameters
+    ---------------
+    query : str
+        text contained in names, glob pattern matched against whole names or
+        regular expression searched in names
+    mode : {substring, glob, regex}, default=substring
+        query type
+
+    Raises
+    ---------------
+    ValueError
+        If mode is unknown or the regular expression is invalid
+    """
+
+    MODES = SearchIndex.MODES
+    # characters that make a regular expression more than a literal
+    REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+    def __init__(self, query, mode="substring"):
+        if mode not in self.MODES:
+            raise ValueError(f"mode should be one of {self.MODES} not {mode}")
+        self.query = query
+        self.mode = mode
+        if mode == "substring":
+            pattern = re.escape(query)
+        elif mode == "glob":
+            pattern = fnmatch.translate(query)
+        else:
+            pattern = query
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}") from None
+        self.match = regex.match if mode == "glob" else regex.search
+
+    def filter(self, names):
+        """
+        Return matching names keeping their order.
+
+        Parameters
+        ---------------
+        names : iterable
+            names to check
+
+        Returns
+        ---------------
+        list
+            matching names
+        """
+
+        match = self.match
+        return [name for name in names if match(name)]
+
+    def narrows(self, other):
+        """
+        Check if every name matching this filter matches other filter too.
+        False means the answer is not known.
+
+        Parameters
+        ---------------
+        other : NameFilter or None
+            previously applied filter
+
+        Returns
+        ---------------
+        bool
+        """
+
+        if other is None or other.mode != self.mode:
+            return False
+        old = other.query.lower()
+        new = self.query.lower()
+        if old == new:
+            return True
+        if self.mode == "substring":
+            return old in new
+        if self.mode == "regex":
+            return old in new and not (
+                self.REGEX_SPECIAL & set(old + new)
+            )
+        # a glob ending with * matches every name starting with its prefix
+        return old.endswith("*") and "[" not in old and new.startswith(old)
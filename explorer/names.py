@@ -0,0 +1,173 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class NameAllocator:
+    """
+    Hand out collision-free names in destination directories. Names taken in
+    a directory are read once and kept in memory, so every next name costs
+    O(1) instead of a directory scan. The set is read again when somebody
+    else modifies the directory. Names are claimed with exclusive create, a
+    name taken by a concurrent writer is skipped.
+
+    Parameters
+    ---------------
+    max_dirs : int, default=64
+        number of directories remembered. Least recently used are forgotten
+
+    Attributes
+    ---------------
+    scans : int
+        number of times a directory had to be read
+    """
+
+    def __init__(self, max_dirs=64):
+        self.max_dirs = max_dirs
+        self.scans = 0
+        self._dirs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allocate(self, dst, name, is_dir=False, claim=True):
+        """
+        Return a free path for name in dst dir. If name is taken add
+        _copy_N to its stem - foo.py, foo_copy_1.py, foo_copy_2.py...
+
+        Parameters
+        ---------------
+        dst : str or Path
+            path to destination dir
+        name : str
+            preferred file/dir name
+        is_dir : bool, default=False
+            claim the name with an empty dir instead of an empty file. Dir
+            names are never split into stem and extension
+        claim : bool, default=True
+            create the file/dir exclusively, so nobody else gets the name
+
+        Returns
+        ---------------
+        Path
+            path to a new, not existing (or just claimed) file/dir
+        """
+
+        dst = Path(dst)
+        with self._lock:
+            taken, counters = self._names(dst)
+            stem, ext = (name, "") if is_dir else _split(name)
+            index = None
+            candidate = name
+            while True:
+                if candidate not in taken:
+                    path = dst / candidate
+                    if not claim or self._claim(path, is_dir):
+                        taken.add(candidate)
+                        self._touch(dst)
+                        if index is not None:
+                            counters[(stem, ext)] = index + 1
+                        return path
+                    taken.add(candidate)
+                if index is None:
+                    index = counters.get((stem, ext), 1)
+                else:
+                    index += 1
+                candidate = f"{stem}_copy_{index}{ext}"
+
+    def claim(self, path, is_dir=False):
+        """
+        Claim a path returned by allocate with claim=False.
+
+        Parameters
+        ---------------
+        path : str or Path
+            path returned by allocate
+        is_dir : bool, default=False
+            claim with an empty dir instead of an empty file
+
+        Returns
+        ---------------
+        bool
+            False if somebody else created the file/dir in the meantime
+        """
+
+        path = Path(path)
+        with self._lock:
+            claimed = self._claim(path, is_dir)
+            if claimed:
+                self._touch(path.parent)
+        return claimed
+
+    def release(self, path):
+        """
+        Forget a name claimed by allocate that ended up unused. The file/dir
+        itself is not removed.
+
+        Parameters
+        ---------------
+        path : str or Path
+            path returned by allocate
+        """
+
+        path = Path(path)
+        with self._lock:
+            entry = self._dirs.get(_key(path.parent))
+            if entry is not None:
+                entry[1].discard(path.name)
+
+    def forget(self, dst=None):
+        """
+        Drop remembered names of dst dir or of all dirs if dst is None.
+        """
+
+        with self._lock:
+            if dst is None:
+                self._dirs.clear()
+            else:
+                self._dirs.pop(_key(dst), None)
+
+    def _names(self, dst):
+        key = _key(dst)
+        sig = _signature(dst)
+        entry = self._dirs.get(key)
+        if entry is None or entry[0] != sig:
+            self.scans += 1
+            entry = [sig, set(os.listdir(dst)), {}]
+            self._dirs[key] = entry
+            while len(self._dirs) > self.max_dirs:
+                self._dirs.popitem(last=False)
+        self._dirs.move_to_end(key)
+        return entry[1], entry[2]
+
+    def _touch(self, dst):
+        # our own changes don't invalidate the set
+        entry = self._dirs.get(_key(dst))
+        if entry is not None:
+            try:
+                entry[0] = _signature(dst)
+            except OSError:
+                del self._dirs[_key(dst)]
+
+    def _claim(self, path, is_dir):
+        try:
+            if is_dir:
+                os.mkdir(path)
+            else:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+
+def _key(path):
+    return os.path.abspath(path)
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_ino, st.st_dev
+
+
+def _split(name):
+    path = Path(name)
+    return path.stem, path.suffix
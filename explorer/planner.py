@@ -0,0 +1,268 @@
+import errno
+import os
+import shutil
+import stat
+from pathlib import Path
+
+from explorer.file_explorer import MoveError
+from explorer.listing import tree_size
+from explorer.tree_copy import TreeCopyError
+
+
+class PlanItem:
+    """
+    Single copy/move of a plan.
+
+    Attributes
+    ---------------
+    src : str or Path
+        path to source file/dir as passed to the planner
+    dst : Path
+        path to destination dir
+    type : {file, dir} or None
+        src type, None if src is invalid
+    size : int
+        bytes that have to be written to dst
+    same_device : bool
+        move that can be done with a rename
+    target : Path or None
+        path picked for the new object
+    func : str
+        operation that was actually done - copy for moves interrupted
+        after a part of the tree was copied
+    new_obj : Path or None
+        newly created file/dir once the item ran
+    error : Exception or None
+        reason the item failed, set by the planner or when the item ran
+    """
+
+    __slots__ = (
+        "src", "dst", "type", "size", "same_device", "target", "func",
+        "new_obj", "error"
+    )
+
+    def __init__(self, src, dst, func):
+        self.src = src
+        self.dst = Path(dst)
+        self.type = None
+        self.size = 0
+        self.same_device = False
+        self.target = None
+        self.func = func
+        self.new_obj = None
+        self.error = None
+
+    def __repr__(self):
+        return f"PlanItem({self.src!r}, {self.func}, {self.target!r})"
+
+
+class Plan:
+    """
+    Validated batch of copies/moves produced by Planner.plan.
+
+    Attributes
+    ---------------
+    func : {copy, move}
+        file operation
+    items : list
+        PlanItem objects in the order of the planned pairs
+    required : dict
+        st_dev of destination: bytes that have to be written there
+    free : dict
+        st_dev of destination: free bytes when the plan was made
+    """
+
+    def __init__(self, func, items):
+        self.func = func
+        self.items = items
+        self.required = {}
+        self.free = {}
+
+    @property
+    def errors(self):
+        """
+        Items rejected by the planner.
+        """
+
+        return [item for item in self.items if item.error is not None]
+
+
+class Planner:
+    """
+    Plan and run a batch of copies/moves. Every source and destination is
+    stat'ed once, free space of every destination device is checked with a
+    single disk_usage call and names of the new objects are resolved against
+    one listing of each destination dir before anything is written. Invalid
+    items are rejected up front, the rest runs as a unit: an item that
+    fails doesn't stop the others.
+
+    Parameters
+    ---------------
+    fe : FileExplorer
+        performs single copy/move operations and allocates names
+    """
+
+    def __init__(self, fe):
+        self.fe = fe
+
+    def plan(self, func, pairs):
+        """
+        Validate a batch and resolve its targets. Nothing is written.
+
+        Parameters
+        ---------------
+        func : {copy, move}
+            file operation
+        pairs : list
+            (src, dst) pairs - path to source file/dir and destination dir
+
+        Returns
+        ---------------
+        Plan
+
+        Raises
+        ---------------
+        ValueError
+            If func is not copy or move
+        OSError
+            ENOSPC if the batch doesn't fit on a destination device
+        """
+
+        if func not in ("copy", "move"):
+            raise ValueError(f"func should be 'copy' or 'move' not {func}")
+        plan = Plan(func, [PlanItem(src, dst, func) for src, dst in pairs])
+        dsts = {}
+        for item in plan.items:
+            if item.dst not in dsts:
+                dsts[item.dst] = self._stat_dst(item.dst)
+            dst_st = dsts[item.dst]
+            if isinstance(dst_st, Exception):
+                item.error = dst_st
+                continue
+            self._check(item, dst_st, func)
+            if item.error is None and item.size:
+                dev = dst_st.st_dev
+                plan.required[dev] = plan.required.get(dev, 0) + item.size
+
+        for dev, required in plan.required.items():
+            dst = next(
+                dst for dst, st in dsts.items()
+                if not isinstance(st, Exception) and st.st_dev == dev
+            )
+            plan.free[dev] = shutil.disk_usage(dst).free
+            if required > plan.free[dev]:
+                raise OSError(
+                    errno.ENOSPC,
+                    f"Not enough space: {required} bytes needed, "
+                    f"{plan.free[dev]} available",
+                    str(dst)
+                )
+
+        for item in plan.items:
+            if item.error is None:
+                item.target = self.fe.names.allocate(
+                    item.dst, Path(item.src).name, is_dir=item.type == "dir",
+                    claim=False
+                )
+        return plan
+
+    def _stat_dst(self, dst):
+        try:
+            st = os.stat(dst)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISDIR(st.st_mode):
+            return FileNotFoundError("Invalid destination directory path")
+        return st
+
+    def _check(self, item, dst_st, func):
+        src = Path(item.src)
+        try:
+            st = os.stat(src)
+        except OSError:
+            st = None
+        if st is not None and stat.S_ISDIR(st.st_mode):
+            item.type = "dir"
+        elif st is not None and stat.S_ISREG(st.st_mode):
+            item.type = "file"
+        else:
+            item.error = FileNotFoundError("Invalid src path")
+            return
+        if item.type == "dir":
+            root = os.path.abspath(src)
+            dst = os.path.abspath(item.dst)
+            if dst == root or dst.startswith(os.path.join(root, "")):
+                item.error = OSError(
+                    errno.EINVAL, "Directory can't be put inside itself",
+                    str(src)
+                )
+                return
+        item.same_device = func == "move" and st.st_dev == dst_st.st_dev
+        if item.same_device:
+            item.size = 0
+        elif item.type == "dir":
+            item.size = tree_size(src)
+        else:
+            item.size = st.st_size
+
+    def run(self, plan, progress=None, retarget=None):
+        """
+        Run planned items one after another. Items that fail are reported
+        and skipped.
+
+        Parameters
+        ---------------
+        plan : Plan
+            plan returned by plan
+        progress : callable, default=None
+            called with the number of bytes after every copied file
+        retarget : callable, default=None
+            called with item index and new target when the planned target
+            was taken in the meantime, before anything is written to it
+
+        Yields
+        ---------------
+        PlanItem
+            every item once it ran or was skipped, with new_obj and func
+            set on success and error on failure. Moves that copied src but
+            could not remove it are reported as copies with error set
+        """
+
+        for i, item in enumerate(plan.items):
+            if item.error is None:
+                try:
+                    self._run_item(plan.func, item, progress, retarget, i)
+                except TreeCopyError as e:
+                    # partially copied tree can only be undone as a copy
+                    item.func = "copy"
+                    item.new_obj = e.root
+                    item.error = e
+                except MoveError as e:
+                    # src left in place, keep the complete copy undoable
+                    item.func = "copy"
+                    item.new_obj = e.new_obj
+                    item.error = e
+                except OSError as e:
+                    item.error = e
+            yield item
+
+    def _run_item(self, func, item, progress, retarget, i):
+        fe = self.fe
+        src = Path(item.src)
+        target = item.target
+        claim = not item.same_device or fe.CLAIM_RENAME
+        if claim and not fe.names.claim(target, item.type == "dir"):
+            # taken after the plan was made
+            target = fe.get_target(src, item.dst, item.type)
+            item.target = target
+            if retarget:
+                retarget(i, target)
+        if func == "copy":
+            item.new_obj = fe.copy_to(
+                src, target, item.type, progress=progress
+            )
+        else:
+            item.new_obj = fe.move_to(
+                src, target, item.type, item.same_device, claimed=claim,
+                progress=progress
+            )
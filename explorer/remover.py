@@ -0,0 +1,253 @@
+import os
+import shutil
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from pathlib import Path
+
+
+class TreeRemoveError(shutil.Error):
+    """
+    Raised when some entries of a tree could not be removed. Everything else
+    was removed.
+
+    Attributes
+    ---------------
+    root : Path
+        root of the removed tree
+    errors : list
+        (path, reason) for every file/dir that failed
+    """
+
+    def __init__(self, root, errors):
+        super().__init__(errors)
+        self.root = root
+        self.errors = errors
+
+
+class TreeRemover:
+    """
+    Remove directory trees with a pool of worker threads. Every directory is
+    opened once and its entries are unlinked relative to its file descriptor,
+    so full paths are never resolved per entry. Subdirectories are handed to
+    idle workers, the rest is walked by the worker that found them. Empty
+    directories are removed bottom-up, level by level, once all files are
+    gone. Falls back to shutil.rmtree where dir_fd is not supported.
+
+    Parameters
+    ---------------
+    workers : int, default=8
+        number of directories cleared at the same time
+    """
+
+    FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | \
+        getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_CLOEXEC", 0)
+
+    def __init__(self, workers=8):
+        self.workers = workers
+
+    @property
+    def supported(self):
+        """
+        True if fd-relative removal is available on this platform.
+        """
+
+        return (
+            os.unlink in os.supports_dir_fd
+            and os.rmdir in os.supports_dir_fd
+            and os.open in os.supports_dir_fd
+            and os.scandir in os.supports_fd
+        )
+
+    def remove(self, path, progress=None):
+        """
+        Remove a directory with all its content.
+
+        Parameters
+        ---------------
+        path : str or Path
+            path to dir
+        progress : callable, default=None
+            called from worker threads with the number of entries removed
+            in one go
+
+        Returns
+        ---------------
+        int
+            number of removed entries, path included
+
+        Raises
+        ---------------
+        TreeRemoveError
+            After the whole tree was processed, if any entry failed
+        OSError
+            If path does not exist or is a symbolic link
+        """
+
+        path = os.path.abspath(path)
+        if stat.S_ISLNK(os.lstat(path).st_mode):
+            raise OSError("Cannot remove a symbolic link to a directory tree")
+        removal = _Removal(progress)
+        if self.supported:
+            self._remove_fd(path, removal)
+        else:
+            self._remove_fallback(path, removal)
+        if removal.errors:
+            raise TreeRemoveError(Path(path), removal.errors)
+        return removal.removed
+
+    def _remove_fd(self, path, removal):
+        parent, name = os.path.split(path)
+        slots = threading.Semaphore(self.workers * 4)
+        idle = threading.Event()
+        # the caller holds one reference until the root was handed out, so
+        # idle is set even if nothing was offloaded to the pool
+        pending = [1]
+        lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+
+            def offload(parent_fd, name, path, depth):
+                try:
+                    dup = os.dup(parent_fd)
+                except OSError:
+                    # out of descriptors, walk it here
+                    slots.release()
+                    clear(parent_fd, name, path, depth)
+                    return
+                with lock:
+                    pending[0] += 1
+                pool.submit(run, dup, name, path, depth)
+
+            def run(parent_fd, name, path, depth):
+                try:
+                    clear(parent_fd, name, path, depth)
+                finally:
+                    os.close(parent_fd)
+                    finish()
+
+            def finish():
+                slots.release()
+                leave()
+
+            def leave():
+                with lock:
+                    pending[0] -= 1
+                    if not pending[0]:
+                        idle.set()
+
+            def clear(parent_fd, name, path, depth):
+                try:
+                    fd = os.open(name, self.FLAGS, dir_fd=parent_fd)
+                except OSError as e:
+                    removal.error(path, e)
+                    return
+                try:
+                    self._clear(fd, path, depth, removal, slots,
+                                offload, clear)
+                finally:
+                    os.close(fd)
+
+            parent_fd = os.open(parent, self.FLAGS)
+            try:
+                slots.acquire()
+                offload(parent_fd, name, path, 0)
+            finally:
+                os.close(parent_fd)
+                leave()
+            idle.wait()
+
+            # directories are empty now, remove them bottom-up
+            removal.dirs.append((0, parent, name))
+            removal.dirs.sort(reverse=True)
+            for depth, level in groupby(removal.dirs, key=lambda d: d[0]):
+                groups = groupby(level, key=lambda d: d[1])
+                futures = [
+                    pool.submit(
+                        self._rmdirs, parent, [d[2] for d in dirs], removal
+                    )
+                    for parent, dirs in groups
+                ]
+                for future in futures:
+                    future.result()
+
+    def _clear(self, fd, path, depth, removal, slots, offload, clear):
+        try:
+            with os.scandir(fd) as it:
+                entries = list(it)
+        except OSError as e:
+            removal.error(path, e)
+            return
+        removed = 0
+        for entry in entries:
+            child = os.path.join(path, entry.name)
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            if is_dir:
+                removal.dirs.append((depth + 1, path, entry.name))
+                if slots.acquire(blocking=False):
+                    offload(fd, entry.name, child, depth + 1)
+                else:
+                    clear(fd, entry.name, child, depth + 1)
+                continue
+            try:
+                os.unlink(entry.name, dir_fd=fd)
+                removed += 1
+            except OSError as e:
+                removal.error(child, e)
+        removal.done(removed)
+
+    def _rmdirs(self, parent, names, removal):
+        try:
+            fd = os.open(parent, self.FLAGS)
+        except OSError as e:
+            for name in names:
+                removal.error(os.path.join(parent, name), e)
+            return
+        removed = 0
+        try:
+            for name in names:
+                try:
+                    os.rmdir(name, dir_fd=fd)
+                    removed += 1
+                except OSError as e:
+                    removal.error(os.path.join(parent, name), e)
+        finally:
+            os.close(fd)
+        removal.done(removed)
+
+    def _remove_fallback(self, path, removal):
+        def onerror(func, failed, exc_info):
+            removal.error(failed, exc_info[1])
+
+        shutil.rmtree(path, onerror=onerror)
+        if not os.path.lexists(path):
+            removal.done(1)
+
+
+class _Removal:
+    """
+    State of a single remove call shared by worker threads.
+    """
+
+    def __init__(self, progress):
+        self.progress = progress
+        self.removed = 0
+        self.errors = []
+        self.dirs = []
+        self._lock = threading.Lock()
+
+    def done(self, count):
+        if not count:
+            return
+        with self._lock:
+            self.removed += count
+        if self.progress:
+            self.progress(count)
+
+    def error(self, path, exc):
+        with self._lock:
+            self.errors.append((str(path), str(exc)))
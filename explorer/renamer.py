@@ -0,0 +1,242 @@
+import logging
+import os
+import uuid
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenamePlan:
+    """
+    Ordered renames inside one directory produced by BulkRenamer.plan.
+
+    Attributes
+    ---------------
+    parent : Path
+        directory holding all renamed objects
+    pairs : list
+        (name, new_name) of every object that changes its name
+    steps : list
+        (old, new) renames in the order they run. Objects on a cycle
+        (a -> b, b -> a) are first moved to a temporary name
+    temps : int
+        number of temporary names used
+    """
+
+    def __init__(self, parent, pairs, steps, temps):
+        self.parent = parent
+        self.pairs = pairs
+        self.steps = steps
+        self.temps = temps
+
+    def inverse(self):
+        """
+        Return (new_name, name) pairs that undo the plan.
+        """
+
+        return [(new, name) for name, new in self.pairs]
+
+
+class BulkRenamer:
+    """
+    Rename many objects of a directory as a single operation. The complete
+    name mapping is validated in memory against one listing of the
+    directory - unknown sources, names used twice and names taken by objects
+    that are not renamed are reported before anything is touched. Renames
+    are ordered so chains (a -> b, b -> c) never collide, cycles are broken
+    with temporary names in a first phase. A failure rolls back the renames
+    that already ran.
+
+    Attributes
+    ---------------
+    TEMP : str
+        prefix of temporary names
+    """
+
+    TEMP = ".~rename-"
+
+    def plan(self, parent, pairs):
+        """
+        Validate a name mapping and order its renames.
+
+        Parameters
+        ---------------
+        parent : str or Path
+            dir path
+        pairs : iterable
+            (name, new_name) pairs - current and new file/dir names with
+            extension
+
+        Returns
+        ---------------
+        RenamePlan
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If a renamed object does not exist
+        FileExistsError
+            If new names collide with each other or with objects that are
+            not renamed
+        ValueError
+            If a new name is not a valid file name or an object is renamed
+            twice
+        """
+
+        parent = Path(parent)
+        existing = {os.path.normcase(name) for name in os.listdir(parent)}
+        sources = {}
+        targets = {}
+        renames = []
+        for name, new in pairs:
+            name, new = str(name), str(new)
+            _validate(new)
+            key = os.path.normcase(name)
+            if key not in existing:
+                raise FileNotFoundError(f"{parent / name} does not exist")
+            if key in sources:
+                raise ValueError(f"{name} is renamed twice")
+            sources[key] = name
+            if name == new:
+                continue
+            target = os.path.normcase(new)
+            if target in targets:
+                raise FileExistsError(
+                    f"{targets[target]} and {name} would both be named {new}"
+                )
+            targets[target] = name
+            renames.append((name, new))
+
+        renamed = {os.path.normcase(name) for name, new in renames}
+        taken = [
+            new for name, new in renames
+            if os.path.normcase(new) in existing
+            and os.path.normcase(new) not in renamed
+        ]
+        if taken:
+            shown = ", ".join(taken[:5])
+            more = f" and {len(taken) - 5} more" if len(taken) > 5 else ""
+            raise FileExistsError(f"Already exists: {shown}{more}")
+
+        steps, temps = self._order(renames, sources, existing)
+        return RenamePlan(parent, renames, steps, temps)
+
+    def _order(self, renames, sources, existing):
+        """
+        Order renames so that every target is free when it is renamed to.
+        Every name is the target of at most one rename, so renames form
+        chains and cycles only.
+        """
+
+        new_names = {}
+        for name, new in renames:
+            new_names[os.path.normcase(name)] = new
+        # rename of key has to wait until its target is renamed away
+        blocker = {}
+        for key, new in new_names.items():
+            target = os.path.normcase(new)
+            if target != key and target in new_names:
+                blocker[key] = target
+
+        breaks = []
+        chains = []
+        done = set()
+        for name, new in renames:
+            key = os.path.normcase(name)
+            if key in done:
+                continue
+            path = [key]
+            on_path = {key}
+            while path[-1] in blocker and blocker[path[-1]] not in done:
+                nxt = blocker[path[-1]]
+                if nxt in on_path:
+                    # cycle, park nxt under a temporary name first
+                    start = path.index(nxt)
+                    breaks.append(nxt)
+                    chains.append(path[start + 1:][::-1] + [nxt])
+                    chains.append(path[:start][::-1])
+                    break
+                path.append(nxt)
+                on_path.add(nxt)
+            else:
+                chains.append(path[::-1])
+            done.update(path)
+
+        temps = {}
+        for key in breaks:
+            temps[key] = self._temp_name(sources[key], existing)
+        steps = [(sources[key], temps[key]) for key in breaks]
+        for chain in chains:
+            for key in chain:
+                steps.append((temps.get(key, sources[key]), new_names[key]))
+        return steps, len(temps)
+
+    def _temp_name(self, name, existing):
+        while True:
+            temp = f"{self.TEMP}{uuid.uuid4().hex[:8]}-{name}"
+            key = os.path.normcase(temp)
+            if key not in existing:
+                existing.add(key)
+                return temp
+
+    def run(self, plan):
+        """
+        Run renames of a plan. If any of them fails the ones already done are
+        reverted and the error is raised.
+
+        Parameters
+        ---------------
+        plan : RenamePlan
+
+        Returns
+        ---------------
+        list
+            (src, new) Path pairs of renamed objects
+        """
+
+        parent = plan.parent
+        done = []
+        try:
+            for old, new in plan.steps:
+                src = parent / old
+                dst = parent / new
+                if os.path.lexists(dst) and \
+                        not os.path.samestat(os.lstat(src), os.lstat(dst)):
+                    # POSIX rename silently replaces files
+                    raise FileExistsError(f"{dst} already exists")
+                os.rename(src, dst)
+                done.append((old, new))
+        except OSError:
+            for old, new in reversed(done):
+                try:
+                    os.rename(parent / new, parent / old)
+                except OSError as e:
+                    logger.error("could not roll back %s: %s", new, e)
+            raise
+        return [(parent / name, parent / new) for name, new in plan.pairs]
+
+    def rename(self, parent, pairs):
+        """
+        Plan and run renames in one go.
+
+        Parameters
+        ---------------
+        parent : str or Path
+            dir path
+        pairs : iterable
+            (name, new_name) pairs
+
+        Returns
+        ---------------
+        list
+            (src, new) Path pairs of renamed objects
+        """
+
+        return self.run(self.plan(parent, pairs))
+
+
+def _validate(name):
+    if not name or name in (".", "..") or os.sep in name or \
+            (os.altsep and os.altsep in name):
+        raise ValueError(f"Invalid file name: {name!r}")
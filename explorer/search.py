@@ -0,0 +1,469 @@
+import fnmatch
+import os
+import re
+import stat
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+
+Hit = namedtuple("Hit", ["path", "type"])
+Hit.__doc__ = """
+Single search result.
+
+Attributes
+---------------
+path : Path
+    path to file/dir
+type : {files, dirs}
+    obj type
+"""
+
+
+_Snapshot = namedtuple(
+    "_Snapshot", ["names", "parents", "kinds", "alive", "trigrams"]
+)
+
+
+class SearchIndex:
+    """
+    In-memory index of file and dir names under a root directory. Entries
+    are kept in compact parallel arrays - name, parent entry and kind - so
+    a path is only assembled for results. Every name is added to posting
+    lists of its trigrams, substring and glob queries only check entries
+    sharing the rarest trigram of the query. Shorter literals and regular
+    expressions are searched in one string of all names, so the scan runs
+    in C. Queries are case-insensitive.
+
+    The index is built with a parallel scandir walk and updated one
+    directory at a time. Removed entries are marked dead, once they make up
+    more than MAX_DEAD of all entries the arrays and posting lists are
+    rebuilt without them. Entry ids change then, searches in progress keep
+    reading the arrays they started with.
+
+    Parameters
+    ---------------
+    root : str or Path
+        indexed dir
+    workers : int, default=8
+        number of directories read at the same time while building
+
+    Attributes
+    ---------------
+    count : int
+        number of indexed files/dirs
+    ready : threading.Event
+        set once build finished
+    """
+
+    MODES = ("substring", "glob", "regex")
+    ROOT = -1
+    # fraction of dead entries above which the index is compacted
+    MAX_DEAD = 0.25
+    # number of dead entries always tolerated
+    MIN_DEAD = 1024
+
+    def __init__(self, root, workers=8):
+        self.root = Path(os.path.abspath(root))
+        self.workers = workers
+        self.count = 0
+        self.ready = threading.Event()
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.names = []
+        self.parents = array("i")
+        self.kinds = bytearray()
+        self.alive = bytearray()
+        self.children = {self.ROOT: {}}
+        self.trigrams = {}
+        self.count = 0
+        self._blob = None
+
+    def build(self):
+        """
+        Index the whole tree, replacing current content.
+
+        Returns
+        ---------------
+        SearchIndex
+            self
+        """
+
+        with self._lock:
+            self.ready.clear()
+            self._reset()
+            self._walk([self.ROOT])
+            self.ready.set()
+        return self
+
+    def start(self):
+        """
+        Build the index on a daemon thread. Wait for ready before searching.
+
+        Returns
+        ---------------
+        threading.Thread
+        """
+
+        thread = threading.Thread(
+            target=self.build, name="search-index", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _walk(self, dirs):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {
+                pool.submit(_scan, self.path(dir_id)): dir_id
+                for dir_id in dirs
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_id = pending.pop(future)
+                    for name, is_dir in future.result() or ():
+                        i = self._add(name, dir_id, is_dir)
+                        if is_dir:
+                            pending[pool.submit(_scan, self.path(i))] = i
+
+    def _add(self, name, parent, is_dir):
+        i = len(self.names)
+        name = sys.intern(name)
+        self.names.append(name)
+        self.parents.append(parent)
+        self.kinds.append(is_dir)
+        self.alive.append(1)
+        self.children[parent][name] = i
+        if is_dir:
+            self.children[i] = {}
+        for trigram in _trigrams(name.casefold()):
+            postings = self.trigrams.get(trigram)
+            if postings is None:
+                postings = self.trigrams[trigram] = array("i")
+            postings.append(i)
+        self.count += 1
+        self._blob = None
+        return i
+
+    def _remove(self, i):
+        stack = [i]
+        parent = self.parents[i]
+        self.children[parent].pop(self.names[i], None)
+        while stack:
+            i = stack.pop()
+            self.alive[i] = 0
+            self.count -= 1
+            stack.extend(self.children.pop(i, {}).values())
+        self._blob = None
+
+    def _compact(self):
+        """
+        Drop dead entries. Ids keep their order, so parents still precede
+        their children and posting lists stay sorted. New containers are
+        built, the old ones are left to searches in progress.
+        """
+
+        names = []
+        parents = array("i")
+        kinds = bytearray()
+        children = {self.ROOT: {}}
+        new_ids = array("i", [self.ROOT]) * len(self.names)
+        for i, alive in enumerate(self.alive):
+            if not alive:
+                continue
+            new = new_ids[i] = len(names)
+            name = self.names[i]
+            parent = self.parents[i]
+            if parent != self.ROOT:
+                parent = new_ids[parent]
+            names.append(name)
+            parents.append(parent)
+            kinds.append(self.kinds[i])
+            children[parent][name] = new
+            if self.kinds[i]:
+                children[new] = {}
+        trigrams = {}
+        alive = self.alive
+        for trigram, postings in self.trigrams.items():
+            kept = array("i", [new_ids[i] for i in postings if alive[i]])
+            if kept:
+                trigrams[trigram] = kept
+        self.names = names
+        self.parents = parents
+        self.kinds = kinds
+        self.alive = bytearray(b"\1") * len(names)
+        self.children = children
+        self.trigrams = trigrams
+        self._blob = None
+
+    def path(self, i):
+        """
+        Return path of an entry.
+
+        Parameters
+        ---------------
+        i : int
+            entry id, ROOT for the indexed dir
+
+        Returns
+        ---------------
+        Path
+        """
+
+        return self._path(i, self.names, self.parents)
+
+    def _path(self, i, names, parents):
+        parts = []
+        while i != self.ROOT:
+            parts.append(names[i])
+            i = parents[i]
+        return self.root.joinpath(*reversed(parts))
+
+    def _find(self, path):
+        try:
+            parts = Path(os.path.abspath(path)).relative_to(self.root).parts
+        except ValueError:
+            return None
+        i = self.ROOT
+        for part in parts:
+            i = self.children.get(i, {}).get(part)
+            if i is None:
+                return None
+        return i
+
+    def update(self, directory, names=None):
+        """
+        Bring entries of a single directory in line with the disk. New
+        subdirectories are indexed with their content, entries that are gone
+        are removed with their content.
+
+        Parameters
+        ---------------
+        directory : str or Path
+            dir path, ignored if it is not indexed
+        names : iterable, default=None
+            check only these children instead of reading the whole dir
+        """
+
+        with self._lock:
+            dir_id = self._find(directory)
+            if dir_id is None:
+                return
+            if names is not None:
+                self._update_names(dir_id, names)
+            else:
+                self._update_dir(dir_id)
+            # ids are stable until here, walks above still use them
+            dead = len(self.names) - self.count
+            if dead > max(self.MIN_DEAD, len(self.names) * self.MAX_DEAD):
+                self._compact()
+
+    def _update_dir(self, dir_id):
+        entries = _scan(self.path(dir_id))
+        if entries is None:
+            if dir_id != self.ROOT:
+                self._remove(dir_id)
+            return
+        current = self.children[dir_id]
+        found = dict(entries)
+        for name, i in list(current.items()):
+            if found.get(name) != bool(self.kinds[i]):
+                self._remove(i)
+        new_dirs = []
+        for name, is_dir in entries:
+            if name not in current:
+                i = self._add(name, dir_id, is_dir)
+                if is_dir:
+                    new_dirs.append(i)
+        if new_dirs:
+            self._walk(new_dirs)
+
+    def _update_names(self, dir_id, names):
+        parent = self.path(dir_id)
+        current = self.children[dir_id]
+        new_dirs = []
+        for name in names:
+            try:
+                is_dir = stat.S_ISDIR(os.lstat(parent / name).st_mode)
+            except OSError:
+                is_dir = None
+            i = current.get(name)
+            if i is not None:
+                if is_dir == bool(self.kinds[i]):
+                    continue
+                self._remove(i)
+            if is_dir is not None:
+                i = self._add(name, dir_id, is_dir)
+                if is_dir:
+                    new_dirs.append(i)
+        if new_dirs:
+            self._walk(new_dirs)
+
+    def search(self, query, mode="substring"):
+        """
+        Find files/dirs with matching names. The query is checked right away,
+        results are produced lazily while the stream is consumed.
+
+        Parameters
+        ---------------
+        query : str
+            text contained in names, glob pattern matched against whole
+            names or regular expression searched in names
+        mode : {substring, glob, regex}, default=substring
+            query type
+
+        Returns
+        ---------------
+        generator
+            yields Hit objects in index order
+
+        Raises
+        ---------------
+        ValueError
+            If mode is unknown or the regular expression is invalid
+        """
+
+        if mode not in self.MODES:
+            raise ValueError(f"mode should be one of {self.MODES} not {mode}")
+        query = query.casefold()
+        snap = self._snapshot()
+        if mode == "substring":
+            ids = self._verified(
+                snap, self._candidates(snap, query),
+                lambda name: query in name
+            )
+        elif mode == "glob":
+            regex = re.compile(fnmatch.translate(query))
+            literals = re.split(r"[*?]+", re.sub(r"\[[^\]]*\]", "?", query))
+            ids = self._verified(
+                snap, self._candidates(snap, max(literals, key=len)),
+                regex.match
+            )
+        else:
+            try:
+                regex = re.compile(query, re.IGNORECASE | re.MULTILINE)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}") from None
+            ids = self._verified(
+                snap, self._regex_candidates(snap, regex), regex.search
+            )
+        return (self._hit(snap, i) for i in ids)
+
+    def _snapshot(self):
+        """
+        Return containers searched by a query. Compaction replaces them, so
+        ids found by the query stay valid in the snapshot.
+        """
+
+        with self._lock:
+            return _Snapshot(
+                self.names, self.parents, self.kinds, self.alive,
+                self.trigrams
+            )
+
+    def _hit(self, snap, i):
+        return Hit(
+            self._path(i, snap.names, snap.parents),
+            "dirs" if snap.kinds[i] else "files"
+        )
+
+    def _verified(self, snap, candidates, check):
+        names = snap.names
+        alive = snap.alive
+        for i in candidates:
+            if alive[i] and check(names[i].casefold()):
+                yield i
+
+    def _candidates(self, snap, literal):
+        """
+        Return ids of entries that may contain literal.
+        """
+
+        if len(literal) >= 3:
+            postings = [snap.trigrams.get(t) for t in _trigrams(literal)]
+            if not all(postings):
+                return iter(())
+            return iter(min(postings, key=len))
+        if literal:
+            return self._blob_find(snap, literal)
+        return iter(range(len(snap.names)))
+
+    def _blob_find(self, snap, literal):
+        blob, starts = self._get_blob(snap)
+        pos = blob.find(literal)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            yield i
+            if i + 1 >= len(starts):
+                return
+            pos = blob.find(literal, starts[i + 1])
+
+    def _regex_candidates(self, snap, regex):
+        blob, starts = self._get_blob(snap)
+        pos = 0
+        while pos <= len(blob):
+            match = regex.search(blob, pos)
+            if match is None:
+                return
+            i = bisect_right(starts, match.start()) - 1
+            yield i
+            if i + 1 >= len(starts):
+                return
+            pos = starts[i + 1]
+
+    def _get_blob(self, snap):
+        """
+        Return casefolded names joined with newlines and start offset of
+        every name. Built on demand after the index changed.
+        """
+
+        with self._lock:
+            if snap.names is not self.names:
+                # compacted since the search started
+                return _join(snap)
+            if self._blob is None:
+                self._blob = _join(snap)
+            return self._blob
+
+
+def _join(snap):
+    folded = [
+        name.casefold() if alive else ""
+        for name, alive in zip(snap.names, snap.alive)
+    ]
+    starts = array("q")
+    pos = 0
+    for name in folded:
+        starts.append(pos)
+        pos += len(name) + 1
+    return "\n".join(folded), starts
+
+
+def _scan(path):
+    """
+    Return (name, is_dir) of dir children or None if it can't be read.
+    Symbolic links are not followed.
+    """
+
+    try:
+        with os.scandir(path) as it:
+            entries = []
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name, is_dir))
+            return entries
+    except OSError:
+        return None
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
@@ -0,0 +1,305 @@
+import os
+import queue
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class DirRecord:
+    """
+    Cached state of a single directory.
+
+    Attributes
+    ---------------
+    mtime : int
+        dir modification time in ns when it was read
+    own : int
+        total size of files directly in the dir
+    children : tuple
+        (name, key) of subdirectories
+    total : int or None
+        size of the whole tree, None if it has to be summed again
+    """
+
+    __slots__ = ("mtime", "own", "children", "total")
+
+    def __init__(self, mtime, own, children):
+        self.mtime = mtime
+        self.own = own
+        self.children = children
+        self.total = None
+
+
+class SizeService:
+    """
+    Compute recursive directory sizes in the background. Every directory read
+    is cached by (device, inode) together with its mtime, so a tree is only
+    walked once - later requests read directories that changed and reuse
+    totals of the rest. Subdirectories are read in parallel.
+
+    A cached total is trusted until the directory or one of its descendants
+    is invalidated or found modified, so sizes are reused when navigating up
+    and down the same tree. Files modified in place don't change the mtime of
+    their directory and are picked up once the directory changes.
+
+    Requests are served newest first, results are collected by results().
+
+    Parameters
+    ---------------
+    workers : int, default=8
+        number of directories read at the same time
+    max_dirs : int, default=2 ** 20
+        number of cached directory records, the oldest are dropped first
+    """
+
+    def __init__(self, workers=8, max_dirs=2 ** 20):
+        self.workers = workers
+        self.max_dirs = max_dirs
+        self._records = {}
+        self._paths = {}
+        self._jobs = []
+        self._results = []
+        self._cond = threading.Condition()
+        self._pool = None
+        self._thread = None
+        self._closed = False
+
+    def size(self, path):
+        """
+        Return cached total size of a directory without touching the disk.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Returns
+        ---------------
+        int or None
+            size in bytes or None if it is not known
+        """
+
+        rec = self._records.get(self._paths.get(os.path.abspath(path)))
+        return rec.total if rec is not None else None
+
+    def measure(self, path):
+        """
+        Compute total size of a directory tree, reading only directories
+        that are not cached or changed.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Returns
+        ---------------
+        int or None
+            size in bytes or None if path is not a readable directory
+        """
+
+        path = Path(os.path.abspath(path))
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        total, changed = self._walk(str(path), st)
+        if changed:
+            self.invalidate(path.parent)
+        return total
+
+    def request(self, directory, names):
+        """
+        Schedule size computation of subdirectories. A newer request is served
+        before the rest of older ones, names still pending for the same
+        directory are served after the new ones.
+
+        Parameters
+        ---------------
+        directory : str or Path
+            parent dir path
+        names : iterable
+            subdirectory names
+        """
+
+        directory = Path(os.path.abspath(directory))
+        with self._cond:
+            names = list(dict.fromkeys(names))
+            for job in self._jobs:
+                if job[0] == directory:
+                    self._jobs.remove(job)
+                    queued = set(names)
+                    names += [n for n in reversed(job[1]) if n not in queued]
+                    break
+            if names:
+                self._jobs.append((directory, names[::-1]))
+                self._start()
+                self._cond.notify()
+
+    def results(self):
+        """
+        Return sizes computed since the last call.
+
+        Returns
+        ---------------
+        list
+            (parent dir Path, name, size in bytes) tuples
+        """
+
+        with self._cond:
+            results, self._results = self._results, []
+        return results
+
+    def invalidate(self, path):
+        """
+        Drop cached totals of a directory and its ancestors, so they are
+        summed again. Directory contents are still reused if unchanged.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+        """
+
+        path = Path(os.path.abspath(path))
+        for directory in (path, *path.parents):
+            rec = self._records.get(self._paths.get(str(directory)))
+            if rec is not None:
+                rec.total = None
+
+    def clear(self):
+        """
+        Drop all cached directories.
+        """
+
+        self._records.clear()
+        self._paths.clear()
+
+    def close(self):
+        """
+        Drop pending requests and stop background threads.
+        """
+
+        with self._cond:
+            self._closed = True
+            self._jobs.clear()
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="size-service", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                directory, names = self._jobs[-1]
+                name = names.pop()
+                if not names:
+                    self._jobs.pop()
+            size = self.measure(os.path.join(directory, name))
+            if size is not None:
+                with self._cond:
+                    self._results.append((directory, name, size))
+
+    def _walk(self, path, st):
+        """
+        Read the tree breadth-first in parallel and sum totals bottom-up.
+        Returns root total and whether any directory had to be read again.
+        """
+
+        order = []
+        changed = False
+        done = queue.SimpleQueue()
+        pool = self._executor()
+        pool.submit(self._visit, path, st).add_done_callback(done.put)
+        pending = 1
+        while pending:
+            rec, children, read = done.get().result()
+            pending -= 1
+            changed = changed or read
+            order.append(rec)
+            for child in children:
+                pool.submit(self._visit, *child).add_done_callback(done.put)
+            pending += len(children)
+        for rec in reversed(order):
+            if rec.total is None:
+                rec.total = rec.own + sum(
+                    self._total(key) for _, key in rec.children
+                )
+        self._evict()
+        return order[0].total, changed
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="dir-size"
+            )
+        return self._pool
+
+    def _total(self, key):
+        rec = self._records.get(key)
+        if rec is None or rec.total is None:
+            return 0
+        return rec.total
+
+    def _visit(self, path, st):
+        """
+        Return record of a dir, subdirs that have to be visited and whether
+        the dir was read.
+        """
+
+        key = (st.st_dev, st.st_ino)
+        self._paths[path] = key
+        rec = self._records.get(key)
+        if rec is not None and rec.mtime == st.st_mtime_ns:
+            if rec.total is not None:
+                return rec, [], False
+            children = []
+            for name, _ in rec.children:
+                child = os.path.join(path, name)
+                try:
+                    children.append((child, os.lstat(child)))
+                except OSError:
+                    break
+            else:
+                return rec, children, False
+        own = 0
+        children = []
+        names = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        child = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if stat.S_ISDIR(child.st_mode):
+                        children.append((entry.path, child))
+                        names.append((entry.name, (child.st_dev, child.st_ino)))
+                    else:
+                        own += child.st_size
+        except OSError:
+            pass
+        rec = DirRecord(st.st_mtime_ns, own, tuple(names))
+        self._records[key] = rec
+        return rec, children, True
+
+    def _evict(self):
+        while len(self._records) > self.max_dirs:
+            del self._records[next(iter(self._records))]
+        while len(self._paths) > self.max_dirs:
+            del self._paths[next(iter(self._paths))]
@@ -0,0 +1,193 @@
+import re
+import time
+from pathlib import PurePath
+
+
+class RenameTemplate:
+    """
+    Rename template compiled once and evaluated for many objects. Text is
+    copied as it is, fields in braces are replaced for every object:
+
+    {name}              current name without extension
+    {ext}               extension without the dot
+    {n}                 counter - start, start + step...
+    {mtime}, {ctime}    modification/creation time, "%Y%m%d" by default
+    {today}             current date, "%Y%m%d" by default
+    {size}              size in bytes
+    {0}, {1}, {group}   whole match, capture groups of pattern
+
+    A format spec follows a colon - {n:03} pads the counter to 3 digits,
+    {ctime:%Y-%m-%d %H%M} formats the date. Case transforms follow a
+    pipe - {name|upper}, {1|title}. Available transforms: upper, lower,
+    title, capitalize, swapcase. Use {{ and }} for literal braces.
+
+    Parameters
+    ---------------
+    template : str
+        template text
+    pattern : str, default=None
+        regular expression searched in the current name without extension
+    start : int, default=1
+        first counter value
+    step : int, default=1
+        counter increment
+
+    Raises
+    ---------------
+    ValueError
+        If template or pattern is invalid
+    """
+
+    TOKENS = ("name", "ext", "n", "mtime", "ctime", "today", "size")
+    CASES = {
+        "upper": str.upper,
+        "lower": str.lower,
+        "title": str.title,
+        "capitalize": str.capitalize,
+        "swapcase": str.swapcase
+    }
+    DATE = "%Y%m%d"
+
+    _FIELD = re.compile(r"\{\{|\}\}|\{([^{}]*)\}|[{}]")
+
+    def __init__(self, template, pattern=None, start=1, step=1):
+        self.template = template
+        self.start = start
+        self.step = step
+        try:
+            self.regex = re.compile(pattern) if pattern else None
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {e}") from None
+        self._today = time.localtime()
+        self._parts = self._compile(template)
+
+    @classmethod
+    def literal(cls, text):
+        """
+        Return template that renders text as it is.
+        """
+
+        return cls(str(text).replace("{", "{{").replace("}", "}}"))
+
+    def _compile(self, template):
+        parts = []
+        pos = 0
+        for match in self._FIELD.finditer(template):
+            if match.start() > pos:
+                parts.append(template[pos:match.start()])
+            pos = match.end()
+            text = match.group()
+            if text in ("{{", "}}"):
+                parts.append(text[0])
+            elif match.group(1) is None:
+                raise ValueError(f"Unbalanced brace at {match.start()}")
+            else:
+                parts.append(self._field(match.group(1)))
+        parts.append(template[pos:])
+        return [part for part in parts if part != ""]
+
+    def _field(self, field):
+        field, *cases = field.split("|")
+        key, sep, spec = field.partition(":")
+        key = key.strip()
+        for case in cases:
+            if case not in self.CASES:
+                raise ValueError(f"Unknown transform: {case}")
+        transforms = [self.CASES[case] for case in cases]
+        groups = self.regex.groupindex if self.regex else {}
+        if key.isdigit() or key in groups:
+            group = int(key) if key.isdigit() else key
+            if self.regex is None or (
+                isinstance(group, int) and group > self.regex.groups
+            ):
+                raise ValueError(f"No group {key} in pattern")
+            getter = _group(group)
+        elif key in ("mtime", "ctime"):
+            getter = _date(key, spec or self.DATE)
+            spec = ""
+        elif key == "today":
+            today = time.strftime(spec or self.DATE, self._today)
+            getter = lambda *args: today
+            spec = ""
+        elif key in self.TOKENS:
+            getter = _TOKENS[key]
+        else:
+            raise ValueError(f"Unknown field: {key}")
+        try:
+            format(0 if key in ("n", "size") else "", spec)
+        except ValueError:
+            raise ValueError(f"Invalid format of {key}: {spec}") from None
+        return getter, spec, transforms
+
+    def render(self, index, entry):
+        """
+        Return new name of an object, without extension.
+
+        Parameters
+        ---------------
+        index : int
+            object position in the renamed batch
+        entry : Entry
+            object metadata
+
+        Returns
+        ---------------
+        str
+        """
+
+        path = PurePath(entry.name)
+        match = self.regex.search(path.stem) if self.regex else None
+        counter = self.start + index * self.step
+        parts = []
+        for part in self._parts:
+            if isinstance(part, str):
+                parts.append(part)
+                continue
+            getter, spec, transforms = part
+            value = format(getter(path, entry, counter, match), spec)
+            for transform in transforms:
+                value = transform(value)
+            parts.append(value)
+        return "".join(parts)
+
+    def names(self, entries, offset=0):
+        """
+        Render new names lazily.
+
+        Parameters
+        ---------------
+        entries : iterable
+            Entry objects in batch order
+        offset : int, default=0
+            index of the first entry in the whole batch
+
+        Yields
+        ---------------
+        str
+            new name with the current extension
+        """
+
+        for index, entry in enumerate(entries, offset):
+            yield self.render(index, entry) + PurePath(entry.name).suffix
+
+
+def _group(group):
+    def getter(path, entry, counter, match):
+        if match is None:
+            return ""
+        return match.group(group) or ""
+    return getter
+
+
+def _date(attr, date_format):
+    def getter(path, entry, counter, match):
+        return time.strftime(date_format, time.localtime(getattr(entry, attr)))
+    return getter
+
+
+_TOKENS = {
+    "name": lambda path, entry, counter, match: path.stem,
+    "ext": lambda path, entry, counter, match: path.suffix[1:],
+    "n": lambda path, entry, counter, match: counter,
+    "size": lambda path, entry, counter, match: entry.size
+}
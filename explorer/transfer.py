@@ -0,0 +1,223 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from explorer.planner import Planner
+
+
+class TransferJob:
+    """
+    Copy or move a batch of files/dirs and track progress. Progress counters
+    are updated from worker threads and can be read from any thread.
+
+    Parameters
+    ---------------
+    fe : FileExplorer
+        performs single copy/move operations
+    func : {copy, move}
+        file operation
+    items : list
+        (src, dst) pairs - path to source file/dir and destination dir
+    journal : Journal, default=None
+        logs intents and finished items of the job
+
+    Attributes
+    ---------------
+    bytes_done : int
+        number of bytes copied so far
+    files_done : int
+        number of files copied so far
+    started : float or None
+        time.monotonic() when the job started
+    finished : float or None
+        time.monotonic() when the job finished
+    plan : Plan or None
+        validated batch, set once the job started
+    results : list
+        cache items for every file/dir transferred successfully
+    failures : list
+        (src, exception) for every file/dir that failed
+    error : Exception or None
+        first failure or error that prevented the job from running
+    touched : set
+        Path objects of modified directories
+    batch : int or None
+        journal batch id
+    """
+
+    def __init__(self, fe, func, items, journal=None):
+        self.fe = fe
+        self.func = func
+        self.items = items
+        self.journal = journal
+        self.batch = None
+        self.bytes_done = 0
+        self.files_done = 0
+        self.started = None
+        self.finished = None
+        self.plan = None
+        self.results = []
+        self.failures = []
+        self.error = None
+        self.touched = set()
+        self._lock = threading.Lock()
+
+    def progress(self, nbytes, nfiles=1):
+        """
+        Report copied data. Called by FileExplorer for every copied file.
+
+        Parameters
+        ---------------
+        nbytes : int
+            number of bytes copied
+        nfiles : int, default=1
+            number of files copied
+        """
+
+        with self._lock:
+            self.bytes_done += nbytes
+            self.files_done += nfiles
+
+    @property
+    def throughput(self):
+        """
+        Average throughput in bytes per second.
+        """
+
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.monotonic()
+        elapsed = end - self.started
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def done(self):
+        """
+        True if the job finished, successfully or not.
+        """
+
+        return self.finished is not None
+
+    def _item(self, src, func, dst, new_obj):
+        return {"src": src, "func": func, "dst": Path(dst), "new_obj": new_obj}
+
+    def run(self):
+        """
+        Plan the whole batch, then transfer items one by one. Items that fail
+        don't stop the rest, results hold exactly the ones that succeeded.
+        """
+
+        self.started = time.monotonic()
+        try:
+            planner = Planner(self.fe)
+            self.plan = planner.plan(self.func, self.items)
+            if self.journal:
+                self.batch = self.journal.begin(
+                    self.func, self.items,
+                    [item.target for item in self.plan.items]
+                )
+            for item in self.plan.items:
+                self.touched.add(item.dst)
+                if self.func == "move":
+                    self.touched.add(Path(item.src).parent)
+            items = planner.run(
+                self.plan, progress=self.progress, retarget=self._retarget
+            )
+            for i, item in enumerate(items):
+                if item.new_obj is not None:
+                    self._result(i, self._item(
+                        item.src, item.func, item.dst, item.new_obj
+                    ))
+                if item.error is not None:
+                    self.failures.append((item.src, item.error))
+            if self.failures:
+                self.error = self.failures[0][1]
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = time.monotonic()
+
+    def _retarget(self, i, target):
+        if self.journal:
+            self.journal.retarget(self.batch, i, target)
+
+    def _result(self, i, item):
+        self.results.append(item)
+        if self.journal:
+            self.journal.done(self.batch, i, item)
+
+
+class TransferEngine:
+    """
+    Run transfer jobs on worker threads. Finished jobs are put on a
+    thread-safe queue which should be drained from the GUI thread.
+
+    Parameters
+    ---------------
+    workers : int, default=2
+        number of jobs running at the same time
+
+    Attributes
+    ---------------
+    active : set
+        submitted jobs that were not polled yet
+    """
+
+    def __init__(self, workers=2):
+        self.active = set()
+        self._done = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="transfer"
+        )
+
+    def submit(self, job):
+        """
+        Start a job in the background.
+
+        Parameters
+        ---------------
+        job : TransferJob
+
+        Returns
+        ---------------
+        TransferJob
+            submitted job
+        """
+
+        self.active.add(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        try:
+            job.run()
+        finally:
+            self._done.put(job)
+
+    def poll(self):
+        """
+        Return jobs finished since the last call. Never blocks.
+
+        Returns
+        ---------------
+        list
+            finished TransferJob objects
+        """
+
+        finished = []
+        while True:
+            try:
+                job = self._done.get_nowait()
+            except queue.Empty:
+                return finished
+            self.active.discard(job)
+            finished.append(job)
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting jobs and optionally wait for running ones.
+        """
+
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,376 @@
+import logging
+import os
+import stat
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from explorer.listing import tree_size
+from explorer.remover import TreeRemover
+
+
+logger = logging.getLogger(__name__)
+
+_UID = os.getuid() if hasattr(os, "getuid") else None
+
+
+class Trash:
+    """
+    Per-volume trash. Deleted files/dirs are renamed into a trash dir on the
+    same device, so deleting any tree takes a single rename and can be
+    undone by renaming it back. A background thread purges items older than
+    max_age and the oldest items once the trash grows above max_bytes.
+
+    Every trashed object lives in its own item dir named
+    <time_ns>-<random>/<original name> inside the trash dir, which is placed
+    in the topmost writable ancestor of the deleted object on its device.
+    Trash dirs are named per user, like .Trash-<uid> of the freedesktop
+    trash spec. Trash and item dirs are accessible to their owner only, a
+    trash dir that is a symlink, belongs to someone else or can't be made
+    private is skipped in favour of the next writable ancestor.
+
+    Parameters
+    ---------------
+    max_bytes : int or None, default=10 GiB
+        size quota of every trash dir. None disables the size limit
+    max_age : float or None, default=30 days
+        seconds after which trashed items are purged. None keeps them forever
+    interval : float, default=60
+        seconds between purge passes
+
+    Attributes
+    ---------------
+    dirname : str
+        name of trash dirs of the current user
+    roots : set
+        Path objects of trash dirs used in this session
+    purged : int
+        number of items purged so far
+    """
+
+    DIRNAME = ".explorer_trash"
+    PURGING = ".purge-"
+
+    def __init__(self, max_bytes=10 * 2 ** 30, max_age=30 * 24 * 3600,
+                 interval=60):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.dirname = self.DIRNAME if _UID is None \
+            else f"{self.DIRNAME}-{_UID}"
+        self.roots = set()
+        self.purged = 0
+        self._sizes = {}
+        self._located = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._remover = TreeRemover(workers=2)
+
+    def locate(self, path):
+        """
+        Return trash dir for a file/dir. The dir is created if missing.
+
+        Parameters
+        ---------------
+        path : str or Path
+            path to file/dir
+
+        Returns
+        ---------------
+        Path
+            trash dir on the same device as path
+
+        Raises
+        ---------------
+        PermissionError
+            If no ancestor of path on its device can hold a private trash dir
+        """
+
+        path = Path(os.path.abspath(path))
+        parent = path.parent
+        root = self._located.get(parent)
+        if root is not None:
+            return root
+        dev = os.lstat(path).st_dev
+        writable = []
+        for ancestor in [parent, *parent.parents]:
+            try:
+                if os.stat(ancestor).st_dev != dev:
+                    break
+            except OSError:
+                break
+            if os.access(ancestor, os.W_OK):
+                writable.append(ancestor)
+        for top in reversed(writable):
+            root = top / self.dirname
+            if self._make_private(root):
+                self._located[parent] = root
+                return root
+            logger.warning("skipping trash dir %s, it is not private", root)
+        raise PermissionError(f"No writable trash location for {path}")
+
+    def reserve(self, path):
+        """
+        Pick the path a file/dir will have in trash. Nothing is created.
+
+        Parameters
+        ---------------
+        path : str or Path
+            path to file/dir
+
+        Returns
+        ---------------
+        Path
+            path to pass to put
+
+        Raises
+        ---------------
+        ValueError
+            If path is inside a trash dir
+        """
+
+        path = Path(os.path.abspath(path))
+        root = self.locate(path)
+        if root == path or root in path.parents:
+            raise ValueError("Trash content can't be moved to trash")
+        item = root / f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        return item / path.name
+
+    def put(self, path, trashed=None):
+        """
+        Move a file/dir to trash.
+
+        Parameters
+        ---------------
+        path : str or Path
+            path to file/dir
+        trashed : Path, default=None
+            path returned by reserve, a new one is picked if None
+
+        Returns
+        ---------------
+        Path
+            path of the trashed object, pass it to restore
+        """
+
+        path = Path(os.path.abspath(path))
+        if trashed is None:
+            trashed = self.reserve(path)
+        item = trashed.parent
+        root = item.parent
+        if root not in self.roots:
+            self._check_private(root)
+        try:
+            os.mkdir(item, 0o700)
+        except FileNotFoundError:
+            # trash dir removed by someone else
+            self._check_private(root)
+            os.mkdir(item, 0o700)
+        try:
+            os.rename(path, trashed)
+        except OSError:
+            os.rmdir(item)
+            raise
+        with self._lock:
+            self.roots.add(root)
+        self.start()
+        self._wake.set()
+        return trashed
+
+    def _make_private(self, root):
+        """
+        Create trash dir readable by its owner only. Trashed objects leave
+        their parent dir, which might have kept others out. An existing dir
+        is accepted only if it is a real dir owned by the current user.
+
+        Returns
+        ---------------
+        bool
+            True if root is a private dir
+        """
+
+        try:
+            os.makedirs(root, mode=0o700, exist_ok=True)
+            st = os.lstat(root)
+            if not stat.S_ISDIR(st.st_mode):
+                return False
+            if _UID is None:
+                return True
+            if st.st_uid != _UID:
+                return False
+            if st.st_mode & 0o077:
+                os.chmod(root, 0o700)
+                st = os.lstat(root)
+        except OSError:
+            return False
+        return stat.S_ISDIR(st.st_mode) and not st.st_mode & 0o077
+
+    def _check_private(self, root):
+        if not self._make_private(root):
+            raise PermissionError(f"Trash dir {root} is not private")
+
+    def restore(self, trashed, dst):
+        """
+        Move a trashed object back.
+
+        Parameters
+        ---------------
+        trashed : str or Path
+            path returned by put
+        dst : str or Path
+            original path of the object
+
+        Returns
+        ---------------
+        Path
+            dst
+
+        Raises
+        ---------------
+        FileNotFoundError
+            If the object was already purged
+        FileExistsError
+            If dst exists
+        """
+
+        trashed = Path(trashed)
+        dst = Path(dst)
+        with self._lock:
+            if not os.path.lexists(trashed):
+                raise FileNotFoundError(f"{dst.name} was purged from trash")
+            if os.path.lexists(dst):
+                raise FileExistsError(f"{dst} already exists")
+            os.rename(trashed, dst)
+            self._sizes.pop(trashed.parent, None)
+        try:
+            os.rmdir(trashed.parent)
+        except OSError:
+            pass
+        return dst
+
+    def items(self):
+        """
+        Return items of all known trash dirs, oldest first.
+
+        Returns
+        ---------------
+        list
+            (time in seconds, item dir Path) tuples
+        """
+
+        with self._lock:
+            roots = list(self.roots)
+        items = []
+        for root in roots:
+            try:
+                names = os.listdir(root)
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith(self.PURGING):
+                    # interrupted purge
+                    self._rmtree(root / name)
+                    continue
+                stamp, sep, rest = name.partition("-")
+                if sep and stamp.isdigit():
+                    items.append((int(stamp) / 1e9, root / name))
+        items.sort()
+        return items
+
+    def purge(self, now=None):
+        """
+        Remove items that are too old or don't fit in max_bytes.
+
+        Parameters
+        ---------------
+        now : float, default=None
+            current time.time(), used in tests
+
+        Returns
+        ---------------
+        int
+            number of items removed
+        """
+
+        now = time.time() if now is None else now
+        by_root = {}
+        for stamp, item in self.items():
+            by_root.setdefault(item.parent, []).append((stamp, item))
+        removed = 0
+        for items in by_root.values():
+            total = 0
+            if self.max_bytes is not None:
+                for stamp, item in items:
+                    total += self._size(item)
+            for stamp, item in items:
+                expired = self.max_age is not None and \
+                    now - stamp > self.max_age
+                over = self.max_bytes is not None and total > self.max_bytes
+                if not (expired or over):
+                    break
+                total -= self._sizes.get(item, 0)
+                removed += self._remove(item)
+        return removed
+
+    def start(self):
+        """
+        Start the purge thread if it is not running.
+        """
+
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="trash-purge", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, wait=False):
+        """
+        Stop the purge thread.
+        """
+
+        self._stop.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if wait and thread:
+            thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.purge()
+            except Exception:
+                logger.exception("trash purge failed")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _size(self, item):
+        size = self._sizes.get(item)
+        if size is None:
+            size = tree_size(item)
+            self._sizes[item] = size
+        return size
+
+    def _remove(self, item):
+        doomed = item.parent / f"{self.PURGING}{item.name}"
+        with self._lock:
+            # renamed under the lock, so restore either wins or sees it gone
+            try:
+                os.rename(item, doomed)
+            except OSError:
+                return 0
+            self._sizes.pop(item, None)
+        self._rmtree(doomed)
+        self.purged += 1
+        return 1
+
+    def _rmtree(self, path):
+        try:
+            self._remover.remove(path)
+        except OSError as e:
+            logger.warning("could not purge %s: %s", path, e)
+
@@ -0,0 +1,122 @@
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class TreeCopyError(shutil.Error):
+    """
+    Raised when some files of a tree could not be copied. Everything else was
+    copied.
+
+    Attributes
+    ---------------
+    root : Path
+        root of the new tree
+    errors : list
+        (src, dst, reason) for every file/dir that failed
+    """
+
+    def __init__(self, root, errors):
+        super().__init__(errors)
+        self.root = root
+        self.errors = errors
+
+
+class TreeCopier:
+    """
+    Copy directory trees with a pool of worker threads. A single walker
+    creates directories in order and queues files, workers copy the files
+    concurrently. Directory metadata is copied once their content is done.
+
+    Parameters
+    ---------------
+    workers : int, default=8
+        number of files copied at the same time
+    """
+
+    def __init__(self, workers=8):
+        self.workers = workers
+
+    def copy(self, src, dst, copy_function=shutil.copy2, dirs_exist_ok=False):
+        """
+        Copy src directory to dst. dst must not exist unless dirs_exist_ok.
+
+        Parameters
+        ---------------
+        src : str or Path
+            path to source dir
+        dst : str or Path
+            path to the new dir
+        copy_function : callable, default=shutil.copy2
+            called with (src, dst) for every file
+        dirs_exist_ok : bool, default=False
+            allow dst to exist, e.g. an empty dir claimed beforehand
+
+        Returns
+        ---------------
+        Path
+            Path object for the newly created dir
+
+        Raises
+        ---------------
+        TreeCopyError
+            After the whole tree was processed, if any file/dir failed
+        FileExistsError
+            If dst already exists and dirs_exist_ok is False
+        """
+
+        src, dst = os.fspath(src), os.fspath(dst)
+        os.makedirs(dst, exist_ok=dirs_exist_ok)
+        errors = []
+        lock = threading.Lock()
+        slots = threading.BoundedSemaphore(self.workers * 64)
+
+        def copy_file(s, d):
+            try:
+                copy_function(s, d)
+            except OSError as e:
+                with lock:
+                    errors.append((s, d, str(e)))
+            finally:
+                slots.release()
+
+        dirs = [(src, dst)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            stack = [(src, dst)]
+            while stack:
+                s_dir, d_dir = stack.pop()
+                try:
+                    with os.scandir(s_dir) as it:
+                        entries = list(it)
+                except OSError as e:
+                    with lock:
+                        errors.append((s_dir, d_dir, str(e)))
+                    continue
+                for entry in entries:
+                    s, d = entry.path, os.path.join(d_dir, entry.name)
+                    try:
+                        is_dir = entry.is_dir()
+                        if is_dir:
+                            os.mkdir(d)
+                    except OSError as e:
+                        with lock:
+                            errors.append((s, d, str(e)))
+                        continue
+                    if is_dir:
+                        dirs.append((s, d))
+                        stack.append((s, d))
+                    else:
+                        slots.acquire()
+                        pool.submit(copy_file, s, d)
+
+        for s_dir, d_dir in reversed(dirs):
+            try:
+                shutil.copystat(s_dir, d_dir)
+            except OSError as e:
+                errors.append((s_dir, d_dir, str(e)))
+
+        if errors:
+            raise TreeCopyError(Path(dst), errors)
+        return Path(dst)
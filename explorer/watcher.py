@@ -0,0 +1,376 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+_EVENT = struct.Struct("iIII")
+_MISSING = object()
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError, TypeError):
+        return None
+    libc.inotify_add_watch.argtypes = [
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32
+    ]
+    return libc
+
+
+_libc = _load_libc()
+
+
+class Watcher:
+    """
+    Watch directories for changes made by any process. Linux inotify is used
+    when available, other systems fall back to polling watched directories
+    every interval. Running out of inotify instances or watches switches
+    every watched directory to polling. Events are collected on a daemon
+    thread started by the first watch and coalesced per directory until
+    changes() is called - a burst of events for one file is reported once.
+
+    Parameters
+    ---------------
+    interval : float, default=1.0
+        polling period in seconds, max time the thread takes to stop
+    polling : bool, default=False
+        poll even if inotify is available
+
+    Attributes
+    ---------------
+    polling : bool
+        True if directories are polled
+    """
+
+    # pending names of a dir above which the whole dir is reported changed
+    MAX_NAMES = 2000
+    # inotify_add_watch errors meaning no more watches can be added
+    EXHAUSTED = (errno.ENOSPC, errno.ENOMEM)
+
+    def __init__(self, interval=1.0, polling=False):
+        self.interval = interval
+        self.polling = polling or _libc is None
+        self._backend = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._refs = {}
+        self._pending = {}
+
+    @property
+    def watched(self):
+        """
+        Set of watched directory paths.
+        """
+
+        with self._lock:
+            return set(self._refs)
+
+    def watch(self, path):
+        """
+        Start watching a directory. Every call has to be matched by unwatch.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+
+        Raises
+        ---------------
+        OSError
+            If the directory can't be watched
+        """
+
+        path = Path(os.path.abspath(path))
+        with self._lock:
+            count = self._refs.get(path, 0)
+            if not count:
+                self._start()
+                try:
+                    self._backend.add(path)
+                except OSError as e:
+                    if self.polling or e.errno not in self.EXHAUSTED:
+                        raise
+                    self._fall_back()
+                    self._backend.add(path)
+            self._refs[path] = count + 1
+
+    def unwatch(self, path):
+        """
+        Stop watching a directory once every watch call has been matched.
+
+        Parameters
+        ---------------
+        path : str or Path
+            dir path
+        """
+
+        path = Path(os.path.abspath(path))
+        with self._lock:
+            count = self._refs.get(path, 0)
+            if count > 1:
+                self._refs[path] = count - 1
+            elif count:
+                del self._refs[path]
+                self._pending.pop(path, None)
+                self._backend.remove(path)
+
+    def changes(self):
+        """
+        Return changes collected since the last call.
+
+        Returns
+        ---------------
+        dict
+            dir Path: set of changed child names or None if the whole dir
+            has to be read again (dir removed, too many changes, lost events)
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def close(self):
+        """
+        Stop the watching thread and release all watches.
+        """
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            if self._backend is not None:
+                self._backend.close()
+            self._backend = None
+            self._thread = None
+            self._refs.clear()
+            self._pending.clear()
+        self._stop.clear()
+
+    def _start(self):
+        if self._backend is None:
+            if not self.polling:
+                try:
+                    self._backend = _Inotify()
+                except OSError:
+                    self.polling = True
+            if self.polling:
+                self._backend = _Polling()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="dir-watcher", daemon=True
+            )
+            self._thread.start()
+
+    def _fall_back(self):
+        """
+        Replace inotify with polling of every watched directory. The
+        inotify instance is closed by the watching thread once it stops
+        reading it.
+        """
+
+        backend = _Polling()
+        for path in self._refs:
+            try:
+                backend.add(path)
+            except OSError:
+                backend.snapshots[path] = None
+        self.polling = True
+        self._backend = backend
+
+    def _run(self):
+        while not self._stop.is_set():
+            backend = self._backend
+            events = backend.read(self.interval, self._stop)
+            with self._lock:
+                if backend is not self._backend:
+                    backend.close()
+                for directory, name in events:
+                    self._add_pending(directory, name)
+
+    def _add_pending(self, directory, name):
+        if directory not in self._refs:
+            return
+        names = self._pending.get(directory, ())
+        if names is None:
+            return
+        if name is None or len(names) >= self.MAX_NAMES:
+            self._pending[directory] = None
+        elif names:
+            names.add(name)
+        else:
+            self._pending[directory] = {name}
+
+
+class _Inotify:
+    """
+    inotify instance read without blocking. Events are (dir, name) pairs,
+    name is None if the whole dir has to be read again.
+    """
+
+    MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+
+    def __init__(self):
+        self.fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            _raise_errno()
+        self.dirs = {}
+        self.wds = {}
+        # dirs and wds are changed by read on the watching thread too
+        self._lock = threading.Lock()
+
+    def add(self, path):
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            _raise_errno(path)
+        with self._lock:
+            self.dirs[wd] = path
+            self.wds[path] = wd
+
+    def remove(self, path):
+        with self._lock:
+            wd = self.wds.pop(path, None)
+            if wd is None or self.dirs.pop(wd, None) is None:
+                return
+        _libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout, stop):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            with self._lock:
+                self._parse(data, events)
+
+    def _parse(self, data, events):
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0")
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                events.extend((d, None) for d in self.dirs.values())
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.dirs[wd]
+                if self.wds.get(directory) == wd:
+                    del self.wds[directory]
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                events.append((directory, None))
+            elif name:
+                events.append((directory, os.fsdecode(name)))
+
+    def close(self):
+        os.close(self.fd)
+        with self._lock:
+            self.dirs.clear()
+            self.wds.clear()
+
+
+class _Polling:
+    """
+    Compare snapshots of watched directories every interval.
+    """
+
+    def __init__(self):
+        self.snapshots = {}
+        # snapshots are replaced by read on the watching thread too
+        self._lock = threading.Lock()
+
+    def add(self, path):
+        snapshot = _snapshot(path)
+        with self._lock:
+            self.snapshots[path] = snapshot
+
+    def remove(self, path):
+        with self._lock:
+            self.snapshots.pop(path, None)
+
+    def read(self, timeout, stop):
+        if stop.wait(timeout):
+            return []
+        events = []
+        with self._lock:
+            snapshots = list(self.snapshots.items())
+        for path, old in snapshots:
+            try:
+                new = _snapshot(path)
+            except OSError:
+                new = None
+            with self._lock:
+                # removed or added again while the dir was read
+                if self.snapshots.get(path, _MISSING) is not old:
+                    continue
+                self.snapshots[path] = new
+            if new is None or old is None:
+                if new is not old:
+                    events.append((path, None))
+                continue
+            events.extend((path, name) for name in old.keys() ^ new.keys())
+            events.extend(
+                (path, name) for name in old.keys() & new.keys()
+                if old[name] != new[name]
+            )
+        return events
+
+    def close(self):
+        with self._lock:
+            self.snapshots.clear()
+
+
+def _snapshot(path):
+    """
+    Return name: (mode, mtime, size) of dir children.
+    """
+
+    snapshot = {}
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            snapshot[entry.name] = (st.st_mode, st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def _raise_errno(path=None):
+    err = ctypes.get_errno()
+    if path is None:
+        raise OSError(err, os.strerror(err))
+    raise OSError(err, os.strerror(err), str(path))
@@ -3,3 +3,5 @@ from gui.frames.dir_content import DirContent
 from gui.frames.object_transfer import ObjectTransfer
 from gui.frames.explorer import Explorer
 from gui.frames.rename_many import RenameMany
+from gui.frames.search import Search
+from gui.frames.duplicates import Duplicates
@@ -1,15 +1,35 @@
+import math
+import re
 import tkinter as tk
 from tkinter import ttk
 
 
 class DirContent(ttk.Frame):
     """
-    Frame holding treeview to browse directory content.
+    Frame holding treeview to browse directory content. Rows are kept in a
+    Python-side model. Listings longer than virtual_threshold switch the
+    frame to virtual mode - only rows in the viewport (plus overscan) exist
+    in the treeview and their values are swapped while scrolling.
+
+    Clicking a heading sorts rows by that column. Sort keys come from the
+    rows - raw modification time and size follow the displayed values - and
+    name keys are cached, so sorting never touches the disk. The view is
+    reordered with a single set_children call or by rendering the viewport.
+
+    A name filter hides rows without removing them from the model. A filter
+    narrowing the previous one only checks rows that are shown, rows added
+    later are checked as they arrive.
+
+    Lazy columns (last modified, size and enabled extra columns) are filled
+    by cell_source only for rows in the viewport, a sort by an extra column
+    fills it for all rows first.
 
     Parameters
     ---------------
     root : Tk or any other container Frame
         ExplorerTree master window
+    virtual_threshold : int, default=10000
+        number of rows above which the frame switches to virtual mode
 
     Attributes
     ---------------
@@ -17,19 +37,884 @@ class DirContent(ttk.Frame):
         view directory content
     scrl : tk.Scrollbar
         scroll through tree content
+    stream : generator or None
+        batches of rows still waiting to be displayed
+    stream_job : str or None
+        id of the scheduled after() callback inserting the next batch
+    items : dict
+        displayed name: tree item id (normal mode only)
+    iids : dict
+        tree item id: displayed name (normal mode only)
+    rows : dict
+        displayed name: row values
+    order : list
+        displayed names in display order
+    virtual : bool
+        True if only visible rows are materialized
+    offset : int
+        index of the first visible row (virtual mode only)
+    slots : list
+        names shown by consecutive treeview items (virtual mode only)
+    selected : set
+        selected names (virtual mode only)
+    sort_column : str or None
+        column rows are sorted by, None keeps the listing order
+    descending : bool
+        True if rows are sorted in descending order
+    name_filter : NameFilter or None
+        filter of displayed names
+    filtered : list or None
+        names passing name_filter in display order, None if not filtered
+    extra : tuple
+        titles of optional columns, their values follow the sort keys
+    cell_source : callable or None
+        cell_source(names, titles) returning {name: {title: text}} of lazy
+        columns, None if rows come complete
+    filled : dict
+        lazy column title: names with computed values
     """
 
-    def __init__(self, root):
+    OVERSCAN = 5
+    COLUMNS = ("Name", "Last modified", "Type", "Size")
+    # hidden columns holding raw modification time and size
+    KEY_COLUMNS = ("mtime", "size")
+    # column: (row index of the sort key, key of rows without it)
+    SORT_KEYS = {"Last modified": (4, 0), "Type": (2, ""), "Size": (5, -1)}
+    # ms between scrolling and computing lazy columns of visible rows
+    CELLS_DELAY = 50
+
+    def __init__(self, root, virtual_threshold=10000):
         super().__init__(root)
         self["padding"] = 5
-        columns = ["Name", "Last modified", "Type"]
-        self.tree = ttk.Treeview(self, columns=columns, show="headings")
-        for col in columns:
-            self.tree.heading(col, text=col)
+        self.tree = ttk.Treeview(self, show="headings")
+        self.titles = {}
+        self.extra = ()
+        self.displayed = ()
         self.scrl = tk.Scrollbar(self, orient=tk.VERTICAL)
-        self.scrl.configure(command=self.tree.yview)
-        self.tree.configure(yscrollcommand=self.scrl.set)
+        self.scrl.configure(command=self.scroll)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         self.tree.grid(row=0, column=0, sticky="nsew")
         self.scrl.grid(row=0, column=1, sticky="sne")
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
+        self.virtual_threshold = virtual_threshold
+        self.stream = None
+        self.stream_job = None
+        self.items = {}
+        self.iids = {}
+        self.rows = {}
+        self.order = []
+        self.virtual = False
+        self.offset = 0
+        self.slots = []
+        self.selected = set()
+        self.anchor = None
+        self.focus_name = None
+        self.sort_column = None
+        self.descending = False
+        self.name_keys = {}
+        self.name_filter = None
+        self.filtered = None
+        self.cell_source = None
+        self.cells_job = None
+        self.filled = {}
+        self.set_columns(())
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<ButtonPress-1>", self.on_click)
+        self.tree.bind("<Shift-ButtonPress-1>", self.on_shift_click)
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", self.on_wheel)
+        self.tree.bind("<Button-5>", self.on_wheel)
+        self.tree.bind("<Up>", self.on_up)
+        self.tree.bind("<Prior>", lambda e: self.on_page(-1))
+        self.tree.bind("<Next>", lambda e: self.on_page(1))
+        self.tree.bind("<Home>", lambda e: self.on_page(None))
+        self.tree.bind("<End>", lambda e: self.on_page(None, end=True))
+        self.tree.bind("<Configure>", lambda e: self.render())
+
+    def display(self, first, stream):
+        """
+        Replace displayed rows. Insert first batch immediately and the rest
+        in after() callbacks, so the window stays responsive.
+
+        Parameters
+        ---------------
+        first : list
+            rows to insert right away
+        stream : generator
+            remaining batches of rows
+        """
+
+        self.cancel()
+        self._clear_tree()
+        self.items = {}
+        self.iids = {}
+        self.rows = {}
+        self.order = []
+        self.virtual = False
+        self.offset = 0
+        self.slots = []
+        self.selected = set()
+        self.anchor = None
+        self.focus_name = None
+        self.name_keys = {}
+        self.name_filter = None
+        self.filtered = None
+        self.filled = {}
+        self.insert(first)
+        self.resort()
+        self.stream = stream
+        self.stream_job = self.after(1, self.fill)
+
+    def fill(self):
+        """
+        Insert the next batch from stream and schedule the following one.
+        """
+
+        try:
+            rows = next(self.stream)
+        except (StopIteration, OSError):
+            self.stream = None
+            self.stream_job = None
+            self.resort()
+            return
+        self.insert(rows)
+        self.stream_job = self.after(1, self.fill)
+
+    def insert(self, rows):
+        """
+        Append rows at the end of the listing. Rows of displayed names
+        replace their values.
+
+        Parameters
+        ---------------
+        rows : list
+            tuples with values for every column
+        """
+
+        added = []
+        for row in rows:
+            name = row[0]
+            if name in self.rows:
+                row = self._merge(self.rows[name], row)
+                if row == self.rows[name]:
+                    continue
+                self._unfill(name)
+                self.rows[name] = row
+                if name in self.items:
+                    self.tree.item(self.items[name], values=row)
+                continue
+            self.rows[name] = row
+            self.order.append(name)
+            added.append(name)
+            if not self.virtual:
+                self._insert_item(name, row)
+        if self.filtered is not None and added:
+            shown = self.name_filter.filter(added)
+            self.filtered.extend(shown)
+            if not self.virtual and len(shown) < len(added):
+                shown = set(shown)
+                self.tree.detach(
+                    *(self.items[name] for name in added if name not in shown)
+                )
+        if not self.virtual and len(self.order) > self.virtual_threshold:
+            self.virtualize()
+        elif self.virtual:
+            self.render()
+        else:
+            self.schedule_cells()
+
+    def update_rows(self, rows):
+        """
+        Bring displayed rows in line with a new listing of the same directory.
+        Only removed, added and changed rows are touched, so scroll position
+        and selection are kept.
+
+        Parameters
+        ---------------
+        rows : list
+            tuples with values for every column, name first
+        """
+
+        self.cancel()
+        new = {row[0]: self._merge(self.rows.get(row[0]), row) for row in rows}
+        removed = {name for name in self.rows if name not in new}
+        if removed:
+            self.order = [name for name in self.order if name not in removed]
+            self.selected -= removed
+        self.order.extend(name for name in new if name not in self.rows)
+        if self.filtered is not None:
+            self.filtered = self.name_filter.filter(self.order)
+        for name in removed:
+            self._unfill(name)
+        for name, row in new.items():
+            if name in self.rows and self.rows[name] != row:
+                self._unfill(name)
+        if self.virtual:
+            self.rows = new
+            self.slots = []
+            self.render()
+            self.resort()
+            return
+        if removed:
+            iids = [self.items.pop(name) for name in removed]
+            for iid in iids:
+                del self.iids[iid]
+            self.tree.delete(*iids)
+        for name, row in new.items():
+            iid = self.items.get(name)
+            if iid is None:
+                self._insert_item(name, row)
+            elif self.rows[name] != row:
+                self.tree.item(iid, values=row)
+        self.rows = new
+        self.resort()
+        if len(self.order) > self.virtual_threshold:
+            self.virtualize()
+
+    def apply_changes(self, rows, removed):
+        """
+        Add, replace and remove single rows, so changes of a large directory
+        are displayed without reading the whole listing again.
+
+        Parameters
+        ---------------
+        rows : list
+            tuples with values for every column of added/modified objects
+        removed : set
+            names of removed objects
+        """
+
+        removed = {name for name in removed if name in self.rows}
+        if removed:
+            self.order = [name for name in self.order if name not in removed]
+            self.selected -= removed
+            for name in removed:
+                del self.rows[name]
+                self._unfill(name)
+            if self.filtered is not None:
+                self.filtered = [
+                    name for name in self.filtered if name not in removed
+                ]
+            if not self.virtual:
+                iids = [self.items.pop(name) for name in removed]
+                for iid in iids:
+                    del self.iids[iid]
+                self.tree.delete(*iids)
+        if self.virtual:
+            self.slots = []
+        self.insert(rows)
+        self.resort()
+
+    def set_cells(self, values, resort=True):
+        """
+        Replace single values of displayed rows. Rows are sorted again if
+        the sort key changed.
+
+        Parameters
+        ---------------
+        values : dict
+            displayed name: {row index: new value}, names that are not
+            displayed are ignored
+        resort : bool, default=True
+            sort again if the sort key changed
+        """
+
+        changed = set()
+        for name, cells in values.items():
+            row = self.rows.get(name)
+            if row is None:
+                continue
+            new = list(row)
+            for index, value in cells.items():
+                new.extend([None] * (index + 1 - len(new)))
+                new[index] = value
+            new = tuple(new)
+            if new == row:
+                continue
+            changed.update(cells)
+            self.rows[name] = new
+            if name in self.items:
+                self.tree.item(self.items[name], values=new)
+        key = self.SORT_KEYS.get(self.sort_column, (None,))[0]
+        if key is None and self.sort_column is not None:
+            key = self.column_index(self.sort_column)
+        if resort and key in changed:
+            self.resort()
+        elif self.virtual:
+            self.slots = []
+            self.render()
+
+    def on_heading(self, column):
+        """
+        Sort by a clicked column, a second click reverses the order.
+        """
+
+        descending = column == self.sort_column and not self.descending
+        self.sort(column, descending)
+
+    def sort(self, column, descending=False):
+        """
+        Sort rows by a column. Names are compared in natural order - "a2"
+        before "a10". Rows with equal values are ordered by name.
+
+        Parameters
+        ---------------
+        column : str or None
+            column name, None keeps the current order from now on
+        descending : bool, default=False
+            reverse order
+        """
+
+        self.sort_column = column
+        self.descending = descending
+        arrow = " \u25bc" if descending else " \u25b2"
+        for col, title in self.titles.items():
+            self.tree.heading(col, text=title + (arrow if col == column else ""))
+        self.resort()
+
+    def resort(self):
+        """
+        Apply the current sort order and filter, e.g. after rows were added.
+        """
+
+        if self.sort_column is None and self.filtered is None:
+            return
+        if self.sort_column in self.displayed:
+            self._fill(self.order, [self.sort_column], resort=False)
+        if self.sort_column is not None:
+            order = sorted(self.order, key=self._name_key)
+            if self.sort_column != "Name":
+                order.sort(
+                    key=self._column_key(self.sort_column),
+                    reverse=self.descending
+                )
+            elif self.descending:
+                order.reverse()
+            self.order = order
+        if self.filtered is not None:
+            shown = set(self.filtered)
+            self.filtered = [name for name in self.order if name in shown]
+        self._show()
+
+    @property
+    def shown(self):
+        """
+        Names passing the filter in display order.
+        """
+
+        return self.order if self.filtered is None else self.filtered
+
+    def set_filter(self, name_filter):
+        """
+        Show only rows with matching names. Hidden rows are deselected.
+
+        Parameters
+        ---------------
+        name_filter : NameFilter or None
+            filter of names, None shows all rows
+        """
+
+        if name_filter is None:
+            if self.filtered is None:
+                return
+            self.filtered = None
+        else:
+            if self.filtered is not None and \
+                    name_filter.narrows(self.name_filter):
+                names = self.filtered
+            else:
+                names = self.order
+            self.filtered = name_filter.filter(names)
+            shown = set(self.filtered)
+            if self.virtual:
+                self.selected &= shown
+            else:
+                hidden = [iid for iid in self.tree.selection()
+                          if self.iids.get(iid) not in shown]
+                if hidden:
+                    self.tree.selection_remove(hidden)
+        self.name_filter = name_filter
+        self.offset = 0
+        self._show()
+
+    def set_title(self, column, title):
+        """
+        Change text of a column heading.
+        """
+
+        self.titles[column] = title
+        self.sort(self.sort_column, self.descending)
+
+    def set_columns(self, extra, displayed=()):
+        """
+        Replace optional columns. Rows have to be displayed again.
+
+        Parameters
+        ---------------
+        extra : iterable
+            titles of optional columns
+        displayed : iterable, default=()
+            titles of optional columns to show
+        """
+
+        self.extra = tuple(extra)
+        columns = self.COLUMNS + self.KEY_COLUMNS + self.extra
+        self.tree.configure(columns=columns)
+        self.titles = {col: self.titles.get(col, col)
+                       for col in self.COLUMNS + self.extra}
+        for col in self.titles:
+            self.tree.heading(
+                col, command=lambda col=col: self.on_heading(col)
+            )
+        if self.sort_column not in self.titles:
+            self.sort_column = None
+        self.show_columns(displayed)
+
+    def show_columns(self, displayed):
+        """
+        Show selected optional columns and hide the rest. Values of hidden
+        columns are not computed.
+
+        Parameters
+        ---------------
+        displayed : iterable
+            titles of optional columns to show
+        """
+
+        self.displayed = tuple(col for col in self.extra if col in displayed)
+        self.tree.configure(displaycolumns=self.COLUMNS + self.displayed)
+        if self.sort_column in self.extra and \
+                self.sort_column not in self.displayed:
+            self.sort_column = None
+        self.sort(self.sort_column, self.descending)
+        self.schedule_cells()
+
+    @property
+    def lazy(self):
+        """
+        Titles of displayed columns filled by cell_source.
+        """
+
+        if self.cell_source is None:
+            return ()
+        return ("Last modified", "Size") + self.displayed
+
+    def column_index(self, column):
+        """
+        Return row index of a column value.
+        """
+
+        if column in self.COLUMNS:
+            return self.COLUMNS.index(column)
+        return len(self.COLUMNS) + len(self.KEY_COLUMNS) + \
+            self.extra.index(column)
+
+    def visible_names(self):
+        """
+        Return names of rows in the viewport.
+
+        Returns
+        ---------------
+        list
+        """
+
+        if self.virtual:
+            return list(self.slots)
+        shown = self.shown
+        first, last = self.tree.yview()
+        start = int(float(first) * len(shown))
+        end = math.ceil(float(last) * len(shown))
+        return shown[start:end + 1]
+
+    def schedule_cells(self):
+        """
+        Compute lazy columns of visible rows once scrolling stops.
+        """
+
+        if self.cells_job is None and self.lazy:
+            self.cells_job = self.after(self.CELLS_DELAY, self.fill_cells)
+
+    def fill_cells(self):
+        """
+        Compute lazy columns of visible rows that are not filled yet.
+        """
+
+        self.cells_job = None
+        self._fill(self.visible_names(), self.lazy)
+
+    def cancel(self):
+        """
+        Stop displaying a stream that is still in progress.
+        """
+
+        if self.stream_job:
+            self.after_cancel(self.stream_job)
+            self.stream_job = None
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+    def selected_names(self):
+        """
+        Return selected names in display order.
+
+        Returns
+        ---------------
+        list
+            names of selected files/dirs
+        """
+
+        if self.virtual:
+            return [name for name in self.shown if name in self.selected]
+        return [self.iids[iid] for iid in self.tree.selection()
+                if iid in self.iids]
+
+    def select(self, names):
+        """
+        Replace selection.
+
+        Parameters
+        ---------------
+        names : iterable
+            names of files/dirs to select
+        """
+
+        names = [name for name in names if name in self.rows]
+        if self.virtual:
+            self.selected = set(names)
+            self.focus_name = names[-1] if names else None
+            self.render()
+        else:
+            iids = [self.items[name] for name in names]
+            self.tree.selection_set(iids)
+            if iids:
+                self.tree.focus(iids[-1])
+
+    def name_at(self, y):
+        """
+        Return name of the row displayed at y.
+
+        Parameters
+        ---------------
+        y : int
+            y coordinate relative to the treeview
+
+        Returns
+        ---------------
+        str or None
+            name or None if there is no row at y
+        """
+
+        return self._slot_name(self.tree.identify_row(y))
+
+    def focused_name(self):
+        """
+        Return name of the focused row.
+
+        Returns
+        ---------------
+        str or None
+        """
+
+        if self.virtual:
+            return self.focus_name
+        return self.iids.get(self.tree.focus())
+
+    def virtualize(self):
+        """
+        Switch to virtual mode keeping the current selection.
+        """
+
+        self.selected = set(self.selected_names())
+        self.focus_name = self.focused_name()
+        self._clear_tree()
+        self.items = {}
+        self.iids = {}
+        self.virtual = True
+        self.render()
+
+    def render(self):
+        """
+        Show model rows starting at offset in the pooled treeview items and
+        restore their selection and focus.
+        """
+
+        if not self.virtual:
+            return
+        visible = self._visible_count()
+        self.offset = max(0, min(self.offset, len(self.shown) - visible))
+        names = self.shown[self.offset:self.offset + visible + self.OVERSCAN]
+        pool = list(self.tree.get_children())
+        if len(pool) > len(names):
+            self.tree.delete(*pool[len(names):])
+            pool = pool[:len(names)]
+        while len(pool) < len(names):
+            pool.append(self.tree.insert(parent="", index="end"))
+        for iid, name, old in zip(pool, names, self.slots + [None] * len(pool)):
+            if name != old:
+                self.tree.item(iid, values=self.rows[name])
+        self.slots = names
+        selection = [iid for iid, name in zip(pool, names)
+                     if name in self.selected]
+        self.tree.selection_set(selection)
+        if self.focus_name in names:
+            self.tree.focus(pool[names.index(self.focus_name)])
+        self.tree.yview_moveto(0)
+        self._set_scrollbar(visible)
+        self.schedule_cells()
+
+    def scroll(self, *args):
+        """
+        Scrollbar command. Scroll the treeview or move the virtual offset.
+        """
+
+        if not self.virtual:
+            self.tree.yview(*args)
+            return
+        visible = self._visible_count()
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.shown))
+        elif args[0] == "scroll":
+            step = visible if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def on_tree_scroll(self, first, last):
+        """
+        Treeview yscrollcommand. In virtual mode a scrolled pool (keyboard
+        navigation, see()) moves the offset instead.
+        """
+
+        if not self.virtual:
+            self.scrl.set(first, last)
+            self.schedule_cells()
+            return
+        shift = round(float(first) * len(self.slots))
+        if shift:
+            self.on_select()
+            self.offset += shift
+            self.render()
+
+    def on_select(self, event=None):
+        """
+        Copy treeview selection of visible rows to the model.
+        """
+
+        if not self.virtual:
+            return
+        tk_selected = {self._slot_name(iid) for iid in self.tree.selection()}
+        tk_selected.discard(None)
+        self.selected.difference_update(self.slots)
+        self.selected.update(tk_selected)
+        focused = self._slot_name(self.tree.focus())
+        if focused is not None:
+            self.focus_name = focused
+
+    def on_click(self, event):
+        """
+        Start a new selection on plain click and remember the anchor row.
+        """
+
+        name = self.name_at(event.y)
+        if name is not None:
+            self.anchor = name
+        if self.virtual and not event.state & 0x0004:
+            self.selected.clear()
+
+    def on_shift_click(self, event):
+        """
+        Select a range of rows between the anchor and the clicked row.
+        """
+
+        if not self.virtual:
+            return None
+        name = self.name_at(event.y)
+        if name is None:
+            return "break"
+        shown = self.shown
+        end = shown.index(name)
+        if self.anchor in shown:
+            start = shown.index(self.anchor)
+        else:
+            start = end
+        start, end = min(start, end), max(start, end)
+        self.selected = set(shown[start:end + 1])
+        self.focus_name = name
+        self.render()
+        return "break"
+
+    def on_wheel(self, event):
+        """
+        Move the virtual offset with the mouse wheel.
+        """
+
+        if not self.virtual:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.offset -= 3
+        else:
+            self.offset += 3
+        self.render()
+        return "break"
+
+    def on_up(self, event):
+        """
+        Reveal the previous row when focus is on the first visible one.
+        """
+
+        if self.virtual and self.slots and self.offset > 0:
+            self.on_select()
+            if self.focus_name == self.slots[0]:
+                self.offset -= 1
+                self.render()
+
+    def on_page(self, direction, end=False):
+        """
+        Move the virtual offset by a page or to the beginning/end.
+
+        Parameters
+        ---------------
+        direction : {-1, 1} or None
+            page up/down or None to jump to the beginning/end
+        end : bool, default=False
+            jump to the end if direction is None
+        """
+
+        if not self.virtual:
+            return None
+        if direction is None:
+            self.offset = len(self.shown) if end else 0
+        else:
+            self.offset += direction * self._visible_count()
+        self.render()
+        return "break"
+
+    def _name_key(self, name):
+        key = self.name_keys.get(name)
+        if key is None:
+            key = self.name_keys[name] = _DIGITS.sub(_pad, name.casefold())
+        return key
+
+    def _column_key(self, column):
+        if column not in self.SORT_KEYS:
+            return self._text_key(self.column_index(column))
+        index, default = self.SORT_KEYS[column]
+        rows = self.rows
+
+        def key(name):
+            row = rows[name]
+            value = row[index] if len(row) > index else None
+            return default if value is None else value
+        return key
+
+    def _text_key(self, index):
+        rows = self.rows
+
+        def key(name):
+            row = rows[name]
+            value = row[index] if len(row) > index else None
+            return _DIGITS.sub(_pad, str(value or "").casefold())
+        return key
+
+    def _fill(self, names, titles, resort=True):
+        """
+        Compute values of lazy columns for rows missing them.
+        """
+
+        if not titles or self.cell_source is None:
+            return
+        filled = [self.filled.setdefault(title, set()) for title in titles]
+        names = [name for name in names if name in self.rows and
+                 not all(name in done for done in filled)]
+        if not names:
+            return
+        for done in filled:
+            done.update(names)
+        cells = self.cell_source(names, titles)
+        self.set_cells({
+            name: {self.column_index(title): text
+                   for title, text in values.items()}
+            for name, values in cells.items()
+        }, resort)
+
+    def _unfill(self, name):
+        for done in self.filled.values():
+            done.discard(name)
+
+    def _merge(self, old, new):
+        """
+        Keep computed values of lazy columns in a new row of the same name,
+        until they are computed again.
+        """
+
+        if old is None or not self.lazy:
+            return new
+        merged = list(new) + [None] * (len(old) - len(new))
+        for title in self.lazy:
+            index = self.column_index(title)
+            if index < len(old) and not merged[index]:
+                merged[index] = old[index]
+        return tuple(merged)
+
+    def _show(self):
+        """
+        Display shown names in their order. Normal mode attaches their items
+        in one call, items of hidden names are detached.
+        """
+
+        if self.virtual:
+            self.slots = []
+            self.render()
+        else:
+            self.tree.set_children(
+                "", *(self.items[name] for name in self.shown)
+            )
+
+    def _clear_tree(self):
+        """
+        Delete all treeview items including detached ones.
+        """
+
+        iids = set(self.tree.get_children())
+        iids.update(self.items.values())
+        self.tree.delete(*iids)
+
+    def _insert_item(self, name, row):
+        iid = self.tree.insert(parent="", index="end", values=row)
+        self.items[name] = iid
+        self.iids[iid] = name
+
+    def _slot_name(self, iid):
+        if not iid:
+            return None
+        if not self.virtual:
+            return self.iids.get(iid)
+        try:
+            return self.slots[self.tree.index(iid)]
+        except (IndexError, tk.TclError):
+            return None
+
+    def _visible_count(self):
+        style = ttk.Style(self)
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        height = self.tree.winfo_height() // row_height - 1
+        return max(height, int(self.tree["height"]), 1)
+
+    def _set_scrollbar(self, visible):
+        total = len(self.shown)
+        if not total:
+            self.scrl.set(0, 1)
+            return
+        self.scrl.set(self.offset / total, (self.offset + visible) / total)
+
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _pad(match):
+    """
+    Zero-pad a number, so numbers in names compare by value.
+    """
+
+    return match.group().zfill(20)
@@ -0,0 +1,112 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class Duplicates(tk.Toplevel):
+    """
+    Display groups of files with equal content as they are found. Files of
+    a group are children of the group row and can be selected for deletion.
+
+    Parameters
+    ---------------
+    root : Tk or any other container Frame
+        master window
+
+    Attributes
+    ---------------
+    tree : ttk.Treeview
+        group rows with file rows nested
+    paths : dict
+        file row id: file Path
+    status_var : tk.StringVar
+        search progress
+    """
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.title("Duplicates")
+        self.tree = ttk.Treeview(self, columns=["Size"], selectmode="extended")
+        self.tree.heading("#0", text="File")
+        self.tree.heading("Size", text="Size")
+        self.tree.grid(row=0, column=0, columnspan=3, sticky="nsew")
+        self.scrl = tk.Scrollbar(
+            self, orient=tk.VERTICAL, command=self.tree.yview
+        )
+        self.tree.configure(yscrollcommand=self.scrl.set)
+        self.scrl.grid(row=0, column=3, sticky="ns")
+        self.select_btn = ttk.Button(
+            self, text="Select duplicates", command=self.select_duplicates
+        )
+        self.select_btn.grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        self.delete_btn = ttk.Button(self, text="Delete selected")
+        self.delete_btn.grid(row=1, column=1, sticky="w", pady=5)
+        self.status_var = tk.StringVar(self)
+        self.status_lbl = ttk.Label(self, textvariable=self.status_var)
+        self.status_lbl.grid(row=1, column=2, sticky="e", padx=5)
+        self.columnconfigure(2, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.paths = {}
+
+    def add_groups(self, groups):
+        """
+        Append groups of equal files.
+
+        Parameters
+        ---------------
+        groups : list
+            (paths, formatted size) tuples
+        """
+
+        for paths, size in groups:
+            group = self.tree.insert(
+                "", "end", text=f"{len(paths)} files", values=[size],
+                open=True
+            )
+            for path in paths:
+                iid = self.tree.insert(group, "end", text=str(path))
+                self.paths[iid] = path
+
+    def select_duplicates(self):
+        """
+        Select every file of every group except the first one.
+        """
+
+        selection = []
+        for group in self.tree.get_children():
+            selection.extend(self.tree.get_children(group)[1:])
+        self.tree.selection_set(selection)
+
+    def selected_paths(self):
+        """
+        Return paths of selected files.
+
+        Returns
+        ---------------
+        list
+            Path objects
+        """
+
+        return [self.paths[iid] for iid in self.tree.selection()
+                if iid in self.paths]
+
+    def remove(self, paths):
+        """
+        Remove rows of deleted files and groups left with a single file.
+
+        Parameters
+        ---------------
+        paths : iterable
+            deleted file paths
+        """
+
+        paths = set(paths)
+        for iid, path in list(self.paths.items()):
+            if path in paths:
+                del self.paths[iid]
+                self.tree.delete(iid)
+        for group in self.tree.get_children():
+            files = self.tree.get_children(group)
+            if len(files) < 2:
+                for iid in files:
+                    del self.paths[iid]
+                self.tree.delete(group)
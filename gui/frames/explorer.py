@@ -15,6 +15,10 @@ class Container(ttk.Frame):
         directory content view and manipulation
     current_dir : str
         currently displayed directory
+    watched : Path or None
+        directory watched for changes made by other processes
+    filter_job : str or None
+        id of the scheduled after() callback applying the name filter
     """
 
     def __init__(self, root):
@@ -24,6 +28,8 @@ class Container(ttk.Frame):
         self.tree = DirContent(self)
         self.tree.grid(row=1, column=0, sticky="nsew")
         self.current_dir = ""
+        self.watched = None
+        self.filter_job = None
         self.columnconfigure(0, weight=1)
         self.rowconfigure(1, weight=1)
 
@@ -47,6 +53,8 @@ class Explorer(ttk.Frame):
         transfer buttons. Only in double view
     r_frm : Container
         frame positioned on the right side. Only in double view
+    stale : bool
+        True if displayed content has to be refreshed once the tab is selected
     """
 
     def __init__(self, root, view="single"):
@@ -55,6 +63,7 @@ class Explorer(ttk.Frame):
         self.l_frm.grid(row=0, column=0, sticky="nsew")
         self.transfer_bar = ObjectTransfer(self)
         self.r_frm = Container(self)
+        self.stale = True
         if view == "double":
             self.transfer_bar.grid(row=0, column=1, sticky="ns")
             self.r_frm.grid(row=0, column=2, sticky="nsew")
@@ -4,7 +4,7 @@ from tkinter import ttk
 
 class NavBar(ttk.Frame):
     """
-    Frame holding Explorer buttons and address bar.
+    Frame holding Explorer buttons, address bar and name filter.
 
     Parameters
     ---------------
@@ -21,8 +21,16 @@ class NavBar(ttk.Frame):
         hold currently viewed directory absolute path
     addr_var : tk.StringVar
         address bar string variable
+    filter_ent : ttk.Entry
+        filter displayed names while typing
+    filter_var : tk.StringVar
+        text contained in names, glob pattern or regular expression
+    filter_mode_var : tk.StringVar
+        filter type
     """
 
+    MODES = ("substring", "glob", "regex")
+
     def __init__(self, root):
         super().__init__(root)
         self["padding"] = 5
@@ -33,4 +41,13 @@ class NavBar(ttk.Frame):
         self.addr_bar.grid(row=0, column=1, sticky="we")
         self.cnf_addr_btn = ttk.Button(self, style="ExpBar.TButton", text=">")
         self.cnf_addr_btn.grid(row=0, column=2, sticky="we")
+        self.filter_var = tk.StringVar(self)
+        self.filter_ent = ttk.Entry(self, textvariable=self.filter_var, width=20)
+        self.filter_ent.grid(row=0, column=3, sticky="we", padx=(5, 0))
+        self.filter_mode_var = tk.StringVar(self, value=self.MODES[0])
+        self.filter_mode_cmb = ttk.Combobox(
+            self, textvariable=self.filter_mode_var, values=self.MODES,
+            state="readonly", width=9
+        )
+        self.filter_mode_cmb.grid(row=0, column=4, sticky="we")
         self.columnconfigure(1, weight=1)
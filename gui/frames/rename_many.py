@@ -4,20 +4,38 @@ import tkinter.ttk as ttk
 
 class RenameMany(tk.Toplevel):
     """
-    Define naming parameters to change multiple file/dir names.
+    Define naming parameters to change multiple file/dir names. Either
+    prefix, name and suffix or a template with an optional pattern. New
+    names of the template are previewed - only rows that are visible are
+    computed, so the preview of any selection costs the same.
 
     Parameters
     ---------------
     root : Tk or any other container Frame
         ExplorerTree master window
+
+    Attributes
+    ---------------
+    preview : ttk.Treeview
+        current and new names of visible rows
+    source : callable or None
+        source(first, count) returns (name, new_name) rows of the preview
+    total : int
+        number of previewed objects
+    offset : int
+        index of the first visible row
     """
 
+    ROWS = 12
+
     def __init__(self, root):
         super().__init__(root)
         self.resizable(False, False)
         self.pref_var = tk.StringVar(self)
         self.name_var = tk.StringVar(self)
         self.suff_var = tk.StringVar(self)
+        self.template_var = tk.StringVar(self)
+        self.pattern_var = tk.StringVar(self)
         self.pref_lbl = ttk.Label(self, text="Prefix:")
         self.pref_lbl.grid(row=0, column=0)
         self.pref_ent = ttk.Entry(self, textvariable=self.pref_var)
@@ -32,3 +50,100 @@ class RenameMany(tk.Toplevel):
         self.suff_ent.grid(row=0, column=5)
         self.submit_btn = ttk.Button(self, text="Submit")
         self.submit_btn.grid(row=0, column=6)
+        self.template_lbl = ttk.Label(self, text="Template:")
+        self.template_lbl.grid(row=1, column=0)
+        self.template_ent = ttk.Entry(self, textvariable=self.template_var)
+        self.template_ent.grid(row=1, column=1, columnspan=3, sticky="we")
+        self.pattern_lbl = ttk.Label(self, text="Pattern:")
+        self.pattern_lbl.grid(row=1, column=4)
+        self.pattern_ent = ttk.Entry(self, textvariable=self.pattern_var)
+        self.pattern_ent.grid(row=1, column=5)
+        self.status_var = tk.StringVar(self)
+        self.status_lbl = ttk.Label(self, textvariable=self.status_var)
+        self.status_lbl.grid(row=3, column=0, columnspan=7, sticky="w")
+        columns = ["Name", "New name"]
+        self.preview = ttk.Treeview(
+            self, columns=columns, show="headings", height=self.ROWS
+        )
+        for col in columns:
+            self.preview.heading(col, text=col)
+        self.preview.grid(row=2, column=0, columnspan=6, sticky="nsew")
+        self.scrl = tk.Scrollbar(self, orient=tk.VERTICAL)
+        self.scrl.configure(command=self.scroll)
+        self.scrl.grid(row=2, column=6, sticky="nsw")
+        self.preview.bind("<MouseWheel>", self.on_wheel)
+        self.preview.bind("<Button-4>", self.on_wheel)
+        self.preview.bind("<Button-5>", self.on_wheel)
+        self.source = None
+        self.total = 0
+        self.offset = 0
+
+    def show_preview(self, total, source):
+        """
+        Replace previewed rows.
+
+        Parameters
+        ---------------
+        total : int
+            number of previewed objects
+        source : callable or None
+            source(first, count) returns rows, None clears the preview
+        """
+
+        self.total = total if source else 0
+        self.source = source
+        self.offset = 0
+        self.render()
+
+    def render(self):
+        """
+        Compute and show rows starting at offset.
+        """
+
+        self.offset = max(0, min(self.offset, self.total - self.ROWS))
+        rows = []
+        if self.source:
+            try:
+                rows = self.source(self.offset, self.ROWS)
+                self.status_var.set("")
+            except (OSError, ValueError) as e:
+                self.status_var.set(str(e))
+        pool = list(self.preview.get_children())
+        if len(pool) > len(rows):
+            self.preview.delete(*pool[len(rows):])
+            pool = pool[:len(rows)]
+        while len(pool) < len(rows):
+            pool.append(self.preview.insert(parent="", index="end"))
+        for iid, row in zip(pool, rows):
+            self.preview.item(iid, values=row)
+        if self.total:
+            self.scrl.set(
+                self.offset / self.total,
+                (self.offset + self.ROWS) / self.total
+            )
+        else:
+            self.scrl.set(0, 1)
+
+    def scroll(self, *args):
+        """
+        Scrollbar command. Move the preview offset.
+        """
+
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self.ROWS if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def on_wheel(self, event):
+        """
+        Move the preview offset with the mouse wheel.
+        """
+
+        if event.num == 4 or event.delta > 0:
+            self.offset -= 3
+        else:
+            self.offset += 3
+        self.render()
+        return "break"
@@ -0,0 +1,58 @@
+import tkinter as tk
+from tkinter import ttk
+
+from gui.frames import DirContent
+
+
+class Search(tk.Toplevel):
+    """
+    Search names under a directory. Results are streamed into a DirContent
+    frame, so long result lists are displayed while the search goes on.
+
+    Parameters
+    ---------------
+    root : Tk or any other container Frame
+        master window
+    container : Container
+        explorer frame that opened the search, results are shown in it
+
+    Attributes
+    ---------------
+    container : Container
+        explorer frame displaying double-clicked results
+    query_var : tk.StringVar
+        searched text, glob pattern or regular expression
+    mode_var : tk.StringVar
+        query type
+    results : DirContent
+        rows with path relative to the searched dir and obj type
+    status_var : tk.StringVar
+        index state or query error
+    """
+
+    MODES = ("substring", "glob", "regex")
+
+    def __init__(self, root, container):
+        super().__init__(root)
+        self.title("Search")
+        self.container = container
+        self.query_var = tk.StringVar(self)
+        self.mode_var = tk.StringVar(self, value=self.MODES[0])
+        self.query_lbl = ttk.Label(self, text="Search:")
+        self.query_lbl.grid(row=0, column=0, padx=5)
+        self.query_ent = ttk.Entry(self, textvariable=self.query_var)
+        self.query_ent.grid(row=0, column=1, sticky="we")
+        self.mode_cmb = ttk.Combobox(
+            self, textvariable=self.mode_var, values=self.MODES,
+            state="readonly", width=10
+        )
+        self.mode_cmb.grid(row=0, column=2, padx=5)
+        self.results = DirContent(self)
+        self.results.set_title("Name", "Path")
+        self.results.grid(row=1, column=0, columnspan=3, sticky="nsew")
+        self.status_var = tk.StringVar(self)
+        self.status_lbl = ttk.Label(self, textvariable=self.status_var)
+        self.status_lbl.grid(row=2, column=0, columnspan=3, sticky="w", padx=5)
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(1, weight=1)
+        self.query_ent.focus()
@@ -1,9 +1,11 @@
+import os
+from pathlib import Path
 import tkinter as tk
 from tkinter import ttk
 import tkinter.messagebox as msg
 
-from gui.frames import Explorer, RenameMany
-from explorer import Facade
+from gui.frames import Explorer, RenameMany, Search, Duplicates, DirContent
+from explorer import Facade, NameFilter, RenameTemplate
 
 
 class GUI(tk.Tk):
@@ -21,14 +23,27 @@ class GUI(tk.Tk):
         core file manipulation, display and cache functionality
     prev_focus : tk.Widget or None
         display container that had focus before the one currently focused
+    status_var : tk.StringVar
+        background transfer progress displayed below the tabs
+    transfer_poll : str or None
+        id of the after() callback collecting finished transfers
+    column_vars : dict
+        optional column title: tk.BooleanVar, True if the column is shown
     """
 
+    # ms between displaying changes of watched directories, events of a
+    # burst are coalesced in between
+    CHANGES_INTERVAL = 200
+    # ms without typing before a name filter is applied
+    FILTER_DELAY = 150
+
     def __init__(self):
         super().__init__()
         self.title("File Explorer")
         self.option_add("*tearOff", tk.FALSE)
         self.style = ttk.Style()
         self.style.configure("ExpBar.TButton", width=5)
+        self.style.map("TEntry", foreground=[("invalid", "red")])
         self.nbook = ttk.Notebook(self)
         self.nbook.grid(row=0, column=0, sticky="nsew")
         self.menubar = tk.Menu(self)
@@ -43,7 +58,26 @@ class GUI(tk.Tk):
         )
         self.view_menu.add_command(label="New Tab", command=self.add_tab)
         self.view_menu.add_command(label="Close Tab", command=self.close_tab)
-        self.fe = Facade()
+        self.view_menu.add_command(label="Search", command=self.search_popup)
+        self.view_menu.add_command(
+            label="Find duplicates", command=self.duplicates_popup
+        )
+        self.fe = Facade(journal=Path.home() / ".file_explorer" / "journal")
+        self.columns_menu = tk.Menu(self.view_menu)
+        self.view_menu.add_cascade(menu=self.columns_menu, label="Columns")
+        self.column_vars = {}
+        for title in self.fe.columns.columns:
+            if title in DirContent.COLUMNS:
+                continue
+            self.column_vars[title] = tk.BooleanVar(self, value=False)
+            self.columns_menu.add_checkbutton(
+                label=title, variable=self.column_vars[title],
+                command=self.show_columns
+            )
+        self.status_var = tk.StringVar(self)
+        self.status = ttk.Label(self, textvariable=self.status_var)
+        self.status.grid(row=1, column=0, sticky="we", padx=5)
+        self.transfer_poll = None
         self.add_tab()
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
@@ -62,6 +96,10 @@ class GUI(tk.Tk):
         self.command_menu.add_command(label="delete", command=self.delete)
         self.bind_all("<Control_L><z>", self.undo)
         self.bind_all("<Control_L><y>", self.redo)
+        self.bind_all("<Control_L><f>", self.search_popup)
+        self.nbook.bind("<<NotebookTabChanged>>", self.refresh_selected)
+        self.after(self.CHANGES_INTERVAL, self.watch_changes)
+        self.after(self.CHANGES_INTERVAL, self.watch_sizes)
 
     def add_tab(self, event=None):
         """
@@ -79,16 +117,23 @@ class GUI(tk.Tk):
         l_nav_bar.bind("<Return>", lambda event: l_cnf.invoke())
         l_parent_btn = tab.l_frm.nav_bar.parent_btn
         l_parent_btn["command"] = lambda: self.display_parent(l_parent_btn)
+        l_filter = lambda *args: self.schedule_filter(tab.l_frm)
+        tab.l_frm.nav_bar.filter_var.trace_add("write", l_filter)
+        tab.l_frm.nav_bar.filter_mode_var.trace_add("write", l_filter)
         vcmd = (self.register(self.fe.is_valid_path), "%P")
         ivcmd = (self.register(self.invalid_addr), "%W")
         l_nav_bar.configure(
             validate="focusout", validatecommand=vcmd, invalidcommand=ivcmd
         )
+        self.set_columns(tab.l_frm)
         tab.l_frm.tree.tree.bind('<Button-3>', self.menu_popup)
         tab.l_frm.tree.tree.bind("<Control_L><c>", lambda e: self.store_src("copy", e))
         tab.l_frm.tree.tree.bind("<Control_L><x>", lambda e: self.store_src("move", e))
         tab.l_frm.tree.tree.bind("<Control_L><v>", self.paste)
         tab.l_frm.tree.tree.bind("<Delete>", self.delete)
+        tab.l_frm.tree.tree.bind(
+            "<Shift-Delete>", lambda e: self.delete(e, permanent=True)
+        )
         tab.l_frm.tree.tree.bind("<Double-Button-1>", self.open)
         if self.view_var.get() == "double":
             tab.transfer_bar.copy_right_btn["command"] = lambda: self.transfer("right", "copy")
@@ -103,17 +148,24 @@ class GUI(tk.Tk):
             r_nav_bar.bind("<Return>", lambda event: r_cnf.invoke())
             r_parent_btn = tab.r_frm.nav_bar.parent_btn
             r_parent_btn["command"] = lambda: self.display_parent(r_parent_btn)
+            r_filter = lambda *args: self.schedule_filter(tab.r_frm)
+            tab.r_frm.nav_bar.filter_var.trace_add("write", r_filter)
+            tab.r_frm.nav_bar.filter_mode_var.trace_add("write", r_filter)
             r_nav_bar.configure(
                 validate="focusout", validatecommand=vcmd, invalidcommand=ivcmd
             )
+            self.set_columns(tab.r_frm)
             tab.r_frm.tree.tree.bind('<Button-3>', self.menu_popup)
             tab.r_frm.tree.tree.bind("<Control_L><c>", lambda e: self.store_src("copy", e))
             tab.r_frm.tree.tree.bind("<Control_L><x>", lambda e: self.store_src("move", e))
             tab.r_frm.tree.tree.bind("<Control_L><v>", self.paste)
             tab.r_frm.tree.tree.bind("<Delete>", self.delete)
+            tab.r_frm.tree.tree.bind(
+                "<Shift-Delete>", lambda e: self.delete(e, permanent=True)
+            )
             tab.r_frm.tree.tree.bind("<Double-Button-1>", self.open)
         self.nbook.add(tab, text=text)
-        self.refresh()
+        self.refresh_selected()
 
     def close_tab(self, event=None):
         """
@@ -121,7 +173,10 @@ class GUI(tk.Tk):
         """
 
         if len(self.nbook.tabs()) > 1:
-            self.nbook.forget(self.nbook.select())
+            tab = self.nametowidget(self.nbook.select())
+            for container in (tab.l_frm, tab.r_frm):
+                self.set_watched(container, None)
+            self.nbook.forget(tab)
 
     def display_content(self, button):
         """
@@ -134,29 +189,201 @@ class GUI(tk.Tk):
         """
 
         path = button.master.addr_var.get()
+        container = button.master.master
         try:
-            content = self.fe.get_content(path)
-            tree = button.master.master.tree.tree
-            tree.delete(*tree.get_children())
-            for row in content:
-                tree.insert(parent="", index="end", values=row)
-            button.master.master.current_dir = path
+            if container.tree.rows and \
+                    Path(path) == Path(container.current_dir):
+                for rows in self.with_sizes(path, [self.fe.get_content(path)]):
+                    container.tree.update_rows(rows)
+            else:
+                content = self.with_sizes(path, self.fe.iter_content(path))
+                first = next(content, [])
+                container.tree.display(first, content)
+                button.master.filter_var.set("")
+            container.current_dir = path
+            self.set_watched(container, path)
         except FileNotFoundError as e:
             msg.showerror(title="Invalid directory", message=str(e))
-            button.master.addr_var.set(button.master.master.current_dir)
+            button.master.addr_var.set(container.current_dir)
         except PermissionError as e:
             msg.showerror(title="Permission denied", message=str(e))
-            button.master.addr_var.set(button.master.master.current_dir)
+            button.master.addr_var.set(container.current_dir)
+
+    def refresh(self, dirs=None):
+        """
+        Refresh frames displaying modified directories. Frames in hidden tabs
+        are marked stale and refreshed once their tab is selected.
+
+        Parameters
+        ---------------
+        dirs : set or None, default=None
+            Path objects of modified directories. Refresh all frames if None
+        """
+
+        selected = self.nbook.select()
+        for frm in self.nbook.tabs():
+            hidden = frm != selected
+            frm = self.nametowidget(frm)
+            for container in (frm.l_frm, frm.r_frm):
+                if dirs is None or Path(container.current_dir) in dirs:
+                    if hidden:
+                        frm.stale = True
+                    else:
+                        container.nav_bar.cnf_addr_btn.invoke()
+
+    def set_watched(self, container, path):
+        """
+        Watch directory displayed by a container instead of the previous one.
+
+        Parameters
+        ---------------
+        container : Container
+            explorer frame
+        path : str or None
+            displayed dir path, None to stop watching
+        """
+
+        path = Path(os.path.abspath(path)) if path else None
+        if path == container.watched:
+            return
+        if container.watched is not None:
+            self.fe.unwatch(container.watched)
+        container.watched = path if path and self.fe.watch(path) else None
+
+    def watch_changes(self):
+        """
+        Display changes of watched directories made by other processes.
+        Frames in hidden tabs are marked stale.
+        """
+
+        changes = self.fe.poll_changes()
+        if changes:
+            selected = self.nbook.select()
+            for frm in self.nbook.tabs():
+                hidden = frm != selected
+                frm = self.nametowidget(frm)
+                for container in (frm.l_frm, frm.r_frm):
+                    if container.watched not in changes:
+                        continue
+                    if hidden:
+                        frm.stale = True
+                        continue
+                    rows, removed = changes[container.watched]
+                    if removed is None:
+                        container.tree.update_rows(rows)
+                    else:
+                        container.tree.apply_changes(rows, removed)
+        self.after(self.CHANGES_INTERVAL, self.watch_changes)
+
+    def with_sizes(self, path, batches):
+        """
+        Request sizes of directories in batches of rows as they are displayed.
+
+        Parameters
+        ---------------
+        path : str
+            displayed dir path
+        batches : iterable
+            lists of rows
+
+        Yields
+        ---------------
+        list
+            rows
+        """
+
+        try:
+            for rows in batches:
+                dirs = [row[0] for row in rows if row[2] == "dirs"]
+                self.fe.request_sizes(path, dirs)
+                yield rows
+        finally:
+            if hasattr(batches, "close"):
+                batches.close()
+
+    def watch_sizes(self):
+        """
+        Fill in directory sizes computed in the background.
+        """
+
+        sizes = self.fe.poll_sizes()
+        if sizes:
+            for frm in self.nbook.tabs():
+                frm = self.nametowidget(frm)
+                for container in (frm.l_frm, frm.r_frm):
+                    if not container.current_dir:
+                        continue
+                    path = Path(os.path.abspath(container.current_dir))
+                    if path in sizes:
+                        container.tree.set_cells({
+                            name: {3: self.fe.format_size(size), 5: size}
+                            for name, size in sizes[path].items()
+                        })
+        self.after(self.CHANGES_INTERVAL, self.watch_sizes)
+
+    def set_columns(self, container):
+        """
+        Set up optional columns of a container, values of lazy columns are
+        computed for visible rows of its current directory.
+        """
+
+        container.tree.cell_source = lambda names, titles: self.fe.get_cells(
+            container.current_dir, names, titles
+        )
+        displayed = [t for t, var in self.column_vars.items() if var.get()]
+        container.tree.set_columns(self.column_vars, displayed)
 
-    def refresh(self):
+    def show_columns(self):
         """
-        Refresh all frames and displayed content.
+        Show optional columns checked in the Columns menu in every frame.
         """
 
+        displayed = [t for t, var in self.column_vars.items() if var.get()]
         for frm in self.nbook.tabs():
             frm = self.nametowidget(frm)
-            frm.l_frm.nav_bar.cnf_addr_btn.invoke()
-            frm.r_frm.nav_bar.cnf_addr_btn.invoke()
+            for container in (frm.l_frm, frm.r_frm):
+                container.tree.show_columns(displayed)
+
+    def schedule_filter(self, container):
+        """
+        Filter displayed names once typing stops.
+        """
+
+        if container.filter_job:
+            container.after_cancel(container.filter_job)
+        container.filter_job = container.after(
+            self.FILTER_DELAY, lambda: self.apply_filter(container)
+        )
+
+    def apply_filter(self, container):
+        """
+        Show only rows with names matching the filter entry of a container.
+        An invalid pattern is marked and the previous filter is kept.
+        """
+
+        container.filter_job = None
+        nav_bar = container.nav_bar
+        query = nav_bar.filter_var.get()
+        try:
+            name_filter = NameFilter(query, nav_bar.filter_mode_var.get())
+        except ValueError:
+            nav_bar.filter_ent.state(["invalid"])
+            return
+        nav_bar.filter_ent.state(["!invalid"])
+        container.tree.set_filter(name_filter if query else None)
+
+    def refresh_selected(self, event=None):
+        """
+        Refresh currently selected tab if it was marked stale.
+        """
+
+        selected = self.nbook.select()
+        if selected:
+            frm = self.nametowidget(selected)
+            if frm.stale:
+                frm.stale = False
+                frm.l_frm.nav_bar.cnf_addr_btn.invoke()
+                frm.r_frm.nav_bar.cnf_addr_btn.invoke()
 
     def display_parent(self, button):
         """
@@ -178,11 +405,11 @@ class GUI(tk.Tk):
         Display popup menu containing explorer functions.
         """
 
-        iid = event.widget.identify_row(event.y)
-        if iid:
-            if len(event.widget.selection()) <= 1:
-                event.widget.selection_set(iid)
-            event.widget.focus(item=iid)
+        content = event.widget.master
+        name = content.name_at(event.y)
+        if name is not None:
+            if len(content.selected_names()) <= 1:
+                content.select([name])
             self.prev_focus = event.widget
             self.command_menu.post(event.x_root, event.y_root)
 
@@ -195,12 +422,9 @@ class GUI(tk.Tk):
             self.prev_focus = event.widget
 
         dst = self.prev_focus.master.master.current_dir
-        try:
-            self.fe.paste(dst)
-        except FileNotFoundError as e:
-            msg.showerror("Invalid destination directory", str(e))
-        explorer = self.prev_focus.master.master.master
-        self.refresh()
+        if self.fe.current_obj:
+            self.fe.submit_paste(dst)
+            self.watch_transfers()
 
     def invalid_addr(self, widget):
         """
@@ -224,7 +448,7 @@ class GUI(tk.Tk):
         if event:
             self.prev_focus = event.widget
 
-        if self.prev_focus.selection():
+        if self.prev_focus.master.selected_names():
             objs = self.get_path()
             try:
                 objs["func"] = func
@@ -232,7 +456,6 @@ class GUI(tk.Tk):
             except FileNotFoundError as e:
                 msg.showerror("Invalid destination directory", str(e))
             explorer = self.prev_focus.master.master.master
-        self.refresh()
 
     def transfer(self, direction, func):
         """
@@ -247,51 +470,279 @@ class GUI(tk.Tk):
             file operation intended for src file
         """
 
-        names = []
         widget = self.nametowidget(self.nbook.select())
         l_addr = widget.l_frm.nav_bar.addr_var.get()
         r_addr = widget.r_frm.nav_bar.addr_var.get()
-        tree = widget.l_frm.tree.tree if direction == "right" else widget.r_frm.tree.tree
+        content = widget.l_frm.tree if direction == "right" else widget.r_frm.tree
         src = l_addr if direction == "right" else r_addr
         dst = r_addr if direction == "right" else l_addr
-        for item in tree.selection():
-            row = tree.item(item)["values"]
-            if row:
-                names.append(row[0])
+        names = content.selected_names()
         objs = {"src": src, "dst": dst, "names": names, "func": func}
-        self.fe.transfer(objs)
-        self.refresh()
+        self.fe.submit_transfer(objs)
+        self.watch_transfers()
+
+    def watch_transfers(self):
+        """
+        Collect finished background transfers, refresh directories they
+        modified and display progress of the running ones.
+        """
+
+        if self.transfer_poll:
+            self.after_cancel(self.transfer_poll)
+            self.transfer_poll = None
+        for job in self.fe.poll_transfers():
+            if job.failures:
+                lines = [f"{Path(src).name}: {e}" for src, e in job.failures]
+                msg.showerror("Transfer failed", "\n".join(lines[:10]))
+            elif job.error:
+                msg.showerror("Transfer failed", str(job.error))
+            self.refresh(job.touched)
+        active = self.fe.transfers.active
+        if active:
+            files = sum(job.files_done for job in active)
+            mib = sum(job.bytes_done for job in active) / 2 ** 20
+            speed = sum(job.throughput for job in active) / 2 ** 20
+            self.status_var.set(
+                f"Transferring: {files} files, {mib:.1f} MiB ({speed:.1f} MiB/s)"
+            )
+            self.transfer_poll = self.after(200, self.watch_transfers)
+        else:
+            self.status_var.set("")
 
     def rename_popup(self):
         """
         Display entries to rename objects.
         """
 
-        if len(self.prev_focus.selection()) == 1:
+        selected = self.prev_focus.master.selected_names()
+        if len(selected) == 1:
             x, y, w, h = self.prev_focus.bbox(self.prev_focus.focus(), column="Name")
             entry = ttk.Entry(self.prev_focus)
             entry.place(x=x, y=y, width=w, height=h)
             entry.focus()
             entry.bind("<FocusOut>", lambda e: entry.destroy())
             entry.bind("<Return>", lambda e: self.rename(entry))
-        elif len(self.prev_focus.selection()) > 1:
+        elif len(selected) > 1:
             rename = RenameMany(self)
-            rename.submit_btn["command"] = lambda: self.rename_many(rename)
+            selection = self.get_path()
+            rename.submit_btn["command"] = \
+                lambda: self.rename_many(rename, selection)
+            update = lambda *args: self.schedule_preview(rename, selection)
+            rename.template_var.trace_add("write", update)
+            rename.pattern_var.trace_add("write", update)
 
-    def rename_many(self, rename):
+    def schedule_preview(self, rename, selection):
         """
-        Rename object using a common name and optional predefined or custom
-        prefix and suffix.
+        Update rename preview once typing stops.
+        """
+
+        job = getattr(rename, "preview_job", None)
+        if job:
+            rename.after_cancel(job)
+        rename.preview_job = rename.after(
+            150, lambda: self.preview_rename(rename, selection)
+        )
+
+    def preview_rename(self, rename, selection):
+        """
+        Compile the template and preview new names of visible rows.
+        """
+
+        rename.preview_job = None
+        text = rename.template_var.get()
+        if not text:
+            rename.show_preview(0, None)
+            return
+        try:
+            template = RenameTemplate(text, rename.pattern_var.get() or None)
+        except ValueError as e:
+            rename.status_var.set(str(e))
+            return
+        source = lambda first, count: self.fe.preview_rename(
+            selection, template, first, count
+        )
+        rename.show_preview(len(selection["names"]), source)
+
+    def rename_many(self, rename, selection):
+        """
+        Rename object using a template or a common name and optional
+        predefined or custom prefix and suffix.
         """
 
-        selection = self.get_path()
         prefix = rename.pref_var.get()
         name = rename.name_var.get()
         suffix = rename.suff_var.get()
-        self.fe.rename_many(selection, name, prefix, suffix)
-        self.refresh()
+        template = rename.template_var.get()
+        pattern = rename.pattern_var.get() or None
+        try:
+            if template:
+                touched = self.fe.rename_template(selection, template, pattern)
+            else:
+                touched = self.fe.rename_many(selection, name, prefix, suffix)
+        except (OSError, ValueError) as e:
+            msg.showerror(title="Rename failed", message=str(e))
+            return
+        self.refresh(touched)
         rename.destroy()
 
+    def search_popup(self, event=None):
+        """
+        Display search window for the directory of the focused frame. Names
+        are indexed in the background.
+        """
+
+        if self.prev_focus is not None and self.prev_focus.winfo_exists():
+            container = self.prev_focus.master.master
+        else:
+            container = self.nametowidget(self.nbook.select()).l_frm
+        try:
+            self.fe.build_index(container.current_dir)
+        except FileNotFoundError as e:
+            msg.showerror(title="Invalid directory", message=str(e))
+            return
+        search = Search(self, container)
+        update = lambda *args: self.schedule_search(search)
+        search.query_var.trace_add("write", update)
+        search.mode_var.trace_add("write", update)
+        search.results.tree.bind(
+            "<Double-Button-1>", lambda e: self.show_hit(search, e)
+        )
+        self.watch_index(search)
+
+    def watch_index(self, search):
+        """
+        Display indexing progress until the index is ready.
+        """
+
+        if not search.winfo_exists():
+            return
+        index = self.fe.index
+        if index.ready.is_set():
+            search.status_var.set(f"Indexed {index.count} objects")
+            self.run_search(search)
+        else:
+            search.status_var.set(f"Indexing... {index.count} objects")
+            self.after(200, lambda: self.watch_index(search))
+
+    def schedule_search(self, search):
+        """
+        Search once typing stops.
+        """
+
+        job = getattr(search, "search_job", None)
+        if job:
+            search.after_cancel(job)
+        search.search_job = search.after(150, lambda: self.run_search(search))
+
+    def run_search(self, search):
+        """
+        Stream results of the current query into the search window.
+        """
+
+        search.search_job = None
+        query = search.query_var.get()
+        if not query or not self.fe.index.ready.is_set():
+            search.results.display([], iter(()))
+            return
+        root = Path(self.fe.index.root)
+        try:
+            batches = self.fe.search(query, search.mode_var.get())
+        except ValueError as e:
+            search.status_var.set(str(e))
+            return
+        search.status_var.set(f"Indexed {self.fe.index.count} objects")
+        rows = (
+            [(str(hit.path.relative_to(root)), "", hit.type) for hit in batch]
+            for batch in batches
+        )
+        search.results.display(next(rows, []), rows)
+
+    def show_hit(self, search, event):
+        """
+        Display parent dir of a double-clicked result and select the result.
+        """
+
+        name = search.results.name_at(event.y)
+        if name is None:
+            return
+        path = Path(self.fe.index.root) / name
+        container = search.container
+        if not container.winfo_exists():
+            return
+        container.nav_bar.addr_var.set(path.parent)
+        container.nav_bar.cnf_addr_btn.invoke()
+        container.tree.select([path.name])
+
+    def duplicates_popup(self):
+        """
+        Search directories displayed in the current tab for duplicate files
+        and display groups as they are found.
+        """
+
+        tab = self.nametowidget(self.nbook.select())
+        roots = {
+            Path(container.current_dir) for container in (tab.l_frm, tab.r_frm)
+            if container.current_dir
+        }
+        try:
+            job = self.fe.find_duplicates(roots)
+        except FileNotFoundError as e:
+            msg.showerror(title="Invalid directory", message=str(e))
+            return
+        window = Duplicates(self)
+        window.delete_btn["command"] = lambda: self.delete_duplicates(window)
+        window.bind("<Destroy>", lambda e: job.cancel(), add="+")
+        self.watch_duplicates(window, job)
+
+    def watch_duplicates(self, window, job):
+        """
+        Display groups found since the last call and search progress.
+        """
+
+        if not window.winfo_exists():
+            return
+        finished = job.done.is_set()
+        groups = []
+        for paths in job.poll():
+            try:
+                size = self.fe.format_size(os.path.getsize(paths[0]))
+            except OSError:
+                size = ""
+            groups.append((paths, size))
+        window.add_groups(groups)
+        finder = job.finder
+        read = self.fe.format_size(finder.bytes_read)
+        total = self.fe.format_size(finder.bytes_total)
+        status = f"{finder.files} files, read {read} of {total}"
+        if job.error:
+            window.status_var.set(f"{status} - {job.error}")
+        elif finished:
+            window.status_var.set(f"{status} - done")
+        else:
+            window.status_var.set(status)
+            self.after(300, lambda: self.watch_duplicates(window, job))
+
+    def delete_duplicates(self, window):
+        """
+        Move selected duplicates to trash as a single action.
+        """
+
+        paths = window.selected_paths()
+        if not paths:
+            return
+        if not msg.askyesno(
+            title="Delete duplicates", parent=window,
+            message=f"Move {len(paths)} files to trash?"
+        ):
+            return
+        try:
+            touched = self.fe.delete_paths(paths)
+        except OSError as e:
+            msg.showerror(title="Delete failed", message=str(e), parent=window)
+            touched = {path.parent for path in paths}
+        window.remove(path for path in paths if not os.path.lexists(path))
+        self.refresh(touched)
+
     def rename(self, entry):
         """
         Rename an object.
@@ -306,30 +757,39 @@ class GUI(tk.Tk):
         selection = self.get_path()
         directory, name = selection["parent"], selection["names"][0]
 
+        touched = None
         try:
-            self.fe.rename(directory, name, new_name)
+            touched = self.fe.rename(directory, name, new_name)
         except FileExistsError as e:
             msg.showerror(f"File {new_name} already exists", str(e))
         finally:
             entry.destroy()
-            self.refresh()
+            self.refresh(touched)
 
-    def delete(self, event=None):
+    def delete(self, event=None, permanent=False):
         """
-        Permanently delete a file or directory and clear cache.
+        Move a file or directory to trash. If permanent - delete it and clear
+        cache.
         """
 
         if event:
             self.prev_focus = event.widget
 
-        if self.prev_focus.focus():
+        if self.prev_focus.master.selected_names():
             objs = self.get_path()
+            if not permanent:
+                try:
+                    self.refresh(self.fe.delete(objs))
+                except (OSError, ValueError) as e:
+                    title = "Can't move to trash"
+                    msg.showerror(title=title, message=str(e))
+                    self.refresh({Path(objs["parent"])})
+                return
             message = "Do you really want to delete selected items?\n" \
             "This operation can't be undone."
             if msg.askyesno(title="Delete", message=message):
-                self.fe.delete(objs)
+                self.refresh(self.fe.delete(objs, permanent=True))
                 self.fe.clear_cache()
-        self.refresh()
 
     def get_path(self):
         """
@@ -342,12 +802,8 @@ class GUI(tk.Tk):
             names: list of file/dir names
         """
 
-        names = []
         directory = self.prev_focus.master.master.current_dir
-        for selected in self.prev_focus.selection():
-            row = self.prev_focus.item(selected)["values"]
-            name = row[0]
-            names.append(name)
+        names = self.prev_focus.master.selected_names()
         return {"parent": directory, "names": names}
 
     def undo(self, event):
@@ -355,26 +811,28 @@ class GUI(tk.Tk):
         Undo a previously performed action.
         """
 
+        touched = None
         try:
-            self.fe.undo()
-        except FileNotFoundError as e:
+            touched = self.fe.undo()
+        except OSError as e:
             title = "Operation can't be undone"
             message = "An error has occured while undoing operation "
             msg.showerror(title=title, message=f"{message}: {str(e)}")
-        self.refresh()
+        self.refresh(touched)
 
     def redo(self, event):
         """
         Redo a previously undone action.
         """
 
+        touched = None
         try:
-            self.fe.redo()
-        except FileNotFoundError as e:
+            touched = self.fe.redo()
+        except OSError as e:
             title = "Operation can't be redone"
             message = "An error has occured while redoing operation "
             msg.showerror(title=title, message=f"{message}: {str(e)}")
-        self.refresh()
+        self.refresh(touched)
 
     def open(self, event):
         """
@@ -383,10 +841,11 @@ class GUI(tk.Tk):
         or user has no permission.
         """
 
-        row = event.widget.item(event.widget.selection())["values"]
-        name = row[0]
+        name = event.widget.master.name_at(event.y)
+        if name is None:
+            return
         current_dir = event.widget.master.master.nav_bar.addr_var.get()
         dst_dir = self.fe.open(current_dir, name)
         if dst_dir:
             event.widget.master.master.nav_bar.addr_var.set(dst_dir)
-        self.refresh()
+            event.widget.master.master.nav_bar.cnf_addr_btn.invoke()
@@ -1,8 +1,22 @@
+import sys
 import unittest
+from pathlib import Path
 
 from parameterized import parameterized
 
-from explorer import Cache
+from explorer import Action, Cache
+
+
+def make_items(n, parent="src/foo", dst="dst/bar"):
+    return [
+        {
+            "src": Path(parent) / f"file{i}.py",
+            "func": "copy",
+            "dst": Path(dst),
+            "new_obj": Path(dst) / f"file{i}.py"
+        }
+        for i in range(n)
+    ]
 
 
 class TestStore(unittest.TestCase):
@@ -72,3 +86,121 @@ class TestClear(unittest.TestCase):
         cache.clear()
         self.assertEqual(cache.items, [])
         self.assertEqual(cache.current, -1)
+
+
+class TestLimits(unittest.TestCase):
+
+    def test_max_actions_evicts_oldest(self):
+        cache = Cache(max_actions=3)
+        for i in range(5):
+            cache.store(f"action{i}")
+        self.assertEqual(["action2", "action3", "action4"], cache.items)
+        self.assertEqual(2, cache.current)
+        self.assertEqual("action4", cache.get_current())
+
+    def test_max_bytes_evicts_oldest(self):
+        cache = Cache(max_bytes=1)
+        cache.store(make_items(10))
+        cache.store(make_items(10, "src/bar"))
+        self.assertEqual(1, len(cache.items))
+        self.assertEqual(Path("src/bar/file0.py"), cache.items[0][0]["src"])
+        self.assertEqual(cache.items[0].nbytes, cache.size)
+
+    def test_undo_after_eviction(self):
+        cache = Cache(max_actions=2)
+        for i in range(3):
+            cache.store(f"action{i}")
+        cache.undo()
+        self.assertEqual("action1", cache.get_current())
+        cache.undo()
+        self.assertEqual("action1", cache.get_current())
+
+    def test_store_after_undo_updates_size(self):
+        cache = Cache()
+        cache.store(make_items(5))
+        cache.store(make_items(5))
+        cache.undo()
+        cache.store(make_items(1))
+        expected = sum(item.nbytes for item in cache.items)
+        self.assertEqual(expected, cache.size)
+        self.assertEqual({"actions": 2, "bytes": expected}, cache.stats())
+
+    def test_clear_resets_size(self):
+        cache = Cache()
+        cache.store(make_items(5))
+        cache.clear()
+        self.assertEqual(0, cache.size)
+
+
+    def test_size_follows_modified_action(self):
+        cache = Cache()
+        cache.store(make_items(5))
+        cache.items[0][0] = dict(cache.items[0][0], new_obj=Path("t/1-a/x"))
+        self.assertEqual(cache.items[0].nbytes, cache.size)
+
+    def test_replace_repacks_current(self):
+        cache = Cache()
+        cache.store(make_items(5))
+        cache.store(make_items(5))
+        items = [dict(item, new_obj=Path(f"trash/{i}/f"))
+                 for i, item in enumerate(make_items(5))]
+        result = cache.replace(items)
+        self.assertIs(result, cache.get_current())
+        self.assertEqual(items, list(result))
+        self.assertEqual(2, len(cache.items))
+        self.assertEqual(sum(item.nbytes for item in cache.items), cache.size)
+
+class TestAction(unittest.TestCase):
+
+    def test_pack_round_trip(self):
+        items = make_items(3)
+        items.append({
+            "src": Path("src/foo/bar.py"),
+            "func": "rename",
+            "dst": "bar_1",
+            "new_obj": None
+        })
+        action = Action.pack(items)
+        self.assertIsInstance(action, Action)
+        self.assertEqual(items, list(action))
+        self.assertEqual(items, action)
+        self.assertEqual(items[-1], action[-1])
+
+    def test_pack_shares_dirs_and_names(self):
+        action = Action.pack(make_items(100))
+        self.assertEqual(["src/foo", "dst", "dst/bar"], action.dirs)
+        self.assertEqual(["copy"], action.funcs)
+        self.assertIs(action.names[0], action.names[2])
+
+    def test_pack_smaller_than_dicts(self):
+        items = make_items(1000)
+        action = Action.pack(items)
+        self.assertLess(action.nbytes, 1000 * sys.getsizeof(items[0]))
+
+    @parameterized.expand([
+        ("string", "foo"),
+        ("empty_list", []),
+        ("missing_key", [{"src": Path("a"), "func": "copy", "dst": None}]),
+        ("extra_key", [{"src": Path("a"), "func": "copy", "dst": None,
+                        "new_obj": None, "spam": 1}])
+    ])
+    def test_pack_leaves_other_objects(self, name, items):
+        self.assertIs(items, Action.pack(items))
+
+    def test_setitem(self):
+        action = Action.pack(make_items(2))
+        item = dict(action[1], new_obj=Path("trash/1-a/file1.py"))
+        action[1] = item
+        self.assertEqual(item, action[1])
+        self.assertEqual(make_items(2)[0], action[0])
+
+    def test_setitem_updates_nbytes(self):
+        action = Action.pack(make_items(2))
+        nbytes = action.nbytes
+        action[1] = dict(action[1], new_obj=Path("trash/1-a/file1.py"))
+        self.assertGreater(action.nbytes, nbytes)
+        self.assertEqual(len(set(action.dirs)), len(action.dirs))
+
+    def test_getitem_out_of_range_raises_error(self):
+        with self.assertRaises(IndexError):
+            Action.pack(make_items(2))[2]
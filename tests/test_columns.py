@@ -0,0 +1,117 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+from parameterized import parameterized
+
+from explorer import Column, ColumnSet, Entry
+
+
+class TestColumnSet(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "notes.TXT").write_text("notes")
+        os.chmod(self.dir / "notes.TXT", 0o640)
+        self.entry = Entry("notes.TXT", "files", 1.5, 5)
+        self.columns = ColumnSet()
+
+    def cell(self, title, entry=None):
+        return self.columns.cells(self.dir, [entry or self.entry], [title])[0]
+
+    @parameterized.expand([
+        ("extension", "Extension", ".txt"),
+        ("mime_type", "MIME type", "text/plain"),
+        ("permissions", "Permissions", "-rw-r-----"),
+        ("size", "Size", "5 B"),
+    ])
+    def test_cells(self, name, title, expected):
+        self.assertEqual({title: expected}, self.cell(title))
+
+    def test_cells_last_modified(self):
+        expected = time.strftime("%Y/%m/%d %H:%M:%S", time.localtime(1))
+        self.assertEqual(
+            {"Last modified": expected}, self.cell("Last modified")
+        )
+
+    def test_cells_inode(self):
+        expected = str(os.lstat(self.dir / "notes.TXT").st_ino)
+        self.assertEqual({"Inode": expected}, self.cell("Inode"))
+
+    def test_cells_dir(self):
+        entry = Entry("sub.d", "dirs", 1, 0)
+        titles = ["Extension", "MIME type", "Size"]
+        cells = self.columns.cells(self.dir, [entry], titles)
+        self.assertEqual(
+            [{"Extension": "", "MIME type": "", "Size": ""}], cells
+        )
+
+    def test_cells_missing_object(self):
+        entry = Entry("missing", "files", 1, 0)
+        cells = self.columns.cells(self.dir, [entry], ["Permissions", "Inode"])
+        self.assertEqual([{"Permissions": "", "Inode": ""}], cells)
+
+    def test_cells_stat_once(self):
+        titles = ["Permissions", "Owner", "Inode"]
+        with patch("explorer.columns.os.lstat", wraps=os.lstat) as lstat_mock:
+            self.columns.cells(self.dir, [self.entry], titles)
+            self.columns.cells(self.dir, [self.entry], titles)
+        lstat_mock.assert_called_once()
+
+    def test_cells_modified_entry_computed_again(self):
+        self.cell("Permissions")
+        os.chmod(self.dir / "notes.TXT", 0o600)
+        modified = self.entry._replace(mtime=2.5)
+        self.assertEqual(
+            {"Permissions": "-rw-r-----"}, self.cell("Permissions")
+        )
+        self.assertEqual(
+            {"Permissions": "-rw-------"}, self.cell("Permissions", modified)
+        )
+
+    def test_cells_hidden_columns_not_computed(self):
+        self.columns.register(Column("Custom", lambda e, st: 1 / 0))
+        self.cell("Extension")
+
+    def test_cells_evicted(self):
+        columns = ColumnSet(max_entries=2)
+        entries = [Entry(f"{i}.txt", "files", 1, 0) for i in range(3)]
+        columns.cells(self.dir, entries, ["Extension"])
+        self.assertEqual(2, len(columns._values))
+
+    def test_register(self):
+        self.columns.register(
+            Column("Size class", lambda e, st: e.size // 4,
+                   text="{} x 4".format)
+        )
+        self.assertEqual({"Size class": "1 x 4"}, self.cell("Size class"))
+
+    def test_register_stat_column(self):
+        self.columns.register(
+            Column("Type bits", lambda e, st: stat.S_IFMT(st.st_mode), "stat")
+        )
+        self.assertEqual(
+            {"Type bits": str(stat.S_IFREG)}, self.cell("Type bits")
+        )
+
+    def test_column_invalid_needs_raises_error(self):
+        with self.assertRaises(ValueError):
+            Column("Foo", lambda e, st: None, "content")
+
+    def test_format_time_cached_per_second(self):
+        with patch("explorer.columns.time.strftime",
+                   wraps=time.strftime) as strftime_mock:
+            first = self.columns.format_time(100.2)
+            second = self.columns.format_time(100.9)
+        self.assertEqual(first, second)
+        strftime_mock.assert_called_once()
+
+    @patch("explorer.columns.pwd", None)
+    def test_owner_without_pwd(self):
+        self.assertEqual("1234", self.columns.owner(1234))
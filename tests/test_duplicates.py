@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from explorer import DuplicateFinder, DuplicateJob
+
+
+class TestDuplicateFinder(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        (self.root / "a").mkdir()
+        (self.root / "b" / "c").mkdir(parents=True)
+        big = os.urandom(3 * DuplicateFinder.EDGE)
+        files = {
+            "a/small.txt": b"small",
+            "b/c/small_copy.txt": b"small",
+            "b/other_small.txt": b"other",
+            "a/big.bin": big,
+            "b/big_copy.bin": big,
+            "b/c/big_middle.bin": big[:5000] + b"x" + big[5001:],
+            "b/unique.bin": b"unique size",
+            "a/empty": b"",
+            "b/empty": b""
+        }
+        for name, data in files.items():
+            (self.root / name).write_bytes(data)
+        self.executor = ThreadPoolExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+        self.finder = DuplicateFinder(workers=2, executor=self.executor)
+
+    def test_find(self):
+        groups = sorted(self.finder.find([self.root]))
+        expected = [
+            [self.root / "a" / "big.bin", self.root / "b" / "big_copy.bin"],
+            [self.root / "a" / "small.txt",
+             self.root / "b" / "c" / "small_copy.txt"]
+        ]
+        self.assertEqual(expected, groups)
+        self.assertEqual(7, self.finder.files)
+        self.assertEqual(6, self.finder.candidates)
+
+    def test_find_reads_only_candidates(self):
+        list(self.finder.find([self.root]))
+        edges = 2 * DuplicateFinder.EDGE
+        size = 3 * DuplicateFinder.EDGE
+        # small files read whole once, big ones differ only in the middle
+        self.assertEqual(3 * 5 + 3 * edges + 3 * size, self.finder.bytes_read)
+
+    def test_find_min_size(self):
+        finder = DuplicateFinder(min_size=6, executor=self.executor)
+        groups = list(finder.find([self.root]))
+        self.assertEqual(1, len(groups))
+
+    def test_find_skips_hard_links(self):
+        os.link(self.root / "b" / "unique.bin", self.root / "a" / "link.bin")
+        groups = list(self.finder.find([self.root]))
+        self.assertEqual(2, len(groups))
+
+    def test_find_overlapping_roots(self):
+        groups = list(self.finder.find([self.root, self.root / "b"]))
+        self.assertEqual(2, len(groups))
+
+    def test_find_process_pool(self):
+        groups = list(DuplicateFinder(workers=2).find([self.root]))
+        self.assertEqual(2, len(groups))
+
+    def test_find_invalid_root(self):
+        with self.assertRaises(FileNotFoundError):
+            self.finder.find([self.root / "missing"])
+
+    @patch("explorer.duplicates._hash_file", return_value=(None, 0))
+    def test_find_unreadable(self, hash_mock):
+        groups = list(self.finder.find([self.root]))
+        self.assertEqual([self.root / "a" / "small.txt",
+                          self.root / "b" / "c" / "small_copy.txt"],
+                         groups[0])
+        self.assertEqual(1, len(groups))
+
+
+class TestDuplicateJob(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        for name in ("a.txt", "b.txt"):
+            (self.root / name).write_text("same")
+
+    def test_poll(self):
+        finder = DuplicateFinder(executor=ThreadPoolExecutor(1))
+        job = DuplicateJob(finder, [self.root]).start()
+        self.assertTrue(job.done.wait(5))
+        expected = [[self.root / "a.txt", self.root / "b.txt"]]
+        self.assertEqual(expected, job.poll())
+        self.assertEqual([], job.poll())
+        self.assertIsNone(job.error)
+
+    def test_cancel(self):
+        finder = DuplicateFinder(executor=ThreadPoolExecutor(1))
+        job = DuplicateJob(finder, [self.root])
+        job.cancel()
+        job.start()
+        self.assertTrue(job.done.wait(5))
+        self.assertEqual([], job.poll())
@@ -1,10 +1,13 @@
+import os
+import tempfile
+import time
 import unittest
-from unittest.mock import patch, call
+from unittest.mock import patch, ANY
 from pathlib import Path
 
 from parameterized import parameterized
 
-from explorer import Facade
+from explorer import Facade, Entry
 
 
 class TestGetDefaultDir(unittest.TestCase):
@@ -22,22 +25,46 @@ class TestGetContent(unittest.TestCase):
     def setUp(self):
         self.facade = Facade()
         self.content = {
-            "dirs": [Path("dir1")],
-            "files": [Path("file1.py")]
+            "dirs": [Entry("dir1", "dirs", 1, 0)],
+            "files": [Entry("file1.py", "files", 1, 10)]
         }
 
-    @patch("explorer.facade.os.path.getmtime", return_value=1)
+    @patch("explorer.facade.ListingCache.validate", return_value=(0, 0, 0, 0))
     @patch("explorer.facade.FileExplorer.get_content")
-    def test_get_content(self, mock_explorer, mock_getmtime):
+    def test_get_content(self, mock_explorer, validate_mock):
         mock_explorer.return_value = self.content
         expected = [
-            ("dir1", "1970/01/01 01:00:01", "dirs"),
-            ("file1.py", "1970/01/01 01:00:01", "files")
+            ("dir1", "", "dirs", "", 1, None),
+            ("file1.py", "", "files", "", 1, 10)
         ]
         result = self.facade.get_content("foo/bar")
         self.assertEqual(expected, result)
 
 
+class TestIterContent(unittest.TestCase):
+
+    def setUp(self):
+        self.facade = Facade()
+
+    @patch("explorer.facade.ListingCache.validate", return_value=(0, 0, 0, 0))
+    @patch("explorer.facade.FileExplorer.iter_content")
+    def test_iter_content(self, mock_explorer, validate_mock):
+        mock_explorer.return_value = iter([
+            [Entry("dir1", "dirs", 1, 0)],
+            [Entry("file1.py", "files", 1, 10)]
+        ])
+        expected = [
+            [("dir1", "", "dirs", "", 1, None)],
+            [("file1.py", "", "files", "", 1, 10)]
+        ]
+        result = list(self.facade.iter_content("foo/bar"))
+        self.assertEqual(expected, result)
+
+    def test_iter_content_invalid_path_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            self.facade.iter_content("foo/bar")
+
+
 class TestGetParent(unittest.TestCase):
 
     def setUp(self):
@@ -56,52 +83,124 @@ class TestGetParent(unittest.TestCase):
             self.facade.get_parent("foo/bar")
 
 
-class TestPaste(unittest.TestCase):
+class TransferTestCase(unittest.TestCase):
 
     def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.src = root / "src"
+        self.dst = root / "dst"
+        self.src.mkdir()
+        self.dst.mkdir()
+        (self.src / "bar.py").write_text("bar")
+        (self.src / "foo.py").write_text("foo")
         self.facade = Facade()
 
-    @patch("explorer.facade.FileExplorer.copy")
-    def test_paste_single_obj(self, copy_mock):
-        self.facade.current_obj = [{"src": "src/foo/bar", "func": "copy"}]
-        self.facade.paste("dst/foo/bar")
-        copy_mock.assert_called_with("src/foo/bar", "dst/foo/bar")
 
-    @patch("explorer.facade.FileExplorer.copy")
-    def test_paste_multiple_obj(self, copy_mock):
+class TestPaste(TransferTestCase):
+
+    def test_paste_single_obj(self):
+        self.facade.current_obj = [{"src": self.src / "bar.py", "func": "copy"}]
+        self.facade.paste(self.dst)
+        self.assertEqual("bar", (self.dst / "bar.py").read_text())
+
+    def test_paste_multiple_obj(self):
         self.facade.current_obj = [
-            {"src": "src/foo/bar", "func": "copy"},
-            {"src": "src/foo/bar", "func": "copy"}
+            {"src": self.src / "bar.py", "func": "copy"},
+            {"src": self.src / "bar.py", "func": "copy"}
         ]
-        self.facade.paste("dst/foo/bar")
-        self.assertEqual(copy_mock.call_count, 2)
+        self.facade.paste(self.dst)
+        self.assertEqual(
+            ["bar.py", "bar_copy_1.py"], sorted(os.listdir(self.dst))
+        )
 
-    @patch("explorer.facade.FileExplorer.copy")
+    @patch("explorer.facade.FileExplorer.copy_to")
     def test_paste_no_current_obj(self, copy_mock):
-        self.facade.paste("dst/foo/bar")
+        self.facade.paste(self.dst)
         copy_mock.assert_not_called()
+        self.assertEqual([], self.facade.cache.items)
 
-    @patch("explorer.facade.FileExplorer.copy", return_value="dst/foo/bar/bar")
-    def test_paste_cache_item(self, copy_mock):
-        self.facade.current_obj = [{"src": "src/foo/bar", "func": "copy"}]
-        self.facade.paste("dst/foo/bar")
+    def test_paste_cache_item(self):
+        self.facade.current_obj = [{"src": self.src / "bar.py", "func": "copy"}]
+        self.facade.paste(self.dst)
         expected = [{
-            "src": "src/foo/bar",
+            "src": self.src / "bar.py",
             "func": "copy",
-            "dst": Path("dst/foo/bar"),
-            "new_obj": "dst/foo/bar/bar"
+            "dst": self.dst,
+            "new_obj": self.dst / "bar.py"
         }]
         result = self.facade.cache.items[0]
         self.assertEqual(expected, result)
 
+    def test_paste_caches_what_succeeded(self):
+        self.facade.current_obj = [
+            {"src": self.src / "baz.py", "func": "copy"},
+            {"src": self.src / "bar.py", "func": "copy"}
+        ]
+        with self.assertRaises(FileNotFoundError):
+            self.facade.paste(self.dst)
+        result = self.facade.cache.items[0]
+        self.assertEqual([self.src / "bar.py"], [i["src"] for i in result])
+
+    @parameterized.expand([("copy", False), ("move", True)])
+    def test_paste_returns_touched_dirs(self, func, src_touched):
+        self.facade.current_obj = [{"src": self.src / "bar.py", "func": func}]
+        result = self.facade.paste(self.dst)
+        expected = {self.dst, self.src} if src_touched else {self.dst}
+        self.assertEqual(expected, result)
+
+
+class TestSubmitTransfers(TransferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.facade.current_obj = [{"src": self.src / "bar.py", "func": "copy"}]
+
+    def tearDown(self):
+        self.facade.transfers.shutdown()
+
+    def wait_for_jobs(self):
+        finished = []
+        deadline = time.monotonic() + 5
+        while not finished and time.monotonic() < deadline:
+            finished = self.facade.poll_transfers()
+            time.sleep(0.01)
+        return finished
+
+    def test_submit_paste_caches_when_finished(self):
+        job = self.facade.submit_paste(self.dst)
+        finished = self.wait_for_jobs()
+        self.assertEqual([job], finished)
+        self.assertEqual(1, len(self.facade.cache.items))
+        self.assertEqual({self.dst}, job.touched)
+
+    def test_submit_paste_error(self):
+        (self.src / "bar.py").unlink()
+        self.facade.submit_paste(self.dst)
+        job = self.wait_for_jobs()[0]
+        self.assertIsInstance(job.error, FileNotFoundError)
+        self.assertEqual([], self.facade.cache.items)
+
+    def test_submit_transfer(self):
+        objs = {
+            "src": self.src, "names": ["bar.py"], "dst": self.dst,
+            "func": "move"
+        }
+        self.facade.submit_transfer(objs)
+        self.wait_for_jobs()
+        self.assertEqual(["bar.py"], os.listdir(self.dst))
+        self.assertEqual(["foo.py"], os.listdir(self.src))
+
 
 class TestStoreSrc(unittest.TestCase):
 
     def setUp(self):
         self.facade = Facade()
 
-    @patch("explorer.facade.Path.exists", return_value=True)
-    def test_copy(self, exists_mock):
+    @patch("explorer.facade.ListingCache.find_many")
+    def test_copy(self, find_mock):
+        find_mock.return_value = [Entry("bar.py", "files", 1, 0)] * 2
         objs = {
             "parent": "foo",
             "names": ["bar.py", "foo_bar.py"],
@@ -125,48 +224,60 @@ class TestStoreSrc(unittest.TestCase):
             self.facade.store_src(objs)
 
 
-class TestTransfer(unittest.TestCase):
+class TestTransfer(TransferTestCase):
 
     def setUp(self):
-        self.facade = Facade()
+        super().setUp()
         self.objs = {
-            "src": "src/foo",
+            "src": self.src,
             "names": ["bar.py"],
-            "dst": "dst/foo/bar",
+            "dst": self.dst,
         }
 
-    @patch("explorer.facade.FileExplorer.copy")
-    def test_transfer_copy(self, copy_mock):
+    def test_transfer_copy(self):
         self.objs["func"] = "copy"
         self.facade.transfer(self.objs)
-        copy_mock.assert_called_with(Path("src/foo/bar.py"), "dst/foo/bar")
+        self.assertEqual(["bar.py"], os.listdir(self.dst))
+        self.assertTrue((self.src / "bar.py").exists())
 
-    @patch("explorer.facade.FileExplorer.copy")
-    def test_transfer_copy_multiple(self, copy_mock):
+    def test_transfer_copy_multiple(self):
         self.objs["func"] = "copy"
         self.objs["names"].append("foo.py")
         self.facade.transfer(self.objs)
-        self.assertEqual(copy_mock.call_count, 2)
+        self.assertEqual(["bar.py", "foo.py"], sorted(os.listdir(self.dst)))
 
-    @patch("explorer.facade.FileExplorer.move")
-    def test_transfer_move(self, move_mock):
+    def test_transfer_move(self):
         self.objs["func"] = "move"
         self.facade.transfer(self.objs)
-        move_mock.assert_called_with(Path("src/foo/bar.py"), "dst/foo/bar")
+        self.assertEqual(["bar.py"], os.listdir(self.dst))
+        self.assertFalse((self.src / "bar.py").exists())
 
-    @patch("explorer.facade.FileExplorer.move", return_value="dst/foo/bar/bar.py")
-    def test_transfer_cache_item(self, copy_mock):
+    def test_transfer_cache_item(self):
         self.objs["func"] = "move"
         self.facade.transfer(self.objs)
         expected = {
-            "src": Path("src/foo/bar.py"),
+            "src": self.src / "bar.py",
             "func": "move",
-            "dst": Path("dst/foo/bar"),
-            "new_obj": "dst/foo/bar/bar.py"
+            "dst": self.dst,
+            "new_obj": self.dst / "bar.py"
         }
         result = self.facade.cache.items[0][0]
         self.assertEqual(expected, result)
 
+    @patch("explorer.planner.shutil.disk_usage")
+    def test_transfer_not_enough_space(self, usage_mock):
+        usage_mock.return_value.free = 0
+        self.objs["func"] = "copy"
+        with self.assertRaises(OSError):
+            self.facade.transfer(self.objs)
+        self.assertEqual([], os.listdir(self.dst))
+        self.assertEqual([], self.facade.cache.items)
+
+    def test_transfer_returns_touched_dirs(self):
+        self.objs["func"] = "move"
+        result = self.facade.transfer(self.objs)
+        self.assertEqual({self.src, self.dst}, result)
+
 
 class TestRename(unittest.TestCase):
 
@@ -193,18 +304,69 @@ class TestDelete(unittest.TestCase):
             "names": ["bar.py"],
         }
 
-    @patch("explorer.facade.Path.exists", return_value=True)
-    @patch("explorer.facade.FileExplorer.rm")
-    def test_delete(self, rm_mock, exists_mock):
-        self.facade.delete(self.objs)
-        rm_mock.assert_called_with(Path("src/foo/bar.py"))
+    @patch("explorer.facade.ListingCache.find_many")
+    @patch("explorer.facade.Trash.put")
+    def test_delete(self, put_mock, find_mock):
+        find_mock.return_value = [Entry("bar.py", "files", 1, 0)]
+        put_mock.return_value = Path("trash/1-a/bar.py")
+        result = self.facade.delete(self.objs)
+        put_mock.assert_called_with(Path("src/foo/bar.py"))
+        self.assertEqual({Path("src/foo")}, result)
+        expected = [{
+            "src": Path("src/foo/bar.py"),
+            "func": "delete",
+            "dst": Path("src/foo"),
+            "new_obj": Path("trash/1-a/bar.py")
+        }]
+        self.assertEqual(expected, self.facade.cache.get_current())
 
-    @patch("explorer.facade.Path.exists", return_value=True)
-    @patch("explorer.facade.FileExplorer.rm")
-    def test_delete_multiple(self, rm_mock, exists_mock):
+    @patch("explorer.facade.ListingCache.find_many")
+    @patch("explorer.facade.Trash.put")
+    def test_delete_multiple(self, put_mock, find_mock):
         self.objs["names"].append("foo.py")
+        find_mock.return_value = [Entry("bar.py", "files", 1, 0)] * 2
         self.facade.delete(self.objs)
-        self.assertEqual(rm_mock.call_count, 2)
+        self.assertEqual(put_mock.call_count, 2)
+        self.assertEqual(2, len(self.facade.cache.get_current()))
+
+    @patch("explorer.facade.ListingCache.find_many")
+    @patch("explorer.facade.Trash.put")
+    def test_delete_error_keeps_trashed(self, put_mock, find_mock):
+        self.objs["names"].append("foo.py")
+        find_mock.return_value = [Entry("bar.py", "files", 1, 0)] * 2
+        put_mock.side_effect = [Path("trash/1-a/bar.py"), PermissionError]
+        with self.assertRaises(PermissionError):
+            self.facade.delete(self.objs)
+        self.assertEqual(1, len(self.facade.cache.get_current()))
+
+    @patch("explorer.facade.ListingCache.find_many")
+    @patch("explorer.facade.Trash.put")
+    @patch("explorer.facade.FileExplorer.rm")
+    def test_delete_permanent(self, rm_mock, put_mock, find_mock):
+        find_mock.return_value = [Entry("bar.py", "files", 1, 0)]
+        result = self.facade.delete(self.objs, permanent=True)
+        rm_mock.assert_called_with(Path("src/foo/bar.py"))
+        put_mock.assert_not_called()
+        self.assertIsNone(self.facade.cache.get_current())
+        self.assertEqual({Path("src/foo")}, result)
+
+    @patch("explorer.trash.os.access")
+    def test_delete_undo_redo(self, access_mock):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            access_mock.side_effect = lambda path, mode: Path(path) == tmp
+            (tmp / "src").mkdir()
+            (tmp / "src" / "bar.py").write_text("bar")
+            self.facade.delete({"parent": tmp / "src", "names": ["bar.py"]})
+            self.assertFalse((tmp / "src" / "bar.py").exists())
+            result = self.facade.undo()
+            self.assertEqual("bar", (tmp / "src" / "bar.py").read_text())
+            self.assertEqual({tmp / "src"}, result)
+            self.facade.redo()
+            self.assertFalse((tmp / "src" / "bar.py").exists())
+            self.facade.undo()
+            self.assertEqual("bar", (tmp / "src" / "bar.py").read_text())
+            self.facade.trash.stop(wait=True)
 
 
 class TestUndo(unittest.TestCase):
@@ -222,10 +384,11 @@ class TestUndo(unittest.TestCase):
     def test_undo_copy(self, get_current_mock, undo_mock, rm_mock):
         self.prev_action["func"] = "copy"
         get_current_mock.return_value = [self.prev_action]
-        self.facade.undo()
+        result = self.facade.undo()
         get_current_mock.assert_called_once()
         rm_mock.assert_called_with(self.prev_action["new_obj"])
         undo_mock.assert_called_once()
+        self.assertEqual({Path("dst/foo/bar")}, result)
 
     @patch("explorer.facade.FileExplorer.rename")
     @patch("explorer.facade.FileExplorer.move")
@@ -258,7 +421,7 @@ class TestUndo(unittest.TestCase):
         undo_mock.assert_called_once()
         rename_mock.assert_called_with(Path("src/foo/foo_bar.py"), "bar")
 
-    @patch("explorer.facade.FileExplorer.rename")
+    @patch("explorer.renamer.BulkRenamer.rename")
     @patch("explorer.facade.Cache.undo")
     @patch("explorer.facade.Cache.get_current")
     def test_undo_rename(self, get_current_mock, undo_mock, rename_mock):
@@ -268,7 +431,9 @@ class TestUndo(unittest.TestCase):
         self.facade.undo()
         get_current_mock.assert_called_once()
         undo_mock.assert_called_once()
-        rename_mock.assert_called_with(Path("src/foo/bar_foo.py"), "foo_bar")
+        rename_mock.assert_called_once_with(
+            Path("src/foo"), [("bar_foo.py", "foo_bar.py")]
+        )
 
     @patch("explorer.facade.FileExplorer.rm")
     @patch("explorer.facade.Cache.undo")
@@ -328,50 +493,56 @@ class TestRedo(unittest.TestCase):
     def test_redo_move(self, get_current_mock, redo_mock, move_mock):
         self.prev_action["func"] = "move"
         get_current_mock.return_value = [self.prev_action]
-        self.facade.redo()
+        result = self.facade.redo()
         get_current_mock.assert_called_once()
         move_mock.assert_called_with(
             self.prev_action["src"], self.prev_action["dst"]
         )
         redo_mock.assert_called_once()
+        expected = {Path("src/foo"), Path("dst/foo/foo_bar.py")}
+        self.assertEqual(expected, result)
 
-    @patch("explorer.facade.FileExplorer.rename")
+    @patch("explorer.renamer.BulkRenamer.rename")
     @patch("explorer.facade.Cache.redo")
     @patch("explorer.facade.Cache.get_current")
     def test_redo_rename(self, get_current_mock, redo_mock, rename_mock):
         self.prev_action["func"] = "rename"
+        self.prev_action["new_obj"] = Path("src/foo/bar_foo.py")
         get_current_mock.return_value = [self.prev_action]
         self.facade.redo()
         get_current_mock.assert_called_once()
-        rename_mock.assert_called_with(
-            self.prev_action["src"], self.prev_action["dst"]
+        rename_mock.assert_called_once_with(
+            Path("src/foo"), [("foo_bar.py", "bar_foo.py")]
         )
         redo_mock.assert_called_once()
 
-    @patch("explorer.facade.FileExplorer.rename")
+    @patch("explorer.renamer.BulkRenamer.rename")
     @patch("explorer.facade.Cache.redo")
     @patch("explorer.facade.Cache.get_current")
     def test_redo_sets_last_redo(self, get_curr_mock, redo_mock, rename_mock):
         self.prev_action["func"] = "rename"
+        self.prev_action["new_obj"] = Path("src/foo/bar_foo.py")
         get_curr_mock.return_value = [self.prev_action]
         self.facade.redo()
         self.assertEqual(self.prev_action, self.facade.last_redo)
 
-    @patch("explorer.facade.FileExplorer.rename")
+    @patch("explorer.renamer.BulkRenamer.rename")
     @patch("explorer.facade.Cache.redo")
     @patch("explorer.facade.Cache.get_current")
     def test_redo_sets_last_redo(self, get_curr_mock, redo_mock, rename_mock):
         self.prev_action["func"] = "rename"
+        self.prev_action["new_obj"] = Path("src/foo/bar_foo.py")
         get_curr_mock.return_value = [self.prev_action]
         self.facade.last_undo = "foo_bar"
         self.facade.redo()
         self.assertIsNone(self.facade.last_undo)
 
-    @patch("explorer.facade.FileExplorer.rename")
+    @patch("explorer.renamer.BulkRenamer.rename")
     @patch("explorer.facade.Cache.redo")
     @patch("explorer.facade.Cache.get_current")
     def test_cant_redo_same_action(self, get_curr_mock, redo_mock, rename_mock):
         self.prev_action["func"] = "rename"
+        self.prev_action["new_obj"] = Path("src/foo/bar_foo.py")
         get_curr_mock.return_value = [self.prev_action]
         self.facade.last_redo = [self.prev_action]
         self.facade.redo()
@@ -409,6 +580,19 @@ class TestRenameMany(unittest.TestCase):
             "parent": "src",
             "names": ["bar.py"],
         }
+        self.listing = {
+            "bar.py": Entry("bar.py", "files", 0, 1, 86400 * 365),
+            "foo.py": Entry("foo.py", "files", 0, 1, 86400 * 730)
+        }
+        patcher = patch(
+            "explorer.facade.ListingCache.get", return_value=self.listing
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in ("plan", "run"):
+            patcher = patch(f"explorer.renamer.BulkRenamer.{name}")
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     @parameterized.expand([
         ("none", None, None),
@@ -416,55 +600,332 @@ class TestRenameMany(unittest.TestCase):
         ("suffix", None, "foo_suff"),
         ("both", "foo_pref", "foo_suff")
     ])
-    @patch("explorer.facade.FileExplorer.rename")
-    def test_rename_many(self, name, prefix, suffix, rename_mock):
+    @patch("explorer.facade.FileExplorer.new_name")
+    def test_rename_many(self, name, prefix, suffix, new_name_mock):
         self.facade.rename_many(self.objs, "foo", prefix, suffix)
-        rename_mock.assert_called_with(
-            Path("src/bar.py"), Path("src/foo"), prefix, suffix
-        )
+        new_name_mock.assert_called_with("bar.py", "foo", prefix, suffix)
 
     @parameterized.expand([
-        ("today", "%today%", "%Y%m%d"),
-        ("creation_date", "%creationd%", "%Y%m%d"),
-        ("creation_datetime", "%creationdt%", "%Y%m%d%H%M%S")
+        ("today", "%today%", "%Y%m%d", None),
+        ("creation_date", "%creationd%", "%Y%m%d", 86400 * 365),
+        ("creation_datetime", "%creationdt%", "%Y%m%d%H%M%S", 86400 * 365)
     ])
-    @patch("explorer.facade.time.strftime")
-    @patch("explorer.facade.time.localtime")
-    @patch("explorer.facade.os.path.getctime")
-    @patch("explorer.facade.FileExplorer.rename")
-    def test_rename_many_predefined_prefix(self, name, prefix, format,
-                                           rename_mock, ctime_mock, local_mock,
-                                           strftime_mock):
+    @patch("explorer.facade.FileExplorer.new_name")
+    def test_rename_many_predefined_prefix(self, name, prefix, format, ctime,
+                                           new_name_mock):
         self.facade.rename_many(self.objs, "foo", prefix=prefix)
-        strftime_mock.assert_called_with(format, local_mock())
-        rename_mock.assert_called_with(
-            Path("src/bar.py"), Path("src/foo"), strftime_mock(), None
-        )
+        expected = time.strftime(format, time.localtime(ctime))
+        new_name_mock.assert_called_with("bar.py", "foo", expected, None)
 
     @parameterized.expand([
-        ("today", "%today%", "%Y%m%d"),
-        ("creation_date", "%creationd%", "%Y%m%d"),
-        ("creation_datetime", "%creationdt%", "%Y%m%d%H%M%S")
+        ("today", "%today%", "%Y%m%d", None),
+        ("creation_date", "%creationd%", "%Y%m%d", 86400 * 365),
+        ("creation_datetime", "%creationdt%", "%Y%m%d%H%M%S", 86400 * 365)
     ])
-    @patch("explorer.facade.time.strftime")
-    @patch("explorer.facade.time.localtime")
-    @patch("explorer.facade.os.path.getctime")
-    @patch("explorer.facade.FileExplorer.rename")
-    def test_rename_many_predefined_suffix(self, name, suffix, format,
-                                           rename_mock, ctime_mock, local_mock,
-                                           strftime_mock):
+    @patch("explorer.facade.FileExplorer.new_name")
+    def test_rename_many_predefined_suffix(self, name, suffix, format, ctime,
+                                           new_name_mock):
         self.facade.rename_many(self.objs, "foo", suffix=suffix)
-        strftime_mock.assert_called_with(format, local_mock())
-        rename_mock.assert_called_with(
-            Path("src/bar.py"), Path("src/foo"), None, strftime_mock()
-        )
+        expected = time.strftime(format, time.localtime(ctime))
+        new_name_mock.assert_called_with("bar.py", "foo", None, expected)
 
-    @patch("explorer.facade.FileExplorer.rename")
-    def test_rename_many_files(self, mock_rename):
+    def test_rename_many_prefix_per_object(self):
         self.objs["names"].append("foo.py")
-        self.facade.rename_many(self.objs, "new_name")
-        calls = [
-            call(Path("src/bar.py"), Path("src/new_name"), None, None),
-            call(Path("src/foo.py"), Path("src/new_name_1"), None, None)
+        self.facade.rename_many(self.objs, "new", prefix="%creationd%")
+        pairs = self.facade.fe.renamer.plan.call_args.args[1]
+        first = time.strftime("%Y%m%d", time.localtime(86400 * 365))
+        second = time.strftime("%Y%m%d", time.localtime(86400 * 730))
+        expected = [
+            ("bar.py", f"{first}_new.py"), ("foo.py", f"{second}_new_1.py")
         ]
-        mock_rename.assert_has_calls(calls)
+        self.assertEqual(expected, pairs)
+
+    def test_rename_many_files(self):
+        self.objs["names"].append("foo.py")
+        self.facade.rename_many(self.objs, "new_name")
+        self.facade.fe.renamer.plan.assert_called_with(
+            "src", [("bar.py", "new_name.py"), ("foo.py", "new_name_1.py")]
+        )
+
+    def test_rename_many_missing_object(self):
+        self.objs["names"].append("baz.py")
+        with self.assertRaises(FileNotFoundError):
+            self.facade.rename_many(self.objs, "new_name")
+
+    def test_rename_template(self):
+        self.objs["names"].append("foo.py")
+        self.facade.rename_template(self.objs, "{name|upper}_{n:02}")
+        self.facade.fe.renamer.plan.assert_called_with(
+            "src", [("bar.py", "BAR_01.py"), ("foo.py", "FOO_02.py")]
+        )
+
+    def test_rename_template_empty_name(self):
+        with self.assertRaises(ValueError):
+            self.facade.rename_template(self.objs, "{1}", pattern="(x)")
+
+    def test_preview_rename(self):
+        self.objs["names"] = ["bar.py", "foo.py"] * 1000
+        with patch("explorer.facade.RenameTemplate.render",
+                   autospec=True, return_value="x") as render_mock:
+            result = self.facade.preview_rename(
+                self.objs, "{n}", first=1001, count=2
+            )
+        self.assertEqual([("foo.py", "x.py"), ("bar.py", "x.py")], result)
+        self.assertEqual(
+            [1001, 1002], [c.args[1] for c in render_mock.call_args_list]
+        )
+
+
+class TestRenameManyFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.parent = Path(self.tmp.name)
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (self.parent / name).write_text(name)
+        self.facade = Facade()
+
+    def content(self):
+        return {
+            path.name: path.read_text() for path in self.parent.iterdir()
+        }
+
+    def test_rename_many_shifts_names(self):
+        objs = {"parent": self.parent, "names": ["c.txt", "a.txt", "b.txt"]}
+        self.facade.rename_many(objs, "a")
+        expected = {"a.txt": "c.txt", "a_1.txt": "a.txt", "a_2.txt": "b.txt"}
+        self.assertEqual(expected, self.content())
+        self.assertEqual(3, len(self.facade.cache.items[0]))
+
+    def test_rename_many_undo_redo(self):
+        objs = {"parent": self.parent, "names": ["b.txt", "a.txt"]}
+        self.facade.rename_many(objs, "a")
+        self.facade.undo()
+        expected = {"a.txt": "a.txt", "b.txt": "b.txt", "c.txt": "c.txt"}
+        self.assertEqual(expected, self.content())
+        self.facade.redo()
+        self.assertEqual("b.txt", (self.parent / "a.txt").read_text())
+        self.assertEqual("a.txt", (self.parent / "a_1.txt").read_text())
+
+    def test_rename_many_conflict_renames_nothing(self):
+        objs = {"parent": self.parent, "names": ["a.txt"]}
+        with self.assertRaises(FileExistsError):
+            self.facade.rename_many(objs, "c")
+        self.assertEqual(["a.txt", "b.txt", "c.txt"], sorted(self.content()))
+        self.assertEqual([], self.facade.cache.items)
+
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        (self.root / "dir").mkdir()
+        for name in ("a.txt", "b.txt", "dir/c.txt"):
+            (self.root / name).write_text(name)
+        self.facade = Facade()
+
+    def found(self, query, mode="substring"):
+        return sorted(
+            hit.path for batch in self.facade.search(query, mode)
+            for hit in batch
+        )
+
+    def test_search_without_index(self):
+        with self.assertRaises(RuntimeError):
+            self.facade.search("a")
+
+    def test_build_index_invalid_root(self):
+        with self.assertRaises(FileNotFoundError):
+            self.facade.build_index(self.root / "missing")
+
+    def test_build_index_reused(self):
+        index = self.facade.build_index(self.root, wait=True)
+        self.assertIs(index, self.facade.build_index(self.root))
+
+    def test_search_batches(self):
+        self.facade.build_index(self.root, wait=True)
+        batches = list(self.facade.search(".txt", chunk_size=2))
+        self.assertEqual([2, 1], [len(batch) for batch in batches])
+
+    @patch("explorer.trash.os.access")
+    def test_index_follows_actions(self, access_mock):
+        # keep the trash in the temp dir
+        access_mock.side_effect = lambda path, mode: Path(path) == self.root
+        self.addCleanup(self.facade.trash.stop, wait=True)
+        self.facade.build_index(self.root, wait=True)
+        self.facade.rename(self.root, "a.txt", "renamed")
+        self.facade.delete({"parent": self.root / "dir", "names": ["c.txt"]})
+        trash_dir = self.root / self.facade.trash.dirname
+        self.assertTrue(trash_dir.is_dir())
+        self.assertEqual([self.root / "renamed.txt"], self.found("ren"))
+        self.assertEqual([], self.found("c.txt"))
+        self.assertEqual(
+            [self.root / "b.txt", self.root / "renamed.txt"],
+            self.found("*.txt", "glob")
+        )
+
+
+class TestPollChanges(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "old.txt").write_text("")
+        self.facade = Facade()
+        self.addCleanup(self.facade.watcher.close)
+
+    def test_poll_changes(self):
+        changes = {self.dir: {"old.txt", "new.txt"}}
+        (self.dir / "new.txt").write_text("")
+        os.unlink(self.dir / "old.txt")
+        with patch.object(self.facade.watcher, "changes", return_value=changes):
+            result = self.facade.poll_changes()
+        rows, removed = result[self.dir]
+        self.assertEqual(["new.txt"], [row[0] for row in rows])
+        self.assertEqual({"old.txt"}, removed)
+
+    def test_poll_changes_whole_dir(self):
+        changes = {self.dir: None}
+        with patch.object(self.facade.watcher, "changes", return_value=changes):
+            result = self.facade.poll_changes()
+        rows, removed = result[self.dir]
+        self.assertEqual(["old.txt"], [row[0] for row in rows])
+        self.assertIsNone(removed)
+
+    def test_poll_changes_invalidates_listing(self):
+        self.facade.get_content(self.dir)
+        changes = {self.dir: {"old.txt"}}
+        with patch.object(self.facade.watcher, "changes", return_value=changes):
+            self.facade.poll_changes()
+        self.assertEqual(0, self.facade.listings.stats()["dirs"])
+
+    def test_watch_invalid_dir(self):
+        self.assertFalse(self.facade.watch(self.dir / "missing"))
+        self.assertTrue(self.facade.watch(self.dir))
+        self.facade.unwatch(self.dir)
+
+
+class TestSizes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "sub").mkdir()
+        (self.dir / "sub" / "a.txt").write_text("a" * 100)
+        self.facade = Facade()
+        self.addCleanup(self.facade.sizes.close)
+
+    @parameterized.expand([
+        ("none", None, ""),
+        ("bytes", 512, "512 B"),
+        ("kib", 1536, "1.5 KiB"),
+        ("mib", 5 * 2 ** 20, "5.0 MiB"),
+        ("tib", 3 * 2 ** 40, "3.0 TiB"),
+        ("above_tib", 2 ** 52, "4096.0 TiB")
+    ])
+    def test_format_size(self, name, size, expected):
+        self.assertEqual(expected, Facade.format_size(size))
+
+    def test_get_cells_cached_dir_size(self):
+        (self.dir / "b.txt").write_text("b" * 10)
+        names = ["sub", "b.txt"]
+        self.assertEqual(
+            {"sub": {"Size": ""}, "b.txt": {"Size": "10 B"}},
+            self.facade.get_cells(self.dir, names, ["Size"])
+        )
+        self.facade.sizes.measure(self.dir / "sub")
+        self.assertEqual(
+            {"sub": {"Size": "100 B"}, "b.txt": {"Size": "10 B"}},
+            self.facade.get_cells(self.dir, names, ["Size"])
+        )
+
+    def test_poll_sizes(self):
+        self.facade.request_sizes(self.dir, ["sub"])
+        sizes = {}
+        deadline = time.monotonic() + 3
+        while not sizes and time.monotonic() < deadline:
+            sizes = self.facade.poll_sizes()
+            time.sleep(0.01)
+        self.assertEqual({self.dir: {"sub": 100}}, sizes)
+
+    def test_touched_invalidates_size(self):
+        self.facade.sizes.measure(self.dir)
+        self.facade._touched({self.dir / "sub"})
+        self.assertIsNone(self.facade.sizes.size(self.dir))
+        self.assertIsNone(self.facade.sizes.size(self.dir / "sub"))
+
+
+class TestGetCells(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "a.txt").write_text("a")
+        os.utime(self.dir / "a.txt", (1, 1))
+        (self.dir / "sub").mkdir()
+        self.facade = Facade()
+
+    def test_get_cells(self):
+        mt = time.strftime("%Y/%m/%d %H:%M:%S", time.localtime(1))
+        expected = {
+            "a.txt": {"Last modified": mt, "Extension": ".txt"},
+            "sub": {"Last modified": ANY, "Extension": ""}
+        }
+        result = self.facade.get_cells(
+            self.dir, ["a.txt", "sub", "missing"],
+            ["Last modified", "Extension"]
+        )
+        self.assertEqual(expected, result)
+
+    def test_get_cells_memoized(self):
+        self.facade.get_cells(self.dir, ["a.txt"], ["Inode"])
+        with patch("explorer.columns.os.lstat") as lstat_mock:
+            result = self.facade.get_cells(self.dir, ["a.txt"], ["Inode"])
+        lstat_mock.assert_not_called()
+        inode = str(os.lstat(self.dir / "a.txt").st_ino)
+        self.assertEqual({"a.txt": {"Inode": inode}}, result)
+
+    def test_get_cells_unknown_column_raises_error(self):
+        with self.assertRaises(KeyError):
+            self.facade.get_cells(self.dir, ["a.txt"], ["foo"])
+
+
+class TestDeletePaths(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        (self.root / "a").mkdir()
+        (self.root / "b").mkdir()
+        self.paths = [self.root / "a" / "x.txt", self.root / "b" / "y.txt"]
+        for path in self.paths:
+            path.write_text("same")
+        self.facade = Facade()
+
+    @patch("explorer.facade.Trash.put", side_effect=lambda p: Path(f"{p}.t"))
+    def test_delete_paths_single_action(self, put_mock):
+        touched = self.facade.delete_paths(
+            self.paths + [self.root / "missing"]
+        )
+        self.assertEqual({self.root / "a", self.root / "b"}, touched)
+        self.assertEqual(1, len(self.facade.cache.items))
+        self.assertEqual(
+            self.paths, [item["src"] for item in self.facade.cache.items[0]]
+        )
+
+    def test_delete_paths_permanent(self):
+        self.facade.delete_paths(self.paths, permanent=True)
+        self.assertFalse(any(path.exists() for path in self.paths))
+        self.assertEqual([], self.facade.cache.items)
+
+    def test_find_duplicates(self):
+        job = self.facade.find_duplicates([self.root])
+        self.assertTrue(job.done.wait(10))
+        self.assertEqual([self.paths], job.poll())
@@ -0,0 +1,84 @@
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+from explorer import FileCopier
+
+
+class TestFileCopier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        self.src = self.path / "foo.bin"
+        self.data = os.urandom(3 * 2 ** 20 + 17)
+        self.src.write_bytes(self.data)
+        os.utime(self.src, (1, 1))
+        self.dst = self.path / "bar.bin"
+        self.copier = FileCopier()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copy2(self):
+        result = self.copier.copy2(self.src, self.dst)
+        self.assertEqual(self.dst, result)
+        self.assertEqual(self.data, self.dst.read_bytes())
+        self.assertEqual(1, self.dst.stat().st_mtime)
+        strategy = self.copier.recent[-1][1]
+        self.assertIn(strategy, FileCopier.STRATEGIES)
+        self.assertEqual(1, self.copier.counts[strategy])
+
+    def test_copy2_empty_file(self):
+        self.src.write_bytes(b"")
+        self.copier.copy2(self.src, self.dst)
+        self.assertEqual(b"", self.dst.read_bytes())
+
+    @patch("explorer.fastcopy.fcntl", None)
+    @unittest.skipUnless(hasattr(os, "sendfile"), "sendfile not available")
+    def test_copy_range_unsupported_falls_back_to_sendfile(self):
+        error = OSError(errno.EXDEV, "cross-device")
+        with patch("explorer.fastcopy.os.copy_file_range", side_effect=error,
+                   create=True):
+            result = self.copier.copyfile(self.src, self.dst)
+        self.assertEqual("sendfile", result)
+        self.assertEqual(self.data, self.dst.read_bytes())
+
+    @patch("explorer.fastcopy.fcntl", None)
+    def test_all_unsupported_falls_back_to_buffered(self):
+        error = OSError(errno.ENOSYS, "not implemented")
+        with patch("explorer.fastcopy.os.copy_file_range", side_effect=error,
+                   create=True), \
+                patch("explorer.fastcopy.os.sendfile", side_effect=error,
+                      create=True):
+            result = self.copier.copyfile(self.src, self.dst)
+        self.assertEqual("buffered", result)
+        self.assertEqual(self.data, self.dst.read_bytes())
+
+    @patch("explorer.fastcopy.fcntl", None)
+    def test_real_error_raises(self):
+        error = OSError(errno.EIO, "I/O error")
+        with patch("explorer.fastcopy.os.copy_file_range", side_effect=error,
+                   create=True):
+            with self.assertRaises(OSError):
+                self.copier.copyfile(self.src, self.dst)
+
+    def test_copy2_invalid_src_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            self.copier.copy2(self.path / "missing", self.dst)
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "named pipes not available")
+    def test_copyfile_fifo_raises_error(self):
+        fifo = self.path / "pipe"
+        os.mkfifo(fifo)
+        with self.assertRaises(shutil.SpecialFileError):
+            self.copier.copyfile(fifo, self.dst)
+        self.assertFalse(self.dst.exists())
+
+    def test_copyfile_dir_raises_error(self):
+        with self.assertRaises(shutil.SpecialFileError):
+            self.copier.copyfile(self.path, self.dst)
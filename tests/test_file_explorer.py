@@ -1,10 +1,12 @@
+import errno
+import tempfile
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, ANY
 from pathlib import Path
 
 from parameterized import parameterized
 
-from explorer import FileExplorer
+from explorer import FileExplorer, Entry, MoveError
 
 
 class TestIsValidPath(unittest.TestCase):
@@ -48,18 +50,17 @@ class TestGetContent(unittest.TestCase):
     def setUp(self):
         self.fe = FileExplorer()
 
-    @patch("explorer.file_explorer.pathlib.Path.iterdir")
-    def test_get_content(self, iterdir_mock):
-        mocks = [Mock() for _ in range(4)]
-        for i, mock in enumerate(mocks):
-            mock.is_dir.return_value = True if i % 2 == 0 else False
-            mock.is_file.return_value = False if i % 2 == 0 else True
-            mock.__str__ = "dir_path" if i % 2 == 0 else "file_path"
-        iterdir_mock.return_value = mocks
+    @patch("explorer.file_explorer.scan")
+    def test_get_content(self, scan_mock):
+        entries = [
+            Entry(f"obj{i}", "dirs" if i % 2 == 0 else "files", 1, 0)
+            for i in range(4)
+        ]
+        scan_mock.return_value = entries
         result = self.fe.get_content(".")
         expected = {
-            "files": [mocks[1], mocks[3]],
-            "dirs": [mocks[0], mocks[2]]
+            "files": [entries[1], entries[3]],
+            "dirs": [entries[0], entries[2]]
         }
         self.assertEqual(expected, result)
 
@@ -67,8 +68,8 @@ class TestGetContent(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             self.fe.get_content('invalid_path')
 
-    @patch("explorer.file_explorer.pathlib.Path.iterdir", return_value=[])
-    def test_get_content_empty_dir(self, iterdir_mock):
+    @patch("explorer.file_explorer.scan", return_value=[])
+    def test_get_content_empty_dir(self, scan_mock):
         expected = {
             "files": [],
             "dirs": []
@@ -77,92 +78,129 @@ class TestGetContent(unittest.TestCase):
         self.assertEqual(expected, result)
 
 
-@patch("explorer.file_explorer.shutil.copy2")
-class TestCopyFile(unittest.TestCase):
+class TestIterContent(unittest.TestCase):
 
     def setUp(self):
         self.fe = FileExplorer()
-        self.src_dir = "src/path"
-        self.src_file = "src/path/foo.py"
-        self.dst_dir = "dst/path"
 
-    @patch("explorer.file_explorer.pathlib.Path.glob")
-    @patch("explorer.file_explorer.pathlib.Path.exists", return_value=True)
-    @patch("explorer.file_explorer.FileExplorer.is_valid_path")
-    def test_copy_file_same_dir(self, vpath_mock, exists_mock, glob_mock,
-                                copy2_mock):
-        vpath_mock.return_value = (Path(self.src_file), Path(self.src_dir))
+    @patch("explorer.file_explorer.scan_chunks")
+    def test_iter_content(self, chunks_mock):
+        result = self.fe.iter_content(".", 10)
+        chunks_mock.assert_called_with(Path("."), 10)
+        self.assertEqual(chunks_mock(), result)
+
+    def test_iter_content_invalid_path_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            self.fe.iter_content("invalid_path")
+
+
+@patch("explorer.file_explorer.FileCopier.copy2")
+class TestCopyFile(unittest.TestCase):
+
+    def setUp(self):
+        self.fe = FileExplorer()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src_dir = Path(self.tmp.name) / "src"
+        self.dst_dir = Path(self.tmp.name) / "dst"
+        self.src_dir.mkdir()
+        self.dst_dir.mkdir()
+        self.src_file = self.src_dir / "foo.py"
+        self.src_file.write_text("foo")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copy_file_same_dir(self, copy2_mock):
+        copy2_mock.side_effect = lambda src, dst: dst
         for i in range(1, 10):
-            glob_mock.return_value = list(range(i))
-            expected = f"src/path/foo_copy_{i}.py"
+            expected = self.src_dir / f"foo_copy_{i}.py"
             result = self.fe.copy_file(self.src_file, self.src_dir)
-            copy2_mock.assert_called_with(Path(self.src_file), Path(expected))
-            self.assertTrue(isinstance(result, Path))
+            copy2_mock.assert_called_with(self.src_file, expected)
+            self.assertEqual(expected, result)
+            self.assertTrue(expected.exists())
 
-    @patch("explorer.file_explorer.pathlib.Path.glob")
-    @patch("explorer.file_explorer.pathlib.Path.exists")
-    @patch("explorer.file_explorer.FileExplorer.is_valid_path")
-    def test_copy_file_different_dir(self, vpath_mock, exists_mock, glob_mock,
-                                     copy2_mock):
-        vpath_mock.return_value = (Path(self.src_file), Path(self.dst_dir))
-        exists_mock.side_effect = [bool(i) for i in range(10)]
+    def test_copy_file_different_dir(self, copy2_mock):
+        copy2_mock.side_effect = lambda src, dst: dst
         for i in range(10):
             if i > 0:
-                glob_mock.return_value = list(range(i))
-                expected = f"{self.dst_dir}/foo_copy_{i}.py"
+                expected = self.dst_dir / f"foo_copy_{i}.py"
             else:
-                expected = f"{self.dst_dir}/foo.py"
+                expected = self.dst_dir / "foo.py"
             result = self.fe.copy_file(self.src_file, self.dst_dir)
-            copy2_mock.assert_called_with(Path(self.src_file), Path(expected))
+            copy2_mock.assert_called_with(self.src_file, expected)
             self.assertTrue(isinstance(result, Path))
 
-
-@patch("explorer.file_explorer.shutil.copytree")
+    def test_copy_file_skips_taken_indexes(self, copy2_mock):
+        copy2_mock.side_effect = lambda src, dst: dst
+        for name in ["foo_copy_1.py", "foobar.py", "foo_copy_3.py"]:
+            (self.src_dir / name).touch()
+        results = [self.fe.copy_file(self.src_file, self.src_dir)
+                   for i in range(2)]
+        expected = [self.src_dir / "foo_copy_2.py",
+                    self.src_dir / "foo_copy_4.py"]
+        self.assertEqual(expected, results)
+
+    def test_copy_file_concurrent_writer(self, copy2_mock):
+        copy2_mock.side_effect = lambda src, dst: dst
+        self.fe.copy_file(self.src_file, self.src_dir)
+        # created behind the allocator's back within the same mtime
+        (self.src_dir / "foo_copy_2.py").touch()
+        self.fe.names._touch(self.src_dir)
+        result = self.fe.copy_file(self.src_file, self.src_dir)
+        self.assertEqual(self.src_dir / "foo_copy_3.py", result)
+
+    def test_copy_file_error_releases_name(self, copy2_mock):
+        copy2_mock.side_effect = PermissionError
+        with self.assertRaises(PermissionError):
+            self.fe.copy_file(self.src_file, self.dst_dir)
+        self.assertFalse((self.dst_dir / "foo.py").exists())
+        copy2_mock.side_effect = lambda src, dst: dst
+        result = self.fe.copy_file(self.src_file, self.dst_dir)
+        self.assertEqual(self.dst_dir / "foo.py", result)
+
+
+@patch("explorer.file_explorer.TreeCopier.copy")
 class TestCopyDir(unittest.TestCase):
 
     def setUp(self):
         self.fe = FileExplorer()
-        self.src_dir = "src/path/foo"
-        self.dst_dir = "dst/path"
-
-    @patch("explorer.file_explorer.FileExplorer.is_valid_path")
-    @patch("explorer.file_explorer.pathlib.Path.exists", return_value=True)
-    @patch("explorer.file_explorer.pathlib.Path.glob", return_value=[1])
-    def test_copy_dir_same_dir(self, glob_mock, exists_mock, vpath_mock,
-                               ctree_mock):
-        vpath_mock.return_value = (Path(self.src_dir), Path("src/path"))
-        expected = Path("src/path/foo_copy_1")
-        result = self.fe.copy_dir(self.src_dir, "src/path")
-        ctree_mock.assert_called_with(Path(self.src_dir), Path(expected))
-
-    @patch("explorer.file_explorer.FileExplorer.is_valid_path")
-    @patch("explorer.file_explorer.pathlib.Path.exists", return_value=True)
-    @patch("explorer.file_explorer.pathlib.Path.glob")
-    def test_copy_dir_same_dir_multiple(self, glob_mock, exists_mock,
-                                        vpath_mock, ctree_mock):
-        vpath_mock.return_value = (Path(self.src_dir), Path("src/path"))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src_dir = self.root / "foo"
+        self.dst_dir = self.root / "dst"
+        self.src_dir.mkdir()
+        self.dst_dir.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copy_dir_same_dir(self, ctree_mock):
+        expected = self.root / "foo_copy_1"
+        self.fe.copy_dir(self.src_dir, self.root)
+        ctree_mock.assert_called_with(
+            self.src_dir, expected, copy_function=ANY, dirs_exist_ok=True
+        )
+        self.assertTrue(expected.is_dir())
+
+    def test_copy_dir_same_dir_multiple(self, ctree_mock):
         for i in range(1, 10):
-            glob_mock.return_value = list(range(i))
-            expected = Path(f"src/path/foo_copy_{i}")
-            result = self.fe.copy_dir(self.src_dir, "src/path")
-            ctree_mock.assert_called_with(Path(self.src_dir), Path(expected))
-
-    @patch("explorer.file_explorer.FileExplorer.is_valid_path")
-    @patch("explorer.file_explorer.pathlib.Path.exists")
-    @patch("explorer.file_explorer.pathlib.Path.glob")
-    def test_copy_dir_different_dir(self, glob_mock, exists_mock, vpath_mock,
-                                    ctree_mock):
-        vpath_mock.return_value = (Path(self.src_dir), Path(self.dst_dir))
-        # first exists call False cause dst should not exist
-        exists_mock.side_effect = [bool(i) for i in range(10)]
+            expected = self.root / f"foo_copy_{i}"
+            self.fe.copy_dir(self.src_dir, self.root)
+            ctree_mock.assert_called_with(
+                self.src_dir, expected, copy_function=ANY, dirs_exist_ok=True
+            )
+
+    def test_copy_dir_different_dir(self, ctree_mock):
+        ctree_mock.side_effect = lambda src, dst, **kwargs: dst
         for i in range(10):
             if i > 0:
-                glob_mock.return_value = list(range(i))
-                expected = f"{self.dst_dir}/foo_copy_{i}"
+                expected = self.dst_dir / f"foo_copy_{i}"
             else:
-                expected = f"{self.dst_dir}/foo"
+                expected = self.dst_dir / "foo"
             result = self.fe.copy_dir(self.src_dir, self.dst_dir)
-            ctree_mock.assert_called_with(Path(self.src_dir), Path(expected))
+            ctree_mock.assert_called_with(
+                self.src_dir, expected, copy_function=ANY, dirs_exist_ok=True
+            )
             self.assertTrue(isinstance(result, Path))
 
 
@@ -185,7 +223,9 @@ class TestCopy(unittest.TestCase):
     def test_copy_copies_file(self, is_file_mock, cfile_mock):
         cfile_mock.return_value=Path(self.dst_dir) / "foo.py"
         result = self.fe.copy(self.src_file, self.dst_dir)
-        cfile_mock.assert_called_with(Path(self.src_file), Path(self.dst_dir))
+        cfile_mock.assert_called_with(
+            Path(self.src_file), Path(self.dst_dir), progress=None
+        )
         self.assertTrue(isinstance(result, Path))
 
     @patch.object(FileExplorer, "copy_dir")
@@ -194,7 +234,9 @@ class TestCopy(unittest.TestCase):
     def test_copy_copies_dir(self, is_dir_mock, is_file_mock, cdir_mock):
         cdir_mock.return_value=Path(self.dst_dir) / "foo"
         result = self.fe.copy(self.src_dir, self.dst_dir)
-        cdir_mock.assert_called_with(Path(self.src_dir), Path(self.dst_dir))
+        cdir_mock.assert_called_with(
+            Path(self.src_dir), Path(self.dst_dir), progress=None
+        )
         self.assertTrue(isinstance(result, Path))
 
 
@@ -214,7 +256,7 @@ class TestMove(unittest.TestCase):
         unlink_mock.assert_called_once()
 
     @patch.object(FileExplorer, "copy")
-    @patch("explorer.file_explorer.shutil.rmtree")
+    @patch("explorer.file_explorer.TreeRemover.remove")
     @patch("explorer.file_explorer.pathlib.Path.is_file", return_value=False)
     @patch("explorer.file_explorer.pathlib.Path.is_dir", return_value=True)
     def test_move_dir(self, is_dir_mock, is_file_mock, rmtree_mock, c_mock):
@@ -222,6 +264,112 @@ class TestMove(unittest.TestCase):
         self.fe.move(self.src, self.dst)
         rmtree_mock.assert_called_with(self.src)
 
+    @patch.object(FileExplorer, "copy")
+    @patch("explorer.file_explorer.os.rename")
+    @patch.object(FileExplorer, "get_target")
+    @patch.object(FileExplorer, "_same_device", return_value="file")
+    def test_move_same_device_renames(self, same_mock, target_mock,
+                                      rename_mock, c_mock):
+        target_mock.return_value = Path(self.dst) / self.src.name
+        result = self.fe.move(self.src, self.dst)
+        rename_mock.assert_called_once_with(self.src, target_mock.return_value)
+        c_mock.assert_not_called()
+        self.assertEqual(target_mock.return_value, result)
+
+    @patch.object(FileExplorer, "copy_to")
+    @patch("explorer.file_explorer.os.unlink")
+    @patch.object(FileExplorer, "_unclaim")
+    @patch("explorer.file_explorer.os.rename")
+    @patch.object(FileExplorer, "get_target")
+    @patch.object(FileExplorer, "_same_device", return_value="file")
+    def test_move_exdev_falls_back_to_copy(self, same_mock, target_mock,
+                                           rename_mock, unclaim_mock,
+                                           unlink_mock, c_mock):
+        rename_mock.side_effect = OSError(errno.EXDEV, "cross-device link")
+        target_mock.return_value = Path(self.dst) / self.src.name
+        c_mock.return_value = target_mock.return_value
+        result = self.fe.move(self.src, self.dst)
+        c_mock.assert_called_once_with(
+            self.src, target_mock.return_value, "file", progress=None
+        )
+        unclaim_mock.assert_called_once()
+        unlink_mock.assert_called_once_with(self.src)
+        self.assertEqual(c_mock.return_value, result)
+
+    @patch.object(FileExplorer, "copy_to")
+    @patch("explorer.file_explorer.os.unlink")
+    def test_move_to_remove_error_keeps_copy(self, unlink_mock, c_mock):
+        target = Path(self.dst) / self.src.name
+        c_mock.return_value = target
+        unlink_mock.side_effect = PermissionError(errno.EACCES, "denied")
+        with self.assertRaises(MoveError) as cm:
+            self.fe.move_to(self.src, target, "file", same_device=False)
+        self.assertEqual(target, cm.exception.new_obj)
+        self.assertIs(unlink_mock.side_effect, cm.exception.error)
+
+    @patch.object(FileExplorer, "copy")
+    @patch.object(FileExplorer, "_unclaim")
+    @patch("explorer.file_explorer.os.rename")
+    @patch.object(FileExplorer, "get_target")
+    @patch.object(FileExplorer, "_same_device", return_value="file")
+    def test_move_rename_error_raises(self, same_mock, target_mock,
+                                      rename_mock, unclaim_mock, c_mock):
+        rename_mock.side_effect = PermissionError(errno.EACCES, "denied")
+        with self.assertRaises(PermissionError):
+            self.fe.move(self.src, self.dst)
+        c_mock.assert_not_called()
+
+
+class TestSameDevice(unittest.TestCase):
+
+    def setUp(self):
+        self.fe = FileExplorer()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "foo.py").write_text("foo")
+        (self.root / "bar").mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_device_file(self):
+        result = self.fe._same_device(self.root / "foo.py", self.root / "bar")
+        self.assertEqual("file", result)
+
+    def test_same_device_dir(self):
+        result = self.fe._same_device(self.root / "bar", self.root)
+        self.assertEqual("dir", result)
+
+    def test_dst_not_dir(self):
+        result = self.fe._same_device(self.root / "bar", self.root / "foo.py")
+        self.assertIsNone(result)
+
+    def test_missing_src(self):
+        result = self.fe._same_device(self.root / "spam", self.root)
+        self.assertIsNone(result)
+
+    def test_move_renames_file(self):
+        src = self.root / "foo.py"
+        result = self.fe.move(src, self.root / "bar")
+        self.assertEqual(self.root / "bar" / "foo.py", result)
+        self.assertFalse(src.exists())
+        self.assertEqual("foo", result.read_text())
+
+    def test_move_adds_suffix(self):
+        (self.root / "bar" / "foo.py").write_text("bar")
+        src = self.root / "foo.py"
+        result = self.fe.move(src, self.root / "bar")
+        self.assertEqual(self.root / "bar" / "foo_copy_1.py", result)
+        self.assertEqual("foo", result.read_text())
+        self.assertEqual("bar", (self.root / "bar" / "foo.py").read_text())
+
+    def test_move_dir(self):
+        (self.root / "spam").mkdir()
+        (self.root / "spam" / "eggs").write_text("eggs")
+        result = self.fe.move(self.root / "spam", self.root / "bar")
+        self.assertEqual(self.root / "bar" / "spam", result)
+        self.assertEqual("eggs", (result / "eggs").read_text())
+
 
 class TestRename(unittest.TestCase):
 
@@ -268,12 +416,12 @@ class TestRm(unittest.TestCase):
         self.fe.rm(self.src_file)
         unlink_mock.assert_called_once()
 
-    @patch("explorer.file_explorer.shutil.rmtree")
+    @patch("explorer.file_explorer.TreeRemover.remove")
     @patch("explorer.file_explorer.pathlib.Path.is_dir", return_value=True)
     @patch("explorer.file_explorer.pathlib.Path.is_file", return_value=False)
     def test_rm_dir(self, is_file_mock, is_dir_mock, rmtree_mock):
         self.fe.rm(self.src_dir)
-        rmtree_mock.assert_called_with(Path(self.src_dir))
+        rmtree_mock.assert_called_with(Path(self.src_dir), progress=None)
 
     def test_rm_invalid_path_raises_error(self):
         with self.assertRaises(FileNotFoundError):
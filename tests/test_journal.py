@@ -0,0 +1,372 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from explorer import Journal, Facade, RenameTemplate
+
+
+def item(i, func="copy"):
+    return {
+        "src": Path(f"src/foo{i}.py"),
+        "func": func,
+        "dst": Path("dst"),
+        "new_obj": Path(f"dst/foo{i}.py")
+    }
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "journal" / "log"
+        self.journal = Journal(self.path, flush_every=100)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp.cleanup()
+
+    def run_batch(self, journal, n, commit=True, done=None):
+        items = [item(i) for i in range(n)]
+        batch = journal.begin("copy", [(i["src"], i["dst"]) for i in items])
+        for i in range(n if done is None else done):
+            journal.done(batch, i, items[i])
+        if commit:
+            journal.commit(batch)
+        return batch, items
+
+    def test_history(self):
+        batch, items = self.run_batch(self.journal, 3)
+        self.journal.mark("undo")
+        self.journal.mark("redo")
+        events, interrupted = Journal(self.path).history()
+        self.assertEqual([("store", items), ("undo", None), ("redo", None)],
+                         events)
+        self.assertEqual([], interrupted)
+
+    def test_raw_values_kept(self):
+        batch = self.journal.begin("rename", [(Path("src/a.py"), None)])
+        renamed = {
+            "src": Path("src/a.py"), "func": "rename", "dst": "b",
+            "new_obj": Path("src/b.py")
+        }
+        self.journal.done(batch, 0, renamed)
+        self.journal.commit(batch)
+        events, interrupted = self.journal.history()
+        self.assertEqual([("store", [renamed])], events)
+
+    def test_aborted_batch_skipped(self):
+        batch, items = self.run_batch(self.journal, 2, commit=False)
+        self.journal.abort(batch)
+        self.assertEqual(([], []), self.journal.history())
+
+    def test_done_records_batched(self):
+        syncs = self.journal.syncs
+        self.run_batch(self.journal, 1000)
+        # intents, 10 flushes of done records, commit
+        self.assertLessEqual(self.journal.syncs - syncs, 12)
+        self.assertEqual(1000 * 2 + 2, self.journal.records)
+
+    def test_interrupted_batch(self):
+        batch, items = self.run_batch(self.journal, 5, commit=False, done=2)
+        self.journal.sync()
+        events, interrupted = Journal(self.path).history()
+        self.assertEqual([], events)
+        self.assertEqual(1, len(interrupted))
+        result_batch, done, pending = interrupted[0]
+        self.assertEqual(batch, result_batch)
+        self.assertEqual(items[:2], done)
+        self.assertEqual([2, 3, 4], [i for i, intent in pending])
+        self.assertEqual(Path("src/foo3.py"), pending[1][1]["src"])
+
+    def test_finish(self):
+        batch, items = self.run_batch(self.journal, 3, commit=False, done=1)
+        self.journal.finish(batch, {2: items[2]})
+        events, interrupted = self.journal.history()
+        self.assertEqual([("store", [items[0], items[2]])], events)
+
+    def test_finish_keeps_done_items(self):
+        batch, items = self.run_batch(self.journal, 3, commit=False, done=1)
+        self.journal.finish(batch, {}, done=True)
+        events, interrupted = self.journal.history()
+        self.assertEqual([("store", [items[0]])], events)
+
+    def test_retarget(self):
+        pairs = [
+            (Path("src/a.py"), Path("dst")), (Path("src/b.py"), Path("dst"))
+        ]
+        batch = self.journal.begin(
+            "copy", pairs, [Path("dst/a.py"), Path("dst/b.py")]
+        )
+        self.journal.retarget(batch, 1, Path("dst/b_copy_1.py"))
+        events, interrupted = Journal(self.path).history()
+        targets = [intent["target"] for i, intent in interrupted[0][2]]
+        self.assertEqual([Path("dst/a.py"), Path("dst/b_copy_1.py")], targets)
+
+    def test_redo_batch(self):
+        pairs = [
+            (Path("src/a.py"), Path("src")), (Path("src/b.py"), Path("dst"))
+        ]
+        batch = self.journal.begin("redo", pairs, [Path("trash/a.py"), None])
+        self.journal.commit(batch)
+        events, interrupted = Journal(self.path).history()
+        self.assertEqual([("redo", {0: Path("trash/a.py")})], events)
+
+    def test_torn_record_ignored(self):
+        batch, items = self.run_batch(self.journal, 2)
+        self.journal.close()
+        with open(self.path, "ab") as file:
+            file.write(b'{"op":"beg')
+        journal = Journal(self.path)
+        self.run_batch(journal, 1)
+        journal.close()
+        events, interrupted = Journal(self.path).history()
+        self.assertEqual([("store", items), ("store", [item(0)])], events)
+
+    def test_batch_ids_continue_after_restart(self):
+        first, items = self.run_batch(self.journal, 1)
+        self.journal.close()
+        self.journal = Journal(self.path)
+        second, items = self.run_batch(self.journal, 1)
+        self.assertGreater(second, first)
+
+    def test_compact(self):
+        for i in range(10):
+            self.run_batch(self.journal, 10)
+        events = [("store", [item(1)]), ("undo", None)]
+        self.journal.compact(events)
+        self.assertEqual(5, self.journal.records)
+        self.assertEqual((events, []), Journal(self.path).history())
+        self.run_batch(self.journal, 1)
+        self.assertEqual(3, len(Journal(self.path).history()[0]))
+
+    def test_invalid_mark_raises_error(self):
+        with self.assertRaises(ValueError):
+            self.journal.mark("spam")
+
+
+class TestFacadeJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.log = self.root / "journal"
+        self.src = self.root / "src"
+        self.dst = self.root / "dst"
+        self.src.mkdir()
+        self.dst.mkdir()
+        for name in ["foo.py", "bar.py"]:
+            (self.src / name).write_text(name)
+        # keep the trash in the temp dir
+        access = patch(
+            "explorer.trash.os.access",
+            side_effect=lambda path, mode: Path(path) == self.root
+        )
+        access.start()
+        self.addCleanup(access.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def transfer(self, facade, func):
+        objs = {
+            "src": self.src, "names": ["foo.py", "bar.py"],
+            "dst": self.dst, "func": func
+        }
+        return facade.transfer(objs)
+
+    def test_history_survives_restart(self):
+        facade = Facade(journal=self.log)
+        self.transfer(facade, "copy")
+        facade.rename(self.dst, "foo.py", "spam")
+        facade.undo()
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertEqual(facade.cache.items, restarted.cache.items)
+        self.assertEqual(facade.cache.current, restarted.cache.current)
+        restarted.undo()
+        self.assertFalse((self.dst / "foo.py").exists())
+        self.assertFalse((self.dst / "bar.py").exists())
+
+    def test_interrupted_move_finished(self):
+        facade = Facade(journal=self.log)
+        pairs = [
+            (self.src / "foo.py", self.dst), (self.src / "bar.py", self.dst)
+        ]
+        facade.journal.begin(
+            "move", pairs, [self.dst / "foo.py", self.dst / "bar.py"]
+        )
+        facade.fe.move(self.src / "foo.py", self.dst)
+        facade.journal.close()
+        # crash - nothing but the intents reached the journal
+        restarted = Facade(journal=self.log)
+        expected = [{
+            "src": self.src / "foo.py", "func": "move", "dst": self.dst,
+            "new_obj": self.dst / "foo.py"
+        }]
+        self.assertEqual(expected, restarted.cache.get_current())
+        restarted.undo()
+        self.assertTrue((self.src / "foo.py").exists())
+
+    def test_interrupted_batch_with_done_items_kept(self):
+        facade = Facade(journal=self.log)
+        pairs = [
+            (self.src / "foo.py", self.dst), (self.src / "bar.py", self.dst)
+        ]
+        batch = facade.journal.begin(
+            "move", pairs, [self.dst / "foo.py", self.dst / "bar.py"]
+        )
+        new_obj = facade.fe.move(self.src / "foo.py", self.dst)
+        facade.journal.done(batch, 0, {
+            "src": self.src / "foo.py", "func": "move", "dst": self.dst,
+            "new_obj": new_obj
+        })
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertEqual(1, len(restarted.cache.get_current()))
+        restarted.undo()
+        self.assertTrue((self.src / "foo.py").exists())
+
+    def test_interrupted_copy_rolled_back(self):
+        facade = Facade(journal=self.log)
+        facade.journal.begin(
+            "copy", [(self.src / "foo.py", self.dst)], [self.dst / "foo.py"]
+        )
+        (self.dst / "foo.py").touch()
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertFalse((self.dst / "foo.py").exists())
+        self.assertIsNone(restarted.cache.get_current())
+        self.assertEqual(([], []), restarted.journal.history())
+
+    def test_only_logged_targets_touched_by_recovery(self):
+        (self.src / "foo_copy_1.py").write_text("only copy")
+        (self.dst / "foo.py").write_text("mine")
+        facade = Facade(journal=self.log)
+        pairs = [
+            (self.src / "foo_copy_1.py", self.dst),
+            (self.src / "foo.py", self.dst)
+        ]
+        facade.journal.begin(
+            "move", pairs,
+            [self.dst / "foo_copy_1.py", self.dst / "foo_copy_2.py"]
+        )
+        os.rename(self.src / "foo_copy_1.py", self.dst / "foo_copy_1.py")
+        os.utime(self.dst / "foo.py")
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertEqual("only copy", (self.dst / "foo_copy_1.py").read_text())
+        self.assertEqual("mine", (self.dst / "foo.py").read_text())
+        self.assertEqual(1, len(restarted.cache.get_current()))
+
+    def test_intent_without_target_left_alone(self):
+        facade = Facade(journal=self.log)
+        facade.journal.begin("copy", [(self.src / "foo.py", self.dst)])
+        (self.dst / "foo.py").write_text("partial")
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertTrue((self.dst / "foo.py").exists())
+        self.assertIsNone(restarted.cache.get_current())
+
+    def test_interrupted_delete_kept(self):
+        facade = Facade(journal=self.log)
+        targets = [self.src / "foo.py", self.src / "bar.py"]
+        trashed = [facade.trash.reserve(target) for target in targets]
+        facade.journal.begin(
+            "delete", [(target, self.src) for target in targets], trashed
+        )
+        facade.trash.put(targets[0], trashed[0])
+        os.mkdir(trashed[1].parent)
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertFalse(trashed[1].parent.exists())
+        self.assertEqual(1, len(restarted.cache.get_current()))
+        restarted.undo()
+        self.assertEqual("foo.py", (self.src / "foo.py").read_text())
+
+    def test_redone_delete_survives_restart(self):
+        facade = Facade(journal=self.log)
+        facade.delete({"parent": self.src, "names": ["foo.py"]})
+        facade.undo()
+        facade.redo()
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertEqual(facade.cache.items, restarted.cache.items)
+        restarted.undo()
+        self.assertEqual("foo.py", (self.src / "foo.py").read_text())
+        facade.trash.stop(wait=True)
+        restarted.trash.stop(wait=True)
+
+    def test_interrupted_redo_rolled_back(self):
+        facade = Facade(journal=self.log)
+        facade.delete({"parent": self.src, "names": ["foo.py"]})
+        facade.undo()
+        with patch.object(facade.trash, "put", side_effect=KeyboardInterrupt):
+            with patch.object(facade, "_close_batch"):
+                with self.assertRaises(KeyboardInterrupt):
+                    facade.redo()
+        trashed = next(
+            Path(intent["target"]) for i, intent in
+            facade.journal.history()[1][0][2]
+        )
+        facade.trash.put(self.src / "foo.py", trashed)
+        facade.journal.close()
+        restarted = Facade(journal=self.log)
+        self.assertEqual("foo.py", (self.src / "foo.py").read_text())
+        self.assertFalse(trashed.parent.exists())
+        restarted.redo()
+        self.assertFalse((self.src / "foo.py").exists())
+        restarted.undo()
+        self.assertTrue((self.src / "foo.py").exists())
+        facade.trash.stop(wait=True)
+        restarted.trash.stop(wait=True)
+
+    def interrupt_renames(self, facade, renamed):
+        real_rename = os.rename
+        calls = []
+
+        def rename(src, dst):
+            if len(calls) == renamed:
+                raise KeyboardInterrupt
+            calls.append(src)
+            real_rename(src, dst)
+
+        objs = {"parent": self.src, "names": ["foo.py", "bar.py"]}
+        with patch.object(facade, "_commit"), \
+                patch.object(facade, "_done"), \
+                patch("explorer.renamer.os.rename", side_effect=rename):
+            with self.assertRaises(KeyboardInterrupt):
+                facade.rename_template(objs, "{name}")
+                raise KeyboardInterrupt
+        facade.journal.close()
+
+    def test_interrupted_renames_rolled_back(self):
+        facade = Facade(journal=self.log)
+        # swap needs 3 renames, the first parks foo.py under a temp name
+        with patch.object(RenameTemplate, "names",
+                          return_value=["bar.py", "foo.py"]):
+            self.interrupt_renames(facade, 2)
+        restarted = Facade(journal=self.log)
+        self.assertEqual(["bar.py", "foo.py"], sorted(os.listdir(self.src)))
+        self.assertEqual("foo.py", (self.src / "foo.py").read_text())
+        self.assertEqual("bar.py", (self.src / "bar.py").read_text())
+        self.assertIsNone(restarted.cache.get_current())
+
+    def test_interrupted_renames_finished(self):
+        facade = Facade(journal=self.log)
+        with patch.object(RenameTemplate, "names",
+                          return_value=["bar.py", "foo.py"]):
+            self.interrupt_renames(facade, 3)
+        restarted = Facade(journal=self.log)
+        self.assertEqual("bar.py", (self.src / "foo.py").read_text())
+        self.assertEqual(2, len(restarted.cache.get_current()))
+        restarted.undo()
+        self.assertEqual("foo.py", (self.src / "foo.py").read_text())
+
+    def test_clear_cache_logged(self):
+        facade = Facade(journal=self.log)
+        self.transfer(facade, "copy")
+        facade.clear_cache()
+        facade.journal.close()
+        self.assertIsNone(Facade(journal=self.log).cache.get_current())
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from explorer import scan, scan_chunks, Entry
+
+
+class TestScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        (self.path / "foo.py").write_bytes(b"12345")
+        (self.path / "bar").mkdir()
+        os.utime(self.path / "foo.py", (1, 1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan(self):
+        result = sorted(scan(self.path))
+        dir_st = (self.path / "bar").stat()
+        file_st = (self.path / "foo.py").stat()
+        expected = [
+            Entry("bar", "dirs", dir_st.st_mtime, dir_st.st_size,
+                  dir_st.st_ctime),
+            Entry("foo.py", "files", 1, 5, file_st.st_ctime)
+        ]
+        self.assertEqual(expected, result)
+
+    def test_scan_skips_broken_symlink(self):
+        try:
+            os.symlink(self.path / "missing", self.path / "broken")
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks not supported")
+        names = [entry.name for entry in scan(self.path)]
+        self.assertNotIn("broken", names)
+
+    def test_scan_invalid_path_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            list(scan(self.path / "missing"))
+
+
+class TestScanChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        for i in range(5):
+            (self.path / f"foo{i}.py").touch()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_chunks(self):
+        result = [len(chunk) for chunk in scan_chunks(self.path, 2)]
+        self.assertEqual([2, 2, 1], result)
+
+    def test_scan_chunks_empty_dir(self):
+        empty = self.path / "empty"
+        empty.mkdir()
+        self.assertEqual([], list(scan_chunks(empty)))
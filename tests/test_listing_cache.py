@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from pathlib import Path
+
+from explorer import ListingCache, Entry, scan
+
+
+class TestListingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        (self.path / "foo.py").touch()
+        os.utime(self.path, (1, 1))
+        self.load = Mock(side_effect=lambda path: list(scan(path)))
+        self.cache = ListingCache(self.load)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_unchanged_dir_served_from_memory(self):
+        first = self.cache.get(self.path)
+        second = self.cache.get(self.path)
+        self.assertEqual(first, second)
+        self.load.assert_called_once()
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_get_changed_dir_reloaded(self):
+        self.cache.get(self.path)
+        (self.path / "bar.py").touch()
+        os.utime(self.path, (2, 2))
+        result = self.cache.get(self.path)
+        self.assertIn("bar.py", result)
+        self.assertEqual(2, self.load.call_count)
+
+    def test_racy_listing_not_trusted(self):
+        os.utime(self.path)
+        self.cache.get(self.path)
+        self.cache.get(self.path)
+        self.assertEqual(2, self.load.call_count)
+
+    def test_get_invalid_path_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(self.path / "missing")
+
+    def test_lru_eviction(self):
+        dirs = []
+        for i in range(3):
+            path = self.path / f"dir{i}"
+            path.mkdir()
+            (path / "foo.py").touch()
+            os.utime(path, (1, 1))
+            dirs.append(path)
+        self.cache.get(dirs[0])
+        self.cache.max_bytes = self.cache.size * 2
+        self.cache.get(dirs[1])
+        self.cache.get(dirs[0])
+        self.cache.get(dirs[2])
+        self.assertEqual(2, self.cache.stats()["dirs"])
+        self.cache.get(dirs[0])
+        self.assertEqual(2, self.cache.hits)
+        self.cache.get(dirs[1])
+        self.assertEqual(4, self.load.call_count)
+
+    def test_invalidate(self):
+        self.cache.get(self.path)
+        self.cache.invalidate(self.path)
+        self.cache.get(self.path)
+        self.assertEqual(2, self.load.call_count)
+        self.assertEqual(0, self.cache.hits)
+
+    def test_find_many_cached(self):
+        self.cache.get(self.path)
+        result = self.cache.find_many(self.path, ["foo.py", "bar.py"])
+        self.assertEqual("foo.py", result[0].name)
+        self.assertIsNone(result[1])
+        self.load.assert_called_once()
+
+    def test_find_many_not_cached(self):
+        result = self.cache.find_many(self.path, ["foo.py", "bar.py"])
+        self.assertEqual(Entry, type(result[0]))
+        self.assertEqual("files", result[0].type)
+        self.assertIsNone(result[1])
+        self.load.assert_not_called()
+
+    def test_find_many_invalid_parent(self):
+        result = self.cache.find_many(self.path / "missing", ["foo.py"])
+        self.assertEqual([None], result)
+
+    def test_clear(self):
+        self.cache.get(self.path)
+        self.cache.clear()
+        expected = {"hits": 0, "misses": 0, "dirs": 0, "bytes": 0}
+        self.assertEqual(expected, self.cache.stats())
@@ -0,0 +1,72 @@
+import unittest
+
+from parameterized import parameterized
+
+from explorer import NameFilter
+
+
+NAMES = ["app.log", "App.LOG.1", "error.log", "notes.txt", "logo.png", "a1"]
+
+
+class TestNameFilter(unittest.TestCase):
+
+    @parameterized.expand([
+        ("substring", "log", "substring",
+         ["app.log", "App.LOG.1", "error.log", "logo.png"]),
+        ("substring_special_chars", ".log", "substring",
+         ["app.log", "App.LOG.1", "error.log"]),
+        ("glob", "*.log", "glob", ["app.log", "error.log"]),
+        ("glob_case_insensitive", "APP.*", "glob", ["app.log", "App.LOG.1"]),
+        ("glob_single_char", "a?", "glob", ["a1"]),
+        ("regex", r"\.log$", "regex", ["app.log", "error.log"]),
+        ("regex_unanchored", r"\d", "regex", ["App.LOG.1", "a1"]),
+        ("empty", "", "substring", NAMES),
+    ])
+    def test_filter(self, name, query, mode, expected):
+        self.assertEqual(expected, NameFilter(query, mode).filter(NAMES))
+
+    @parameterized.expand([
+        ("mode", "log", "unknown"),
+        ("regex", "(log", "regex"),
+    ])
+    def test_invalid(self, name, query, mode):
+        with self.assertRaises(ValueError):
+            NameFilter(query, mode)
+
+    @parameterized.expand([
+        ("substring_extended", "lo", "log", "substring", True),
+        ("substring_prepended", "og", "log", "substring", True),
+        ("substring_case", "LO", "log", "substring", True),
+        ("substring_shortened", "log", "lo", "substring", False),
+        ("substring_replaced", "log", "txt", "substring", False),
+        ("glob_star_extended", "*", "*.log", "glob", True),
+        ("glob_prefix_star", "app*", "app*.log", "glob", True),
+        ("glob_anchored", "*.lo", "*.log", "glob", False),
+        ("glob_bracket", "[a*", "[a*]", "glob", False),
+        ("glob_same", "*.log", "*.log", "glob", True),
+        ("regex_literal", "lo", "log", "regex", True),
+        ("regex_special", "lo", "lo|x", "regex", False),
+        ("regex_quantifier", "log", "log?", "regex", False),
+        ("other_mode", "log", "log", "glob", False),
+    ])
+    def test_narrows(self, name, old, new, mode, expected):
+        old = NameFilter(old, "substring" if name == "other_mode" else mode)
+        self.assertEqual(expected, NameFilter(new, mode).narrows(old))
+
+    def test_narrows_none(self):
+        self.assertFalse(NameFilter("log").narrows(None))
+
+    @parameterized.expand([
+        ("substring", ["l", "lo", "log", ".log", "e.log"], "substring"),
+        ("glob", ["*", "*.", "*.l*", "*.lo*", "*.log"], "glob"),
+        ("regex", ["l", "lo", "log", "log$", r"\.log$"], "regex"),
+    ])
+    def test_narrowed_equals_full(self, name, queries, mode):
+        previous = None
+        shown = NAMES
+        for query in queries:
+            name_filter = NameFilter(query, mode)
+            source = shown if name_filter.narrows(previous) else NAMES
+            shown = name_filter.filter(source)
+            self.assertEqual(name_filter.filter(NAMES), shown)
+            previous = name_filter
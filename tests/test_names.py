@@ -0,0 +1,93 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from explorer import NameAllocator
+
+
+class TestNameAllocator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        self.names = NameAllocator()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_allocate_free_name(self):
+        result = self.names.allocate(self.path, "foo.py")
+        self.assertEqual(self.path / "foo.py", result)
+        self.assertTrue(result.is_file())
+
+    def test_allocate_taken_name(self):
+        (self.path / "foo.py").touch()
+        results = [self.names.allocate(self.path, "foo.py") for i in range(3)]
+        expected = [self.path / f"foo_copy_{i}.py" for i in range(1, 4)]
+        self.assertEqual(expected, results)
+
+    def test_allocate_dir(self):
+        (self.path / "foo.d").mkdir()
+        result = self.names.allocate(self.path, "foo.d", is_dir=True)
+        self.assertEqual(self.path / "foo.d_copy_1", result)
+        self.assertTrue(result.is_dir())
+
+    def test_allocate_without_claim(self):
+        result = self.names.allocate(self.path, "foo.py", claim=False)
+        self.assertFalse(result.exists())
+        result = self.names.allocate(self.path, "foo.py", claim=False)
+        self.assertEqual(self.path / "foo_copy_1.py", result)
+
+    def test_directory_read_once(self):
+        (self.path / "foo.py").touch()
+        for i in range(100):
+            self.names.allocate(self.path, "foo.py")
+        self.assertEqual(1, self.names.scans)
+        self.assertEqual(101, len(os.listdir(self.path)))
+
+    def test_external_change_rescans(self):
+        (self.path / "foo.py").touch()
+        self.names.allocate(self.path, "foo.py")
+        (self.path / "foo.py").unlink()
+        os.utime(self.path, ns=(0, 0))
+        result = self.names.allocate(self.path, "foo.py")
+        self.assertEqual(self.path / "foo.py", result)
+        self.assertEqual(2, self.names.scans)
+
+    def test_name_taken_by_concurrent_writer(self):
+        (self.path / "foo.py").touch()
+        self.names.allocate(self.path, "foo.py")
+        (self.path / "foo_copy_2.py").write_text("theirs")
+        self.names._touch(self.path)
+        result = self.names.allocate(self.path, "foo.py")
+        self.assertEqual(self.path / "foo_copy_3.py", result)
+        self.assertEqual("theirs", (self.path / "foo_copy_2.py").read_text())
+
+    def test_release(self):
+        result = self.names.allocate(self.path, "foo.py")
+        result.unlink()
+        self.names.release(result)
+        self.assertEqual(result, self.names.allocate(self.path, "foo.py"))
+
+    def test_threads_get_unique_names(self):
+        results = []
+
+        def allocate():
+            for i in range(50):
+                results.append(self.names.allocate(self.path, "foo.py"))
+
+        threads = [threading.Thread(target=allocate) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(200, len(set(results)))
+
+    def test_lru_limit(self):
+        names = NameAllocator(max_dirs=2)
+        for i in range(3):
+            (self.path / str(i)).mkdir()
+            names.allocate(self.path / str(i), "foo.py")
+        self.assertEqual(2, len(names._dirs))
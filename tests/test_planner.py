@@ -0,0 +1,152 @@
+import errno
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from pathlib import Path
+
+from explorer import FileExplorer, MoveError, Planner
+
+
+class TestPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.src = root / "src"
+        self.dst = root / "dst"
+        (self.src / "tree").mkdir(parents=True)
+        self.dst.mkdir()
+        (self.src / "foo.py").write_text("foo")
+        (self.src / "tree" / "bar.py").write_text("barbar")
+        self.fe = FileExplorer()
+        self.planner = Planner(self.fe)
+
+    def test_plan(self):
+        pairs = [(self.src / "foo.py", self.dst), (self.src / "tree", self.dst)]
+        plan = self.planner.plan("copy", pairs)
+        self.assertEqual([], plan.errors)
+        self.assertEqual(["file", "dir"], [item.type for item in plan.items])
+        self.assertEqual([3, 6], [item.size for item in plan.items])
+        self.assertEqual([9], list(plan.required.values()))
+        self.assertEqual(
+            [self.dst / "foo.py", self.dst / "tree"],
+            [item.target for item in plan.items]
+        )
+        self.assertEqual([], os.listdir(self.dst))
+
+    def test_plan_resolves_names_with_one_listing(self):
+        (self.dst / "foo.py").write_text("")
+        pairs = [(self.src / "foo.py", self.dst)] * 3
+        plan = self.planner.plan("copy", pairs)
+        expected = [
+            self.dst / "foo_copy_1.py",
+            self.dst / "foo_copy_2.py",
+            self.dst / "foo_copy_3.py"
+        ]
+        self.assertEqual(expected, [item.target for item in plan.items])
+        self.assertEqual(1, self.fe.names.scans)
+
+    def test_plan_rejects_invalid_items(self):
+        pairs = [
+            (self.src / "baz.py", self.dst),
+            (self.src / "foo.py", self.dst / "missing"),
+            (self.src / "tree", self.src / "tree"),
+            (self.src / "foo.py", self.dst)
+        ]
+        plan = self.planner.plan("copy", pairs)
+        self.assertEqual(3, len(plan.errors))
+        self.assertIsInstance(plan.items[0].error, FileNotFoundError)
+        self.assertIsInstance(plan.items[1].error, FileNotFoundError)
+        self.assertEqual(errno.EINVAL, plan.items[2].error.errno)
+        self.assertIsNone(plan.items[3].error)
+
+    def test_plan_same_device_move_needs_no_space(self):
+        plan = self.planner.plan("move", [(self.src / "tree", self.dst)])
+        self.assertTrue(plan.items[0].same_device)
+        self.assertEqual({}, plan.required)
+
+    @patch("explorer.planner.shutil.disk_usage")
+    def test_plan_checks_space_once(self, usage_mock):
+        usage_mock.return_value = Mock(free=8)
+        pairs = [(self.src / "foo.py", self.dst), (self.src / "tree", self.dst)]
+        with self.assertRaises(OSError) as cm:
+            self.planner.plan("copy", pairs)
+        self.assertEqual(errno.ENOSPC, cm.exception.errno)
+        usage_mock.assert_called_once_with(self.dst)
+        self.assertEqual(0, self.fe.names.scans)
+
+    def test_plan_invalid_func(self):
+        with self.assertRaises(ValueError):
+            self.planner.plan("rename", [])
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.src = root / "src"
+        self.dst = root / "dst"
+        (self.src / "tree").mkdir(parents=True)
+        self.dst.mkdir()
+        (self.src / "foo.py").write_text("foo")
+        (self.src / "tree" / "bar.py").write_text("bar")
+        self.fe = FileExplorer()
+        self.planner = Planner(self.fe)
+        self.pairs = [
+            (self.src / "baz.py", self.dst),
+            (self.src / "foo.py", self.dst),
+            (self.src / "tree", self.dst)
+        ]
+
+    def test_run_copy(self):
+        plan = self.planner.plan("copy", self.pairs)
+        items = list(self.planner.run(plan))
+        self.assertIsInstance(items[0].error, FileNotFoundError)
+        self.assertEqual(
+            [None, self.dst / "foo.py", self.dst / "tree"],
+            [item.new_obj for item in items]
+        )
+        self.assertEqual("bar", (self.dst / "tree" / "bar.py").read_text())
+
+    def test_run_move(self):
+        plan = self.planner.plan("move", self.pairs)
+        items = list(self.planner.run(plan))
+        self.assertEqual(self.dst / "tree", items[2].new_obj)
+        self.assertEqual([], os.listdir(self.src))
+
+    def test_run_move_source_not_removed(self):
+        plan = self.planner.plan("move", self.pairs[2:])
+        # force the copy and remove path of moves across devices
+        plan.items[0].same_device = False
+        with patch.object(
+            self.fe.remover, "remove", side_effect=PermissionError()
+        ):
+            items = list(self.planner.run(plan))
+        self.assertEqual("copy", items[0].func)
+        self.assertEqual(self.dst / "tree", items[0].new_obj)
+        self.assertIsInstance(items[0].error, MoveError)
+        self.assertIsInstance(items[0].error.error, PermissionError)
+        self.assertEqual("bar", (self.dst / "tree" / "bar.py").read_text())
+        self.assertTrue((self.src / "tree").exists())
+
+    def test_run_target_taken_after_plan(self):
+        plan = self.planner.plan("copy", self.pairs[1:2])
+        (self.dst / "foo.py").write_text("")
+        retarget = Mock()
+        items = list(self.planner.run(plan, retarget=retarget))
+        self.assertEqual(self.dst / "foo_copy_1.py", items[0].new_obj)
+        self.assertEqual("foo", items[0].new_obj.read_text())
+        retarget.assert_called_once_with(0, self.dst / "foo_copy_1.py")
+
+    @patch("explorer.file_explorer.FileCopier.copy2")
+    def test_run_failed_item_releases_target(self, copy_mock):
+        copy_mock.side_effect = [PermissionError(), self.dst / "tree/bar.py"]
+        plan = self.planner.plan("copy", self.pairs)
+        items = list(self.planner.run(plan))
+        self.assertIsInstance(items[1].error, PermissionError)
+        self.assertIsNone(items[1].new_obj)
+        self.assertEqual(["tree"], os.listdir(self.dst))
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from pathlib import Path
+
+from explorer import TreeRemover, TreeRemoveError
+
+
+class TestTreeRemover(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        self.root = self.path / "root"
+        for i in range(10):
+            deep = self.root / f"d{i}" / "a" / "b"
+            deep.mkdir(parents=True)
+            for j in range(5):
+                (deep / f"foo{j}.py").write_text(str(j))
+        (self.root / "empty").mkdir()
+        (self.root / "bar.py").write_text("bar")
+        self.outside = self.path / "outside"
+        self.outside.mkdir()
+        (self.outside / "keep.py").write_text("keep")
+        os.symlink(self.outside, self.root / "link")
+        # 10 * (3 dirs + 5 files) + empty + bar.py + link + root
+        self.total = 84
+        self.remover = TreeRemover(workers=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_remove(self):
+        result = self.remover.remove(self.root)
+        self.assertFalse(self.root.exists())
+        self.assertEqual(self.total, result)
+
+    def test_remove_keeps_symlink_target(self):
+        self.remover.remove(self.root)
+        self.assertEqual("keep", (self.outside / "keep.py").read_text())
+
+    def test_remove_reports_progress(self):
+        progress = Mock()
+        self.remover.remove(self.root, progress=progress)
+        counted = sum(c.args[0] for c in progress.call_args_list)
+        self.assertEqual(self.total, counted)
+
+    def test_remove_single_worker(self):
+        result = TreeRemover(workers=1).remove(self.root)
+        self.assertFalse(self.root.exists())
+        self.assertEqual(self.total, result)
+
+    def test_remove_without_free_descriptors(self):
+        error = OSError(24, "Too many open files")
+        with patch("explorer.remover.os.dup", side_effect=error):
+            result = self.remover.remove(self.root)
+        self.assertFalse(self.root.exists())
+        self.assertEqual(self.total, result)
+
+    def test_remove_collects_errors(self):
+        unlink = os.unlink
+
+        def failing_unlink(name, dir_fd=None):
+            if name == "foo3.py":
+                raise PermissionError("denied")
+            return unlink(name, dir_fd=dir_fd)
+
+        with patch("explorer.remover.os.unlink", side_effect=failing_unlink):
+            with self.assertRaises(TreeRemoveError) as ctx:
+                self.remover.remove(self.root)
+        failed = {Path(path).name for path, reason in ctx.exception.errors}
+        # files and every directory above them stay
+        self.assertEqual({"foo3.py", "b", "a", "root"} | {
+            f"d{i}" for i in range(10)
+        }, failed)
+        self.assertEqual(self.root, ctx.exception.root)
+        self.assertFalse((self.root / "bar.py").exists())
+        self.assertTrue((self.root / "d0" / "a" / "b" / "foo3.py").exists())
+
+    def test_remove_symlink_raises_error(self):
+        with self.assertRaises(OSError):
+            self.remover.remove(self.root / "link")
+        self.assertTrue(self.outside.exists())
+
+    def test_remove_missing_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            self.remover.remove(self.path / "spam")
+
+    @patch.object(TreeRemover, "supported", False)
+    def test_remove_fallback(self):
+        self.remover.remove(self.root)
+        self.assertFalse(self.root.exists())
+        self.assertTrue(self.outside.exists())
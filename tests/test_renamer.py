@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+from parameterized import parameterized
+
+from explorer import BulkRenamer
+
+
+class TestBulkRenamer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.parent = Path(self.tmp.name)
+        for name in ("a", "b", "c", "d"):
+            (self.parent / name).write_text(name)
+        self.renamer = BulkRenamer()
+
+    def content(self):
+        return {
+            path.name: path.read_text() for path in self.parent.iterdir()
+        }
+
+    def test_chain(self):
+        plan = self.renamer.plan(self.parent, [("a", "b"), ("b", "e")])
+        self.assertEqual([("b", "e"), ("a", "b")], plan.steps)
+        self.assertEqual(0, plan.temps)
+        self.renamer.run(plan)
+        self.assertEqual(
+            {"b": "a", "c": "c", "d": "d", "e": "b"}, self.content()
+        )
+
+    def test_cycle(self):
+        pairs = [("a", "b"), ("b", "c"), ("c", "a")]
+        plan = self.renamer.plan(self.parent, pairs)
+        self.assertEqual(1, plan.temps)
+        self.assertEqual(4, len(plan.steps))
+        result = self.renamer.run(plan)
+        self.assertEqual(
+            {"a": "c", "b": "a", "c": "b", "d": "d"}, self.content()
+        )
+        self.assertEqual((self.parent / "a", self.parent / "b"), result[0])
+
+    def test_inverse(self):
+        pairs = [("a", "b"), ("b", "a"), ("c", "e")]
+        plan = self.renamer.plan(self.parent, pairs)
+        self.renamer.run(plan)
+        self.renamer.rename(self.parent, plan.inverse())
+        self.assertEqual(
+            {"a": "a", "b": "b", "c": "c", "d": "d"}, self.content()
+        )
+
+    def test_unchanged_names_skipped(self):
+        plan = self.renamer.plan(self.parent, [("a", "a"), ("b", "e")])
+        self.assertEqual([("b", "e")], plan.pairs)
+
+    @parameterized.expand([
+        ("existing", [("a", "d")], FileExistsError),
+        ("kept", [("a", "a"), ("b", "a")], FileExistsError),
+        ("duplicate", [("a", "e"), ("b", "e")], FileExistsError),
+        ("missing", [("x", "e")], FileNotFoundError),
+        ("twice", [("a", "e"), ("a", "f")], ValueError),
+        ("separator", [("a", f"e{os.sep}f")], ValueError),
+        ("empty", [("a", "")], ValueError)
+    ])
+    def test_plan_rejects(self, name, pairs, error):
+        with self.assertRaises(error):
+            self.renamer.plan(self.parent, pairs)
+
+    def test_run_rolls_back(self):
+        plan = self.renamer.plan(self.parent, [("a", "b"), ("b", "e")])
+        rename = os.rename
+        calls = []
+
+        def failing(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise PermissionError("denied")
+            rename(src, dst)
+
+        with patch("explorer.renamer.os.rename", side_effect=failing):
+            with self.assertRaises(PermissionError):
+                self.renamer.run(plan)
+        self.assertEqual(
+            {"a": "a", "b": "b", "c": "c", "d": "d"}, self.content()
+        )
+
+    def test_run_target_created_after_plan(self):
+        plan = self.renamer.plan(self.parent, [("a", "e")])
+        (self.parent / "e").write_text("e")
+        with self.assertRaises(FileExistsError):
+            self.renamer.run(plan)
+        self.assertEqual("e", (self.parent / "e").read_text())
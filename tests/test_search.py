@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from parameterized import parameterized
+
+from explorer import Hit, SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        (self.root / "src" / "explorer").mkdir(parents=True)
+        (self.root / "docs").mkdir()
+        for path in ("README.md", "src/setup.py", "src/explorer/search.py",
+                     "src/explorer/Cache.py", "docs/index.rst"):
+            (self.root / path).write_text("")
+        self.index = SearchIndex(self.root, workers=2).build()
+
+    def found(self, query, mode="substring"):
+        return sorted(
+            str(hit.path.relative_to(self.root))
+            for hit in self.index.search(query, mode)
+        )
+
+    def test_build(self):
+        self.assertTrue(self.index.ready.is_set())
+        self.assertEqual(8, self.index.count)
+
+    @parameterized.expand([
+        ("trigram", "explorer", "substring", ["src/explorer"]),
+        ("short", "py", "substring",
+         ["src/explorer/Cache.py", "src/explorer/search.py", "src/setup.py"]),
+        ("single_char", "x", "substring", ["docs/index.rst", "src/explorer"]),
+        ("case_insensitive", "CACHE", "substring", ["src/explorer/Cache.py"]),
+        ("no_trigram", "zzz", "substring", []),
+        ("glob", "s*.py", "glob", ["src/explorer/search.py", "src/setup.py"]),
+        ("glob_whole_name", "*.p", "glob", []),
+        ("glob_class", "[rs]e*", "glob",
+         ["README.md", "src/explorer/search.py", "src/setup.py"]),
+        ("regex", r"^\w{5}\.py$", "regex",
+         ["src/explorer/Cache.py", "src/setup.py"]),
+        ("regex_anchor", r"^s", "regex",
+         ["src", "src/explorer/search.py", "src/setup.py"])
+    ])
+    def test_search(self, name, query, mode, expected):
+        expected = [str(Path(path)) for path in expected]
+        self.assertEqual(expected, self.found(query, mode))
+
+    def test_search_hit_type(self):
+        hits = list(self.index.search("doc"))
+        self.assertEqual([Hit(self.root / "docs", "dirs")], hits)
+
+    @parameterized.expand([
+        ("mode", "foo", "fuzzy"),
+        ("regex", "(", "regex")
+    ])
+    def test_search_invalid(self, name, query, mode):
+        with self.assertRaises(ValueError):
+            self.index.search(query, mode)
+
+    def test_update_added(self):
+        (self.root / "src" / "new.py").write_text("")
+        (self.root / "src" / "pkg" / "sub").mkdir(parents=True)
+        (self.root / "src" / "pkg" / "sub" / "deep.py").write_text("")
+        self.index.update(self.root / "src")
+        self.assertEqual([str(Path("src/new.py"))], self.found("new"))
+        self.assertEqual([str(Path("src/pkg/sub/deep.py"))], self.found("dee"))
+        self.assertEqual(12, self.index.count)
+
+    def test_update_removed(self):
+        for path in ("src/explorer/search.py", "src/explorer/Cache.py"):
+            os.unlink(self.root / path)
+        os.rmdir(self.root / "src" / "explorer")
+        self.index.update(self.root / "src")
+        self.assertEqual([], self.found("explorer"))
+        self.assertEqual([str(Path("src/setup.py"))], self.found("py"))
+        self.assertEqual(5, self.index.count)
+
+    def test_update_renamed(self):
+        os.rename(self.root / "docs", self.root / "manual")
+        self.index.update(self.root)
+        self.assertEqual([], self.found("docs"))
+        self.assertEqual([str(Path("manual/index.rst"))], self.found("index"))
+
+    def test_update_outside_root(self):
+        with tempfile.TemporaryDirectory() as other:
+            self.index.update(other)
+        self.assertEqual(8, self.index.count)
+
+    def test_start(self):
+        index = SearchIndex(self.root)
+        index.start().join()
+        self.assertTrue(index.ready.is_set())
+        self.assertEqual(8, index.count)
+
+    def test_update_names(self):
+        (self.root / "src" / "new.py").write_text("")
+        os.unlink(self.root / "src" / "setup.py")
+        self.index.update(self.root / "src", ["new.py", "setup.py"])
+        self.assertEqual([str(Path("src/new.py"))], self.found("new"))
+        self.assertEqual([], self.found("setup"))
+        self.assertEqual(8, self.index.count)
+
+    def test_update_compacts_dead_entries(self):
+        self.index.MIN_DEAD = 0
+        for i in range(50):
+            (self.root / "src" / f"tmp{i}.txt").write_text("")
+            self.index.update(self.root / "src", [f"tmp{i}.txt"])
+            os.unlink(self.root / "src" / f"tmp{i}.txt")
+            self.index.update(self.root / "src", [f"tmp{i}.txt"])
+        self.assertLessEqual(len(self.index.names), 12)
+        self.assertEqual(8, self.index.count)
+        self.assertEqual([], self.found("tmp"))
+        self.assertEqual(
+            [str(Path("src/explorer/search.py"))], self.found("search")
+        )
+        self.assertEqual(["docs"], self.found("doc"))
+        self.assertEqual([str(Path("docs/index.rst"))], self.found("index"))
+
+    def test_search_in_progress_survives_compaction(self):
+        self.index.MIN_DEAD = 0
+        expected = [hit.path for hit in self.index.search("e", "regex")]
+        started = self.index.search("e", "regex")
+        first = next(started)
+        pending = self.index.search("e", "regex")
+        os.unlink(self.root / "docs" / "index.rst")
+        os.rmdir(self.root / "docs")
+        os.unlink(self.root / "README.md")
+        self.index.update(self.root)
+        self.assertEqual(5, len(self.index.names))
+        self.assertEqual(expected[0], first.path)
+        # removed entries are skipped, the rest keeps valid paths
+        expected = [path for path in expected if path.exists()]
+        self.assertEqual(expected, [hit.path for hit in started])
+        self.assertEqual(expected, [hit.path for hit in pending])
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from explorer import SizeService
+
+
+class TestSizeService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        (self.root / "a" / "b").mkdir(parents=True)
+        (self.root / "c").mkdir()
+        (self.root / "top.txt").write_text("x" * 10)
+        (self.root / "a" / "a.txt").write_text("x" * 100)
+        (self.root / "a" / "b" / "b.txt").write_text("x" * 1000)
+        self.sizes = SizeService(workers=2)
+        self.addCleanup(self.sizes.close)
+
+    def test_measure(self):
+        self.assertEqual(1110, self.sizes.measure(self.root))
+        self.assertEqual(1100, self.sizes.size(self.root / "a"))
+        self.assertEqual(0, self.sizes.size(self.root / "c"))
+
+    def test_measure_not_a_dir(self):
+        self.assertIsNone(self.sizes.measure(self.root / "top.txt"))
+        self.assertIsNone(self.sizes.measure(self.root / "missing"))
+
+    def test_size_unknown(self):
+        self.assertIsNone(self.sizes.size(self.root))
+
+    def record_scans(self):
+        # os.scandir is patched process-wide, skip dirs of other threads
+        scanned = []
+        scandir = os.scandir
+
+        def record(path):
+            if Path(path) == self.root or self.root in Path(path).parents:
+                scanned.append(Path(path))
+            return scandir(path)
+
+        return patch("explorer.sizes.os.scandir", side_effect=record), scanned
+
+    def test_measure_reuses_cached_tree(self):
+        self.sizes.measure(self.root)
+        patcher, scanned = self.record_scans()
+        with patcher:
+            self.assertEqual(1110, self.sizes.measure(self.root))
+            self.assertEqual(1100, self.sizes.measure(self.root / "a"))
+        self.assertEqual([], scanned)
+
+    def test_measure_reads_changed_dir_only(self):
+        self.sizes.measure(self.root)
+        (self.root / "a" / "b" / "new.txt").write_text("x" * 5)
+        self.sizes.invalidate(self.root / "a" / "b")
+        patcher, scanned = self.record_scans()
+        with patcher:
+            self.assertEqual(1115, self.sizes.measure(self.root))
+        self.assertEqual([self.root / "a" / "b"], scanned)
+
+    def test_measure_changed_subdir_invalidates_ancestors(self):
+        self.sizes.measure(self.root)
+        (self.root / "a" / "new.txt").write_text("x" * 5)
+        self.assertEqual(1105, self.sizes.measure(self.root / "a"))
+        self.assertIsNone(self.sizes.size(self.root))
+        self.assertEqual(1115, self.sizes.measure(self.root))
+
+    def test_invalidate(self):
+        self.sizes.measure(self.root)
+        self.sizes.invalidate(self.root / "a" / "b")
+        self.assertIsNone(self.sizes.size(self.root / "a" / "b"))
+        self.assertIsNone(self.sizes.size(self.root / "a"))
+        self.assertIsNone(self.sizes.size(self.root))
+        self.assertEqual(0, self.sizes.size(self.root / "c"))
+
+    def test_max_dirs(self):
+        sizes = SizeService(workers=2, max_dirs=2)
+        self.addCleanup(sizes.close)
+        self.assertEqual(1110, sizes.measure(self.root))
+        self.assertEqual(1110, sizes.measure(self.root))
+
+    def test_request(self):
+        self.sizes.request(self.root, ["a", "c", "missing"])
+        results = []
+        deadline = time.monotonic() + 3
+        while len(results) < 2 and time.monotonic() < deadline:
+            results.extend(self.sizes.results())
+            time.sleep(0.01)
+        expected = [(self.root, "a", 1100), (self.root, "c", 0)]
+        self.assertEqual(expected, sorted(results))
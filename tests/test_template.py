@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from parameterized import parameterized
+
+from explorer import Entry, RenameTemplate
+
+
+class TestRenameTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.entry = Entry("IMG_1234.jpeg", "files", 86400 * 365, 2048, 0)
+
+    @parameterized.expand([
+        ("text", "holiday", None, "holiday"),
+        ("name", "{name}", None, "IMG_1234"),
+        ("ext", "{name}_{ext}", None, "IMG_1234_jpeg"),
+        ("counter", "{n}", None, "4"),
+        ("padded_counter", "{n:03}", None, "004"),
+        ("size", "{size}", None, "2048"),
+        ("group", "photo_{1}", r"_(\d+)", "photo_1234"),
+        ("named_group", "{num}", r"(?P<num>\d+)", "1234"),
+        ("whole_match", "{0}", r"\d\d", "12"),
+        ("no_match", "x{1}", r"(zzz)", "x"),
+        ("lower", "{name|lower}", None, "img_1234"),
+        ("chained", "{name|lower|capitalize}", None, "Img_1234"),
+        ("braces", "{{{n}}}", None, "{4}")
+    ])
+    def test_render(self, name, template, pattern, expected):
+        result = RenameTemplate(template, pattern).render(3, self.entry)
+        self.assertEqual(expected, result)
+
+    def test_render_dates(self):
+        template = RenameTemplate("{mtime}-{ctime:%Y}-{today:%Y}")
+        expected = "-".join([
+            time.strftime("%Y%m%d", time.localtime(86400 * 365)),
+            time.strftime("%Y", time.localtime(0)),
+            time.strftime("%Y")
+        ])
+        self.assertEqual(expected, template.render(0, self.entry))
+
+    def test_names_keep_extension(self):
+        template = RenameTemplate("{n}", start=10, step=10)
+        entries = [self.entry, Entry("dir", "dirs", 0, 0, 0)]
+        names = list(template.names(entries, offset=2))
+        self.assertEqual(["30.jpeg", "40"], names)
+
+    def test_literal(self):
+        template = RenameTemplate.literal("{name}")
+        self.assertEqual("{name}", template.render(0, self.entry))
+
+    @parameterized.expand([
+        ("unknown_field", "{foo}", None),
+        ("unknown_transform", "{name|reverse}", None),
+        ("missing_group", "{2}", r"(\d)"),
+        ("no_pattern", "{1}", None),
+        ("unbalanced", "{name", None),
+        ("bad_spec", "{n:xyz}", None),
+        ("bad_pattern", "{0}", "(")
+    ])
+    def test_invalid(self, name, template, pattern):
+        with self.assertRaises(ValueError):
+            RenameTemplate(template, pattern)
@@ -0,0 +1,123 @@
+import errno
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+from pathlib import Path
+
+from explorer import FileExplorer, TransferJob, TransferEngine, TreeCopyError
+
+
+class TestTransferJob(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.src = root / "src"
+        self.dst = root / "dst"
+        self.src.mkdir()
+        self.dst.mkdir()
+        (self.src / "foo.py").write_text("foo")
+        (self.src / "bar.py").write_text("bar")
+        self.fe = FileExplorer()
+        self.items = [
+            (self.src / "foo.py", self.dst), (self.src / "bar.py", self.dst)
+        ]
+
+    def test_run(self):
+        job = TransferJob(self.fe, "copy", self.items)
+        job.run()
+        expected = {
+            "src": self.src / "bar.py",
+            "func": "copy",
+            "dst": self.dst,
+            "new_obj": self.dst / "bar.py"
+        }
+        self.assertEqual(2, len(job.results))
+        self.assertEqual(expected, job.results[1])
+        self.assertTrue(job.done)
+        self.assertIsNone(job.error)
+        self.assertEqual((6, 2), (job.bytes_done, job.files_done))
+
+    def test_run_move_touches_src_parent(self):
+        job = TransferJob(self.fe, "move", self.items)
+        job.run()
+        self.assertEqual({self.src, self.dst}, job.touched)
+        self.assertEqual([], os.listdir(self.src))
+
+    def test_run_continues_after_error(self):
+        self.items.insert(0, (self.src / "baz.py", self.dst))
+        job = TransferJob(self.fe, "copy", self.items)
+        job.run()
+        self.assertEqual(2, len(job.results))
+        self.assertEqual([self.src / "baz.py"], [f[0] for f in job.failures])
+        self.assertIsInstance(job.error, FileNotFoundError)
+
+    def test_run_journal_done_indexes(self):
+        journal = Mock()
+        self.items.insert(0, (self.src / "baz.py", self.dst))
+        job = TransferJob(self.fe, "copy", self.items, journal)
+        job.run()
+        indexes = [c.args[1] for c in journal.done.call_args_list]
+        self.assertEqual([1, 2], indexes)
+
+    @patch("explorer.planner.shutil.disk_usage")
+    def test_run_not_enough_space(self, usage_mock):
+        usage_mock.return_value = Mock(free=1)
+        journal = Mock()
+        job = TransferJob(self.fe, "copy", self.items, journal)
+        job.run()
+        self.assertEqual(errno.ENOSPC, job.error.errno)
+        self.assertEqual([], job.results)
+        journal.begin.assert_not_called()
+        self.assertEqual([], os.listdir(self.dst))
+
+    @patch("explorer.file_explorer.FileExplorer.move_to")
+    def test_run_partial_tree_cached_as_copy(self, move_mock):
+        move_mock.side_effect = TreeCopyError(
+            self.dst / "foo.py", [("a", "b", "c")]
+        )
+        job = TransferJob(self.fe, "move", self.items)
+        job.run()
+        self.assertEqual("copy", job.results[0]["func"])
+        self.assertEqual(self.dst / "foo.py", job.results[0]["new_obj"])
+        self.assertIsInstance(job.error, TreeCopyError)
+
+    def test_progress(self):
+        job = TransferJob(self.fe, "copy", self.items)
+        job.progress(100)
+        job.progress(50, 2)
+        self.assertEqual((150, 3), (job.bytes_done, job.files_done))
+
+    def test_throughput(self):
+        job = TransferJob(self.fe, "copy", self.items)
+        self.assertEqual(0.0, job.throughput)
+        job.started, job.finished = 10.0, 12.0
+        job.bytes_done = 100
+        self.assertEqual(50.0, job.throughput)
+
+
+class TestTransferEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = TransferEngine()
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_submit_and_poll(self):
+        fe = Mock()
+        job = TransferJob(fe, "copy", [(Path("src/foo.py"), "dst")])
+        self.engine.submit(job)
+        finished = []
+        deadline = time.monotonic() + 5
+        while not finished and time.monotonic() < deadline:
+            finished = self.engine.poll()
+            time.sleep(0.01)
+        self.assertEqual([job], finished)
+        self.assertEqual(set(), self.engine.active)
+
+    def test_poll_nothing_finished(self):
+        self.assertEqual([], self.engine.poll())
@@ -0,0 +1,165 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+from explorer import Trash
+
+
+class TestTrash(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        access = patch(
+            "explorer.trash.os.access",
+            side_effect=lambda path, mode: Path(path) == self.path
+        )
+        access.start()
+        self.addCleanup(access.stop)
+        self.src = self.path / "src"
+        (self.src / "tree" / "a").mkdir(parents=True)
+        (self.src / "tree" / "a" / "foo.py").write_text("foo")
+        (self.src / "bar.py").write_text("bar")
+        self.trash = Trash(max_bytes=None, max_age=None)
+        self.trash.start = lambda: None
+        self.root = self.path / self.trash.dirname
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_locate(self):
+        self.assertEqual(self.root, self.trash.locate(self.src / "bar.py"))
+        self.assertEqual(f"{Trash.DIRNAME}-{os.getuid()}", self.root.name)
+        self.assertTrue(self.root.is_dir())
+
+    def test_locate_no_writable_dir_raises_error(self):
+        with patch("explorer.trash.os.access", return_value=False):
+            with self.assertRaises(PermissionError):
+                self.trash.locate(self.src / "bar.py")
+
+    def test_locate_skips_symlinked_dir(self):
+        other = self.path / "other"
+        other.mkdir()
+        self.root.symlink_to(other)
+        with patch(
+            "explorer.trash.os.access",
+            side_effect=lambda path, mode: Path(path) in (self.path, self.src)
+        ):
+            root = self.trash.locate(self.src / "bar.py")
+        self.assertEqual(self.src / self.trash.dirname, root)
+        self.assertEqual([], os.listdir(other))
+
+    def test_locate_skips_foreign_dir(self):
+        self.root.mkdir(mode=0o700)
+        with patch("explorer.trash._UID", os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                self.trash.locate(self.src / "bar.py")
+
+    def test_put_foreign_dir_raises_error(self):
+        reserved = self.trash.reserve(self.src / "bar.py")
+        with patch("explorer.trash._UID", os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                self.trash.put(self.src / "bar.py", reserved)
+        self.assertTrue((self.src / "bar.py").exists())
+
+    def test_put(self):
+        trashed = self.trash.put(self.src / "tree")
+        self.assertFalse((self.src / "tree").exists())
+        self.assertEqual("tree", trashed.name)
+        self.assertEqual(self.root, trashed.parent.parent)
+        self.assertEqual("foo", (trashed / "a" / "foo.py").read_text())
+        self.assertEqual({self.root}, self.trash.roots)
+
+    def test_put_private_dirs(self):
+        self.root.mkdir(mode=0o755)
+        trashed = self.trash.put(self.src / "bar.py")
+        for directory in (trashed.parent, trashed.parent.parent):
+            mode = stat.S_IMODE(os.stat(directory).st_mode)
+            self.assertEqual(0o700, mode)
+
+    def test_put_same_name_twice(self):
+        first = self.trash.put(self.src / "bar.py")
+        (self.src / "bar.py").write_text("bar2")
+        second = self.trash.put(self.src / "bar.py")
+        self.assertNotEqual(first, second)
+        self.assertEqual("bar", first.read_text())
+        self.assertEqual("bar2", second.read_text())
+
+    def test_put_reserved(self):
+        reserved = self.trash.reserve(self.src / "bar.py")
+        self.assertFalse(reserved.parent.exists())
+        trashed = self.trash.put(self.src / "bar.py", reserved)
+        self.assertEqual(reserved, trashed)
+        self.assertEqual("bar", reserved.read_text())
+
+    def test_put_trash_raises_error(self):
+        trashed = self.trash.put(self.src / "bar.py")
+        with self.assertRaises(ValueError):
+            self.trash.put(trashed)
+
+    def test_put_missing_raises_error(self):
+        with self.assertRaises(FileNotFoundError):
+            self.trash.put(self.src / "spam.py")
+
+    def test_restore(self):
+        trashed = self.trash.put(self.src / "tree")
+        result = self.trash.restore(trashed, self.src / "tree")
+        self.assertEqual(self.src / "tree", result)
+        self.assertEqual("foo", (result / "a" / "foo.py").read_text())
+        self.assertFalse(trashed.parent.exists())
+
+    def test_restore_existing_dst_raises_error(self):
+        trashed = self.trash.put(self.src / "bar.py")
+        (self.src / "bar.py").write_text("new")
+        with self.assertRaises(FileExistsError):
+            self.trash.restore(trashed, self.src / "bar.py")
+
+    def test_restore_purged_raises_error(self):
+        trashed = self.trash.put(self.src / "bar.py")
+        self.trash.max_age = 0
+        self.trash.purge(now=float("inf"))
+        with self.assertRaises(FileNotFoundError):
+            self.trash.restore(trashed, self.src / "bar.py")
+
+    def test_purge_by_age(self):
+        old = self.trash.put(self.src / "bar.py")
+        new = self.trash.put(self.src / "tree")
+        self.trash.max_age = 10
+        now = int(new.parent.name.split("-")[0]) / 1e9 + 5
+        old_item = old.parent.rename(old.parent.with_name("1-old"))
+        self.assertEqual(1, self.trash.purge(now=now))
+        self.assertFalse(old_item.exists())
+        self.assertTrue(new.exists())
+        self.assertEqual(1, self.trash.purged)
+
+    def test_purge_by_size_removes_oldest(self):
+        (self.src / "big.bin").write_bytes(b"x" * 1000)
+        first = self.trash.put(self.src / "big.bin")
+        second = self.trash.put(self.src / "tree")
+        third = self.trash.put(self.src / "bar.py")
+        self.trash.max_bytes = 10
+        self.assertEqual(1, self.trash.purge())
+        self.assertFalse(first.exists())
+        self.assertTrue(second.exists())
+        self.assertTrue(third.exists())
+
+    def test_purge_cleans_interrupted_purge(self):
+        self.trash.put(self.src / "bar.py")
+        leftover = self.root / f"{Trash.PURGING}1-a"
+        (leftover / "x").mkdir(parents=True)
+        self.trash.purge()
+        self.assertFalse(leftover.exists())
+
+    def test_background_purge(self):
+        trash = Trash(max_bytes=None, max_age=0, interval=0.01)
+        trashed = trash.put(self.src / "bar.py")
+        for i in range(500):
+            if not trashed.exists():
+                break
+            time.sleep(0.01)
+        trash.stop(wait=True)
+        self.assertFalse(trashed.exists())
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from pathlib import Path
+
+from explorer import FileCopier, TreeCopier, TreeCopyError
+
+
+class TestTreeCopier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+        self.src = self.path / "src"
+        (self.src / "a" / "b").mkdir(parents=True)
+        (self.src / "empty").mkdir()
+        for i in range(20):
+            (self.src / "a" / f"foo{i}.py").write_text(str(i))
+        (self.src / "a" / "b" / "bar.py").write_text("bar")
+        (self.src / "root.py").write_text("root")
+        os.utime(self.src / "a" / "b", (1, 1))
+        os.utime(self.src / "root.py", (2, 2))
+        self.copier = TreeCopier(workers=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def listing(self, root):
+        return sorted(
+            (str(path.relative_to(root)), path.is_dir())
+            for path in root.rglob("*")
+        )
+
+    def test_copy(self):
+        dst = self.path / "dst"
+        result = self.copier.copy(self.src, dst)
+        self.assertEqual(dst, result)
+        self.assertEqual(self.listing(self.src), self.listing(dst))
+        self.assertEqual("7", (dst / "a" / "foo7.py").read_text())
+
+    def test_copy_preserves_metadata(self):
+        dst = self.path / "dst"
+        self.copier.copy(self.src, dst)
+        self.assertEqual(1, (dst / "a" / "b").stat().st_mtime)
+        self.assertEqual(2, (dst / "root.py").stat().st_mtime)
+
+    def test_copy_uses_copy_function(self):
+        copy_function = Mock()
+        self.copier.copy(self.src, self.path / "dst", copy_function)
+        self.assertEqual(22, copy_function.call_count)
+
+    def test_copy_collects_errors(self):
+        def copy_function(src, dst):
+            if src.endswith("foo3.py"):
+                raise PermissionError("denied")
+            Path(dst).write_text("copied")
+
+        dst = self.path / "dst"
+        with self.assertRaises(TreeCopyError) as ctx:
+            self.copier.copy(self.src, dst, copy_function)
+        self.assertEqual(dst, ctx.exception.root)
+        self.assertEqual(1, len(ctx.exception.errors))
+        self.assertTrue((dst / "a" / "b" / "bar.py").exists())
+        self.assertFalse((dst / "a" / "foo3.py").exists())
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "named pipes not available")
+    def test_copy_named_pipe_collected_as_error(self):
+        os.mkfifo(self.src / "a" / "pipe")
+        dst = self.path / "dst"
+        with self.assertRaises(TreeCopyError) as ctx:
+            self.copier.copy(self.src, dst, FileCopier().copy2)
+        self.assertEqual(1, len(ctx.exception.errors))
+        self.assertEqual("7", (dst / "a" / "foo7.py").read_text())
+
+    def test_copy_existing_dst_raises_error(self):
+        with self.assertRaises(FileExistsError):
+            self.copier.copy(self.src, self.src)
+
+    def test_copy_into_claimed_dir(self):
+        dst = self.path / "dst"
+        dst.mkdir()
+        self.copier.copy(self.src, dst, dirs_exist_ok=True)
+        self.assertEqual(self.listing(self.src), self.listing(dst))
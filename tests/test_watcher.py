@@ -0,0 +1,134 @@
+import errno
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from explorer import Watcher
+from explorer.watcher import _libc, _Inotify, _Polling
+
+
+BACKENDS = [("polling", True)]
+if _libc is not None:
+    BACKENDS.append(("inotify", False))
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "old.txt").write_text("")
+
+    def watcher(self, polling):
+        watcher = Watcher(interval=0.05, polling=polling)
+        self.addCleanup(watcher.close)
+        watcher.watch(self.dir)
+        return watcher
+
+    def wait_changes(self, watcher, expected):
+        changes = {}
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline:
+            for directory, names in watcher.changes().items():
+                if names is None:
+                    changes[directory] = None
+                elif changes.get(directory, ()) is not None:
+                    changes.setdefault(directory, set()).update(names)
+            if changes == expected:
+                break
+            time.sleep(0.05)
+        return changes
+
+    @parameterized.expand(BACKENDS)
+    def test_changes(self, name, polling):
+        watcher = self.watcher(polling)
+        (self.dir / "new.txt").write_text("")
+        (self.dir / "sub").mkdir()
+        os.unlink(self.dir / "old.txt")
+        expected = {self.dir: {"new.txt", "sub", "old.txt"}}
+        self.assertEqual(expected, self.wait_changes(watcher, expected))
+        self.assertEqual({}, watcher.changes())
+
+    @parameterized.expand(BACKENDS)
+    def test_changes_modified(self, name, polling):
+        watcher = self.watcher(polling)
+        time.sleep(0.1)
+        with open(self.dir / "old.txt", "a") as f:
+            f.write("modified")
+        expected = {self.dir: {"old.txt"}}
+        self.assertEqual(expected, self.wait_changes(watcher, expected))
+
+    @parameterized.expand(BACKENDS)
+    def test_changes_coalesced(self, name, polling):
+        watcher = self.watcher(polling)
+        watcher.MAX_NAMES = 10
+        for i in range(20):
+            (self.dir / f"{i}.txt").write_text("")
+        expected = {self.dir: None}
+        self.assertEqual(expected, self.wait_changes(watcher, expected))
+
+    @parameterized.expand(BACKENDS)
+    def test_changes_dir_removed(self, name, polling):
+        watcher = self.watcher(polling)
+        os.unlink(self.dir / "old.txt")
+        os.rmdir(self.dir)
+        expected = {self.dir: None}
+        self.assertEqual(expected, self.wait_changes(watcher, expected))
+        os.mkdir(self.dir)
+
+    def test_watch_counted(self):
+        watcher = self.watcher(True)
+        watcher.watch(self.dir)
+        watcher.unwatch(self.dir)
+        self.assertEqual({self.dir}, watcher.watched)
+        watcher.unwatch(self.dir)
+        self.assertEqual(set(), watcher.watched)
+
+    def test_unwatched_changes_dropped(self):
+        watcher = self.watcher(True)
+        watcher.unwatch(self.dir)
+        (self.dir / "new.txt").write_text("")
+        time.sleep(0.2)
+        self.assertEqual({}, watcher.changes())
+
+    def test_watch_missing_dir(self):
+        watcher = Watcher(interval=0.05)
+        self.addCleanup(watcher.close)
+        with self.assertRaises(OSError):
+            watcher.watch(self.dir / "missing")
+        self.assertEqual(set(), watcher.watched)
+
+    @unittest.skipIf(_libc is None, "inotify not available")
+    def test_exhausted_watches_fall_back_to_polling(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        other = Path(tmp.name)
+        watcher = self.watcher(False)
+        no_space = OSError(errno.ENOSPC, "No space left on device")
+        with patch.object(_Inotify, "add", side_effect=no_space):
+            watcher.watch(other)
+        self.assertTrue(watcher.polling)
+        self.assertEqual({self.dir, other}, watcher.watched)
+        (other / "new.txt").write_text("")
+        (self.dir / "new.txt").write_text("")
+        expected = {self.dir: {"new.txt"}, other: {"new.txt"}}
+        self.assertEqual(expected, self.wait_changes(watcher, expected))
+
+    def test_polling_removed_during_read(self):
+        backend = _Polling()
+        backend.add(self.dir)
+
+        def snapshot(path):
+            backend.remove(path)
+            return {}
+
+        with patch("explorer.watcher._snapshot", side_effect=snapshot):
+            self.assertEqual([], backend.read(0, threading.Event()))
+        self.assertEqual({}, backend.snapshots)